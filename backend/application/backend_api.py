@@ -1,32 +1,54 @@
+from datetime import date
+
 from backend.infrastructure.repositories.image_repository import ImageRepository
 from backend.infrastructure.repositories.note_repository import NoteRepository
 from backend.infrastructure.repositories.theme_repository import ThemeRepository
 from backend.infrastructure.repositories.analytics_repository import AnalyticsRepository
 from backend.infrastructure.repositories.search_efficiency_repository import SearchEfficiencyRepository
+from backend.infrastructure.repositories.backup_repository import BackupRepository
+from backend.infrastructure.repositories.maintenance_repository import MaintenanceRepository
 
 from backend.application.use_cases.note_use_cases import (
     create_note, delete_note, get_note_details, get_note_analytics, 
     get_notes_without_themes, list_notes_by_theme, move_to_theme,
     register_time_to_note, rename_note, update_note_content, get_unique_note_name,
-    get_note_ids_by_theme_hierarchy, delete_many_notes
+    get_note_ids_by_theme_hierarchy, delete_many_notes, search_notes, backfill_note_stats,
+    get_note_time_series, get_note_heatmap, get_note_analytics_many
 )
 
 from backend.application.use_cases.theme_use_cases import (
     create_theme, delete_theme, get_theme_analytics, get_theme_details,
     list_child_themes, list_root_themes, list_themes, remove_theme,
-    rename_theme, get_unique_theme_name, get_themes_descendants, delete_many_themes
+    rename_theme, get_unique_theme_name, get_themes_descendants, delete_many_themes,
+    get_all_themes_analytics, get_theme_time_series, get_theme_heatmap, get_vault_heatmap
 )
 
 from backend.application.use_cases.image_use_cases import (
     create_image, delete_image, get_image_details, 
     list_images_by_theme, rename_image, move_image_to_theme, get_unique_image_name, delete_many_images,
-    list_images_without_theme, get_image_extension, get_image_ids_by_theme_hierarchy
+    list_images_without_theme, get_image_extension, get_image_ids_by_theme_hierarchy,
+    empty_image_trash, check_image_store, repair_image_store, deduplicate_image_store,
+    get_image_thumbnail, request_image_thumbnail, create_image_from_source, import_image_folder, backfill_image_metadata,
+    migrate_image_layout, export_image, export_theme_images
+)
+from backend.application.use_cases.backup_use_cases import (
+    create_backup, restore_backup, verify_backup
+)
+from backend.application.use_cases.maintenance_use_cases import (
+    run_maintenance, get_last_maintenance_report
 )
+from backend.application.decorators.activity_tracker import ActivityMonitor, track_activity
 from backend.application.services.image_services import ImageService
 from backend.application.services.analyzer_services import AnalyzerService
+from backend.application.services.parallel_analyzer_services import ParallelAnalyzerService
+from backend.application.services.time_series_services import TimeSeriesService
+from backend.application.services.heatmap_services import HeatmapService
+from backend.application.services.analytics_cache_services import AnalyticsCacheService
 from backend.application.services.note_services import NoteService
 from backend.application.services.theme_services import ThemeService
+from backend.application.services.maintenance_services import MaintenanceService
 
+@track_activity
 class BackendAPI:
     """
     Centralized facade for the frontend.
@@ -37,44 +59,70 @@ class BackendAPI:
                 theme_repo: ThemeRepository,
                 analy_repo: AnalyticsRepository,
                 search_repo: SearchEfficiencyRepository,
-                image_repo: ImageRepository):
+                image_repo: ImageRepository,
+                backup_repo: BackupRepository,
+                maintenance_repo: MaintenanceRepository):
         # Repositories
         self._note_repo = note_repo
         self._theme_repo = theme_repo
         self._analy_repo = analy_repo
         self._search_repo = search_repo
         self._image_repo = image_repo
+        self._backup_repo = backup_repo
+        self._maintenance_repo = maintenance_repo
 
         # Services
         self._analyzer_service = AnalyzerService()
+        self._parallel_analyzer = ParallelAnalyzerService(self._analyzer_service)
+        self._time_series_service = TimeSeriesService()
+        self._heatmap_service = HeatmapService()
+        self._analytics_cache = AnalyticsCacheService()
         self._note_service = NoteService(self._note_repo)
         self._theme_service = ThemeService(self._theme_repo)
         self._image_service = ImageService(self._image_repo)
 
+        # Every public call marks activity; maintenance waits for idle periods
+        self._activity = ActivityMonitor()
+        self._maintenance_service = MaintenanceService(self._maintenance_repo, self._activity)
+        self._maintenance_service.register_task("trash_gc", self._image_repo.trash_collector.step)
+
+    def close(self):
+        """Stops background work; the owner disposes the session and engine."""
+        self._maintenance_service.stop()
+        self._image_repo.thumbnails.shutdown()
+        self._parallel_analyzer.shutdown()
+
     # --- Note operations ---
     def create_note(self, name: str, theme_id: int | None = None):
         return create_note(self._note_repo, self._note_service, name, theme_id)
 
     def delete_note(self, note_id: int):
-        return delete_note(self._note_repo, note_id)
+        return delete_note(self._note_repo, self._heatmap_service, note_id)
 
     def delete_many_notes(self, note_ids: list[int]):
-        return delete_many_notes(self._note_repo, note_ids)
+        return delete_many_notes(self._note_repo, self._heatmap_service, note_ids)
 
     def rename_note(self, note_id: int, new_name: str):
         return rename_note(self._note_repo, self._note_service, note_id, new_name)
 
     def move_note_to_theme(self, note_id: int, new_theme_id: int | None = None):
-        return move_to_theme(self._note_repo, self._theme_repo, self._note_service, note_id, new_theme_id)
+        return move_to_theme(
+            self._note_repo, self._theme_repo, self._note_service, self._heatmap_service, note_id, new_theme_id
+        )
 
     def update_note_content(self, note_id: int, content: str):
-        return update_note_content(self._note_repo, note_id, content)
+        return update_note_content(self._note_repo, self._analyzer_service, note_id, content)
 
     def get_note_details(self, note_id: int):
         return get_note_details(self._note_repo, note_id)
 
     def get_note_analytics(self, note_id: int):
-        return get_note_analytics(self._note_repo, self._analyzer_service, note_id)
+        return get_note_analytics(
+            self._note_repo, self._analy_repo, self._analyzer_service, self._analytics_cache, note_id
+        )
+
+    def get_note_analytics_many(self, note_ids: list[int]):
+        return get_note_analytics_many(self._analy_repo, self._analyzer_service, note_ids)
 
     def list_notes_by_theme(self, theme_id: int):
         return list_notes_by_theme(self._note_repo, self._theme_repo, theme_id)
@@ -82,8 +130,20 @@ class BackendAPI:
     def get_notes_without_themes(self):
         return get_notes_without_themes(self._note_repo)
 
+    def get_note_time_series(self, note_id: int):
+        return get_note_time_series(self._note_repo, self._analy_repo, self._time_series_service, note_id)
+
+    def get_note_heatmap(self, note_id: int, start: date | None = None, end: date | None = None):
+        return get_note_heatmap(self._note_repo, self._analy_repo, self._heatmap_service, note_id, start, end)
+
+    def search_notes(self, query: str):
+        return search_notes(self._note_repo, query)
+
+    def backfill_note_stats(self):
+        return backfill_note_stats(self._note_repo, self._parallel_analyzer)
+
     def register_time_to_note(self, note_id: int, minutes: float):
-        return register_time_to_note(self._note_repo, minutes, note_id)
+        return register_time_to_note(self._note_repo, self._search_repo, self._heatmap_service, minutes, note_id)
 
     def get_unique_note_name(self, name: str, theme_id: int | None = None):
         return get_unique_note_name(self._theme_repo, self._note_service, name, theme_id)
@@ -96,17 +156,17 @@ class BackendAPI:
         return create_theme(self._theme_repo, self._theme_service, name, parent_id)
 
     def delete_theme(self, theme_id: int):
-        return delete_theme(self._theme_repo, theme_id)
+        return delete_theme(self._theme_repo, self._image_repo, self._heatmap_service, theme_id)
     
     def delete_many_themes(self, theme_ids: list[int]):
-        return delete_many_themes(self._theme_repo, theme_ids)
+        return delete_many_themes(self._theme_repo, self._image_repo, self._heatmap_service, theme_ids)
 
     def rename_theme(self, theme_id: int, new_name: str):
         return rename_theme(self._theme_repo, self._theme_service, theme_id, new_name)
 
     def remove_theme(self, theme_id: int, new_parent_id: int | None = None):
         return remove_theme(self._theme_repo, self._theme_service, theme_id,
-                            self._search_repo, new_parent_id)
+                            self._search_repo, self._heatmap_service, new_parent_id)
 
     def get_unique_theme_name(self, name: str, theme_id: int | None = None):
         return get_unique_theme_name(self._theme_repo, self._theme_service, name, theme_id)
@@ -123,15 +183,33 @@ class BackendAPI:
     def get_theme_details(self, theme_id: int):
         return get_theme_details(self._theme_repo, theme_id)
 
-    def get_theme_analytics(self, theme_id: int):
+    def get_theme_analytics(self, theme_id: int, exact: bool = False):
         return get_theme_analytics(
             self._analy_repo,
             self._search_repo,
             self._theme_repo,
             self._analyzer_service,
-            theme_id
+            self._analytics_cache,
+            theme_id,
+            exact
         )
 
+    def get_all_themes_analytics(self, exact: bool = False):
+        return get_all_themes_analytics(self._analy_repo, self._theme_repo, self._analyzer_service, exact)
+
+    def get_theme_time_series(self, theme_id: int):
+        return get_theme_time_series(
+            self._analy_repo, self._search_repo, self._theme_repo, self._time_series_service, theme_id
+        )
+
+    def get_theme_heatmap(self, theme_id: int, start: date | None = None, end: date | None = None):
+        return get_theme_heatmap(
+            self._analy_repo, self._search_repo, self._theme_repo, self._heatmap_service, theme_id, start, end
+        )
+
+    def get_vault_heatmap(self, start: date | None = None, end: date | None = None):
+        return get_vault_heatmap(self._analy_repo, self._heatmap_service, start, end)
+
     def get_themes_descendants(self, theme_id: int):
         return get_themes_descendants(theme_id, self._search_repo)
     
@@ -139,6 +217,16 @@ class BackendAPI:
     def create_image(self, name: str, blob_data: bytes, extension: str, theme_id: int | None = None):
         return create_image(self._image_repo, self._image_service, name, blob_data, extension, theme_id)
 
+    def create_image_from_source(self, name: str, source, extension: str, theme_id: int | None = None):
+        return create_image_from_source(self._image_repo, self._image_service, name, source, extension, theme_id)
+
+    def import_image_folder(self, directory: str, theme_id: int | None = None, recursive: bool = False,
+                            progress=None, cancel=None):
+        return import_image_folder(
+            self._image_repo, self._image_service, self._theme_repo,
+            directory, theme_id, recursive, progress, cancel
+        )
+
     def delete_image(self, image_id: int):
         return delete_image(self._image_repo, image_id)
 
@@ -165,7 +253,56 @@ class BackendAPI:
 
     def get_image_extension(self, image_id: int):
         return get_image_extension(self._image_repo, image_id)
+
+    def get_image_thumbnail(self, image_id: int, size: int):
+        return get_image_thumbnail(self._image_repo, image_id, size)
+
+    def request_image_thumbnail(self, image_id: int, size: int, on_ready):
+        return request_image_thumbnail(self._image_repo, image_id, size, on_ready)
     
     def get_image_ids_by_theme_hierarchy(self, image_id: int):
         return get_image_ids_by_theme_hierarchy(image_id, self._search_repo)
 
+    def empty_image_trash(self):
+        return empty_image_trash(self._image_repo)
+
+    def check_image_store(self):
+        return check_image_store(self._image_repo)
+
+    def repair_image_store(self, remove_missing: bool = True, trash_orphans: bool = True, accept_sizes: bool = False):
+        return repair_image_store(self._image_repo, remove_missing, trash_orphans, accept_sizes)
+
+    def deduplicate_image_store(self):
+        return deduplicate_image_store(self._image_repo)
+
+    def backfill_image_metadata(self):
+        return backfill_image_metadata(self._image_repo)
+
+    def migrate_image_layout(self):
+        return migrate_image_layout(self._image_repo)
+
+    def export_image(self, image_id: int, dest_path: str):
+        return export_image(self._image_repo, image_id, dest_path)
+
+    def export_theme_images(self, theme_id: int, dest_dir: str, progress=None):
+        return export_theme_images(self._image_repo, self._theme_repo, theme_id, dest_dir, progress)
+
+# --- Backup operations ---
+    def create_backup(self, dest_dir: str):
+        return create_backup(self._backup_repo, dest_dir)
+
+    def verify_backup(self, snapshot_dir: str):
+        return verify_backup(self._backup_repo, snapshot_dir)
+
+    def restore_backup(self, snapshot_dir: str):
+        return restore_backup(self._backup_repo, self._heatmap_service, snapshot_dir)
+
+# --- Maintenance operations ---
+    def start_maintenance(self):
+        self._maintenance_service.start()
+
+    def run_maintenance(self):
+        return run_maintenance(self._maintenance_service)
+
+    def get_last_maintenance_report(self):
+        return get_last_maintenance_report(self._maintenance_service)
@@ -0,0 +1,48 @@
+import threading
+import time
+from functools import wraps
+
+
+class ActivityMonitor:
+    """Records when the facade was last used so background work can wait for idle periods."""
+    def __init__(self):
+        self._last_activity = time.monotonic()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def begin(self) -> None:
+        with self._lock:
+            self._in_flight += 1
+            self._last_activity = time.monotonic()
+
+    def end(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._last_activity = time.monotonic()
+
+    def idle_seconds(self) -> float:
+        """Seconds since the last call finished (0 while a call is running)."""
+        with self._lock:
+            if self._in_flight:
+                return 0.0
+            return time.monotonic() - self._last_activity
+
+
+def track_activity(cls):
+    """Class decorator: every public method reports to the instance's ActivityMonitor (self._activity)."""
+    for name, attr in list(vars(cls).items()):
+        if name.startswith("_") or not callable(attr):
+            continue
+        setattr(cls, name, _tracked(attr))
+    return cls
+
+
+def _tracked(f):
+    @wraps(f)
+    def wrapper(self, *args, **kwargs):
+        self._activity.begin()
+        try:
+            return f(self, *args, **kwargs)
+        finally:
+            self._activity.end()
+    return wrapper
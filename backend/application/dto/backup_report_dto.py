@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class BackupReportDTO:
+    """DTO to transport the result of a backup or restore."""
+    snapshot_dir: str
+    db_pages: int
+    files_copied: int
+    files_linked: int
+    bytes_copied: int
+    seconds: float
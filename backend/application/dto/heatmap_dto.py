@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+from datetime import date
+
+@dataclass(frozen=True)
+class HeatmapDTO:
+    """DTO to transport a calendar heatmap: minutes and intensity level (0-4) per UTC day from start to end."""
+    start: date
+    end: date
+    daily_minutes: list[float]
+    levels: list[int]
+    max_minutes: float
+    minutes_total: float
+    n_days_active: int
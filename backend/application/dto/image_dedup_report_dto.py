@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class ImageDedupReportDTO:
+    """DTO to transport the result of deduplicating the image store."""
+    images_hashed: int
+    blobs_created: int
+    duplicates_removed: int
+    bytes_freed: int
+    missing_files: int
+    seconds: float
@@ -8,4 +8,10 @@ class ImageDetailDTO:
     name: str
     file_path: str
     theme_id: int | None
-    created_at: datetime
\ No newline at end of file
+    created_at: datetime
+    byte_size: int | None = None
+    width: int | None = None  # As stored in the file, before EXIF orientation
+    height: int | None = None
+    format: str | None = None
+    orientation: int = 1  # EXIF orientation (1-8)
+    taken_at: datetime | None = None  # EXIF capture date (camera local time)
@@ -0,0 +1,10 @@
+from dataclasses import dataclass, field
+
+@dataclass(frozen=True)
+class ImageExportReportDTO:
+    """DTO to transport the result of exporting the images of a theme."""
+    folder: str
+    files_exported: int
+    bytes_copied: int
+    failed_image_ids: list[int] = field(default_factory=list)
+    seconds: float = 0.0
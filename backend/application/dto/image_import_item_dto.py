@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class ImageImportItemDTO:
+    """DTO to transport the result of importing one file."""
+    source: str
+    name: str
+    image_id: int | None
+    status: str  # imported | duplicate | failed | cancelled
+    detail: str = ""
@@ -0,0 +1,14 @@
+from dataclasses import dataclass, field
+
+from backend.application.dto.image_import_item_dto import ImageImportItemDTO
+
+@dataclass(frozen=True)
+class ImageImportReportDTO:
+    """DTO to transport the per-file report of a bulk image import."""
+    total: int
+    imported: int
+    duplicates: int
+    failed: int
+    cancelled: bool
+    seconds: float
+    items: list[ImageImportItemDTO] = field(default_factory=list)
@@ -0,0 +1,8 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class ImageStoreRepairDTO:
+    """DTO to transport the repairs applied to the image store."""
+    rows_removed: int
+    files_trashed: int
+    sizes_updated: int
@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class ImageStoreReportDTO:
+    """DTO to transport the integrity check of the image store."""
+    n_images: int
+    n_files: int
+    missing_image_ids: list[int]
+    orphaned_files: list[str]
+    size_mismatch_image_ids: list[int]
+    seconds: float
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from backend.application.dto.maintenance_task_dto import MaintenanceTaskDTO
+
+@dataclass(frozen=True)
+class MaintenanceReportDTO:
+    """DTO to transport the result of a maintenance run."""
+    started_at: datetime
+    seconds: float
+    interrupted: bool
+    tasks: list[MaintenanceTaskDTO]
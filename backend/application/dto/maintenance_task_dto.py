@@ -0,0 +1,9 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class MaintenanceTaskDTO:
+    """DTO to transport what a single maintenance task did."""
+    name: str
+    steps: int
+    detail: str
+    seconds: float
@@ -0,0 +1,9 @@
+from dataclasses import dataclass, field
+
+@dataclass(frozen=True)
+class TextStatsDTO:
+    """DTO to transport every word metric of a text, computed in one pass."""
+    n_words_total: int
+    n_meaningful: int
+    n_unique: int
+    frequencies: dict[str, int] = field(default_factory=dict)
@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+from datetime import date
+
+@dataclass(frozen=True)
+class TimeSeriesDTO:
+    """DTO to transport the time series of a note or theme: one value per UTC day from first_day to today."""
+    first_day: date | None
+    daily_minutes: list[float]
+    rolling_7_minutes: list[float]
+    rolling_30_minutes: list[float]
+    first_week: date | None
+    weekly_minutes: list[float]
+    weekday_minutes: list[float]
+    weekday_sessions: list[int]
+    longest_streak: int
+    current_streak: int
+    n_sessions: int
+    minutes_total: float
+    n_days_active: int
@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class TrashReportDTO:
+    """DTO to transport the result of emptying the image trash."""
+    files_scanned: int
+    files_deleted: int
+    bytes_freed: int
+    bytes_remaining: int
+    seconds: float
@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+@dataclass(frozen=True)
+class VaultItemDTO(Generic[T]):
+    """DTO to tag a result with the vault it comes from (fan-out queries)."""
+    vault: str
+    item: T
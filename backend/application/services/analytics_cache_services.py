@@ -0,0 +1,34 @@
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class AnalyticsCacheService:
+    """
+    Computed analytics kept with the version stamp they were computed under.
+    An entry is only returned while the stamp the caller just read is equal to
+    the stored one, so a stale result is never served: a repeat view costs the
+    stamp query alone. Least recently used entries go first past max_entries.
+    """
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, tuple[tuple, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, stamp: tuple) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] != stamp:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: Hashable, stamp: tuple, value: Any) -> None:
+        """`stamp` must be read before computing `value`: a change in between then only causes a miss."""
+        self._entries[key] = (stamp, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -1,4 +1,12 @@
 import re 
+from collections import Counter
+from typing import Iterable
+
+from backend.application.dto.text_stats_dto import TextStatsDTO
+from backend.application.services.hyperloglog import HyperLogLog
+from backend.domain.dto.note_stats_dto import NoteStatsDTO
+
+WORD_PATTERN = re.compile(r"\b\w+\b")
 
 class AnalyzerService:
     def __init__(self):
@@ -53,23 +61,46 @@ class AnalyzerService:
     def _split(self, text: str | None) -> list[str]:
         """Basic tokenization."""
         if not text: return []
-        return re.findall(r"\b\w+\b", text.lower())
+        return WORD_PATTERN.findall(text.lower())
 
-    def _filter(self, text: str | None) -> list[str]:
-        """Filters words with meaningful (no stop words)."""
-        return [w for w in self._split(text) if w not in self.STOPWORDS_ES]
+    def analyze(self, text: str | None) -> TextStatsDTO:
+        """
+        Every metric from a single tokenization: words are counted once (Counter
+        runs in C) and stopwords are filtered over distinct words, not every token.
+        """
+        return self._stats(Counter(self._split(text)))
 
-    def count_total(self, text: str | None) -> int:
-        """Total words (including garbage)."""
-        return len(self._split(text))
+    def analyze_stream(self, texts: Iterable[str | None]) -> TextStatsDTO:
+        """
+        Same metrics as analyze() over the concatenation of `texts`, fed one at a
+        time into a single counter: memory is one text plus the vocabulary.
+        """
+        counts = Counter()
+        for text in texts:
+            counts.update(self._split(text))
+        return self._stats(counts)
 
-    def count_meaningful(self, text: str | None) -> int:
-        """Count of words with meaningful (no stop words)."""
-        return len(self._filter(text))
+    def _stats(self, counts: Counter) -> TextStatsDTO:
+        frequencies = {w: n for w, n in counts.items() if w not in self.STOPWORDS_ES}
+        return TextStatsDTO(
+            n_words_total=counts.total(),
+            n_meaningful=sum(frequencies.values()),
+            n_unique=len(frequencies),
+            frequencies=frequencies
+        )
 
-    def count_unique(self, text: str | None) -> int:
-        """Count of unique words with meaning. """
-        return len(set(self._filter(text)))
+    def note_stats(self, text: str | None) -> NoteStatsDTO:
+        """Statistics stored with a note's content; the vocabulary lets themes merge unique counts."""
+        stats = self.analyze(text)
+        sketch = HyperLogLog()
+        sketch.update(stats.frequencies)
+        return NoteStatsDTO(
+            n_words_total=stats.n_words_total,
+            n_meaningful=stats.n_meaningful,
+            n_unique=stats.n_unique,
+            vocabulary=frozenset(stats.frequencies),
+            sketch=sketch.to_bytes()
+        )
 
     def get_diversity(self, unique: int, total: int) -> float:
         """Lexical richness ratio."""
@@ -0,0 +1,101 @@
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Iterable
+
+from backend.application.dto.heatmap_dto import HeatmapDTO
+
+# Default range: this week plus the 52 before it, like a yearly contribution calendar
+HEATMAP_WEEKS = 53
+SCOPE_NOTE, SCOPE_THEME, SCOPE_VAULT = "note", "theme", "vault"
+
+
+class _HeatmapEntry:
+    """Cached daily totals of one scope and range, plus the days whose total is out of date."""
+    __slots__ = ("daily", "stale")
+
+    def __init__(self, daily: dict[date, float]):
+        self.daily = daily
+        self.stale: set[date] = set()
+
+
+class HeatmapService:
+    """
+    Calendar heatmaps built from daily minute totals. The totals are cached per
+    (scope, scope id, start, end); a new session only marks its day stale in the
+    entries that cover it, and the next read re-queries just the stale days.
+    Changes that move sessions between scopes (deleting or moving notes and
+    themes, restoring a backup) drop the whole cache.
+    """
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, _HeatmapEntry] = OrderedDict()
+
+    @staticmethod
+    def resolve_range(start: date | None, end: date | None) -> tuple[date, date]:
+        """Fills the missing bounds: end is today (UTC), start the Monday HEATMAP_WEEKS - 1 weeks before end."""
+        end = end or datetime.now(timezone.utc).date()
+        if start is None:
+            start = end - timedelta(weeks=HEATMAP_WEEKS - 1)
+            start -= timedelta(days=start.weekday())
+        return start, end
+
+    def daily_minutes(self, key: tuple,
+                      load: Callable[[list[date] | None], dict[date, float]]) -> dict[date, float]:
+        """
+        Daily totals of `key`. `load(None)` must return every day of the range and
+        `load(days)` only those days; it is called on a miss or for stale days.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = _HeatmapEntry(load(None))
+            self._entries[key] = entry
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return entry.daily
+
+        self._entries.move_to_end(key)
+        if entry.stale:
+            stale = sorted(entry.stale)
+            fresh = load(stale)
+            for day in stale:
+                if day in fresh:
+                    entry.daily[day] = fresh[day]
+                else:
+                    entry.daily.pop(day, None)
+            entry.stale.clear()
+        return entry.daily
+
+    def invalidate_days(self, days: Iterable[date], note_id: int, theme_ids: Iterable[int]) -> None:
+        """Marks `days` stale in the vault entries and in those of the note or of `theme_ids` (its theme and ancestors)."""
+        days = set(days)
+        theme_ids = set(theme_ids)
+        for (scope, scope_id, start, end), entry in self._entries.items():
+            if scope == SCOPE_NOTE and scope_id != note_id:
+                continue
+            if scope == SCOPE_THEME and scope_id not in theme_ids:
+                continue
+            entry.stale.update(day for day in days if start <= day <= end)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    @staticmethod
+    def build(start: date, end: date, daily: dict[date, float]) -> HeatmapDTO:
+        minutes = [0.0] * ((end - start).days + 1)
+        for day, value in daily.items():
+            minutes[(day - start).days] = value
+
+        # As in GitHub's calendar: level 0 is no activity, 1-4 the quartile among active days
+        active = sorted(value for value in minutes if value > 0)
+        thresholds = [active[len(active) * q // 4] for q in (1, 2, 3)] if active else []
+        levels = [1 + bisect_right(thresholds, value) if value > 0 else 0 for value in minutes]
+        return HeatmapDTO(
+            start=start,
+            end=end,
+            daily_minutes=minutes,
+            levels=levels,
+            max_minutes=active[-1] if active else 0.0,
+            minutes_total=float(sum(active)),
+            n_days_active=len(active)
+        )
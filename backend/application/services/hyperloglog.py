@@ -0,0 +1,64 @@
+import math
+import zlib
+from hashlib import blake2b
+from typing import Iterable
+
+
+class HyperLogLog:
+    """
+    Mergeable distinct-count sketch: 2**precision one-byte registers, each the
+    longest run of leading zeros seen among the hashes routed to it. Standard
+    error is 1.04 / sqrt(2**precision), 1.6% at the default precision 12.
+    Sketches of the same precision merge by register-wise max.
+    """
+    HASH_BITS = 64
+
+    def __init__(self, precision: int = 12, registers: bytearray | None = None):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = registers if registers is not None else bytearray(self.m)
+        if len(self.registers) != self.m:
+            raise ValueError("register count does not match precision")
+
+    @staticmethod
+    def _hash(word: str) -> int:
+        # Stable across processes, unlike hash()
+        return int.from_bytes(blake2b(word.encode("utf-8"), digest_size=8).digest(), "big")
+
+    def add(self, word: str) -> None:
+        h = self._hash(word)
+        index = h >> (self.HASH_BITS - self.precision)
+        rest = h & ((1 << (self.HASH_BITS - self.precision)) - 1)
+        rank = (self.HASH_BITS - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, words: Iterable[str]) -> None:
+        for word in words:
+            self.add(word)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("cannot merge sketches of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small cardinalities: linear counting over the empty registers is far more precise
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+    # ---------- serialization ----------
+    def to_bytes(self) -> bytes:
+        """Precision byte + zlib-compressed registers (mostly zeros for short notes)."""
+        return bytes([self.precision]) + zlib.compress(bytes(self.registers))
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "HyperLogLog":
+        return cls(blob[0], bytearray(zlib.decompress(blob[1:])))
@@ -0,0 +1,152 @@
+from log import logger
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable
+
+from backend.infrastructure.repositories.maintenance_repository import MaintenanceRepository
+from backend.infrastructure.errors.db import DBError
+
+from backend.application.decorators.activity_tracker import ActivityMonitor
+from backend.application.dto.maintenance_task_dto import MaintenanceTaskDTO
+from backend.application.dto.maintenance_report_dto import MaintenanceReportDTO
+
+"""A step returns (finished, detail). Tasks are run step by step so they can stop as soon as the user is back."""
+MaintenanceStep = Callable[[], tuple[bool, str]]
+
+
+class MaintenanceService:
+    def __init__(self, maintenance_repo: MaintenanceRepository,
+                 activity: ActivityMonitor,
+                 idle_threshold: float = 30.0,
+                 run_interval: float = 6 * 3600.0,
+                 poll_interval: float = 1.0,
+                 vacuum_pages: int = 64,
+                 max_steps: int = 200):
+        self.maintenance_repo = maintenance_repo
+        self.activity = activity
+        self.idle_threshold = idle_threshold
+        self.run_interval = run_interval
+        self.poll_interval = poll_interval
+        self.vacuum_pages = vacuum_pages
+        self.max_steps = max_steps
+
+        self._tasks: list[tuple[str, MaintenanceStep]] = [
+            ("analyze", self._step_analyze),
+            ("optimize", self._step_optimize),
+            ("incremental_vacuum", self._step_vacuum),
+            ("wal_checkpoint", self._step_checkpoint),
+        ]
+        self._last_report: MaintenanceReportDTO | None = None
+        self._last_run = float("-inf")
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # --- Tasks ---
+    def register_task(self, name: str, step: MaintenanceStep) -> None:
+        """Adds a task to the end of every run."""
+        self._tasks.append((name, step))
+
+    def _step_analyze(self) -> tuple[bool, str]:
+        self.maintenance_repo.analyze()
+        return True, f"ANALYZE (analysis_limit={self.maintenance_repo.analysis_limit})"
+
+    def _step_optimize(self) -> tuple[bool, str]:
+        self.maintenance_repo.optimize()
+        return True, "PRAGMA optimize"
+
+    def _step_vacuum(self) -> tuple[bool, str]:
+        if self.maintenance_repo.auto_vacuum_mode() != 2:
+            return True, "omitido: auto_vacuum no es INCREMENTAL"
+        remaining = self.maintenance_repo.incremental_vacuum(self.vacuum_pages)
+        return remaining == 0, f"{remaining} páginas libres restantes"
+
+    def _step_checkpoint(self) -> tuple[bool, str]:
+        if self.maintenance_repo.journal_mode().lower() != "wal":
+            return True, "omitido: la base no usa WAL"
+        busy, log_frames, checkpointed = self.maintenance_repo.wal_checkpoint()
+        return True, f"{checkpointed}/{log_frames} frames copiados" + (" (ocupado)" if busy else "")
+
+    # --- Runs ---
+    def _is_idle(self) -> bool:
+        return self.activity.idle_seconds() >= self.idle_threshold
+
+    def run(self, force: bool = False) -> MaintenanceReportDTO:
+        """
+        Runs every task in order. Unless forced, stops between steps as soon as
+        the facade is used again and reports the run as interrupted.
+        """
+        with self._run_lock:
+            started_at = datetime.now(timezone.utc)
+            started = time.perf_counter()
+            results: list[MaintenanceTaskDTO] = []
+            interrupted = False
+
+            for name, step in self._tasks:
+                task_started = time.perf_counter()
+                steps = 0
+                detail = ""
+                try:
+                    while True:
+                        if not force and not self._is_idle():
+                            interrupted = True
+                            break
+                        finished, detail = step()
+                        steps += 1
+                        if finished or steps >= self.max_steps:
+                            break
+                except DBError as e:
+                    detail = f"error: {e}"
+                except Exception as e:
+                    logger.exception("maintenance task %s [Unexpected error]", name)
+                    detail = f"error: {e}"
+
+                results.append(MaintenanceTaskDTO(
+                    name=name,
+                    steps=steps,
+                    detail=detail,
+                    seconds=round(time.perf_counter() - task_started, 4)
+                ))
+                if interrupted:
+                    break
+
+            report = MaintenanceReportDTO(
+                started_at=started_at,
+                seconds=round(time.perf_counter() - started, 4),
+                interrupted=interrupted,
+                tasks=results
+            )
+            self._last_report = report
+            if not interrupted:
+                self._last_run = time.monotonic()
+            logger.info(
+                "maintenance run [%s] - %.4fs: %s",
+                "Interrupted" if interrupted else "Success",
+                report.seconds,
+                "; ".join(f"{t.name}={t.detail} ({t.seconds}s)" for t in results)
+            )
+            return report
+
+    def last_report(self) -> MaintenanceReportDTO | None:
+        return self._last_report
+
+    # --- Background scheduler ---
+    def _loop(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            if self._is_idle() and time.monotonic() - self._last_run >= self.run_interval:
+                self.run()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.maintenance_repo.close()
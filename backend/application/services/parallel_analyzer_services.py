@@ -0,0 +1,60 @@
+from log import logger
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from backend.domain.dto.note_stats_dto import NoteStatsDTO
+
+from backend.application.services.analyzer_services import AnalyzerService
+
+_worker_analyzer: AnalyzerService | None = None
+
+
+def _note_stats_chunk(rows: list[tuple[int, str | None]]) -> list[tuple[int, NoteStatsDTO]]:
+    """Runs in a worker process: the stats update_note_content would store, for each note of the chunk."""
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        _worker_analyzer = AnalyzerService()
+    return [(note_id, _worker_analyzer.note_stats(content)) for note_id, content in rows]
+
+
+class ParallelAnalyzerService:
+    """
+    Per-note stats for many notes at once over a process pool: the notes are
+    split into chunks and each worker tokenizes its chunk with the same rules.
+    Below min_notes starting pool work costs more than it saves, so they are
+    analyzed in this process. Workers are spawned, not forked: the maintenance
+    and thumbnail threads are already running when the pool starts.
+    """
+    def __init__(self, analyzer: AnalyzerService, workers: int | None = None,
+                 notes_per_chunk: int = 64, min_notes: int = 200):
+        self.analyzer = analyzer
+        self.workers = workers or os.cpu_count() or 1
+        self.notes_per_chunk = notes_per_chunk
+        self.min_notes = min_notes
+        self._pool: ProcessPoolExecutor | None = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Created on first use so opening a vault does not spawn processes
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def note_stats_many(self, rows: list[tuple[int, str | None]]) -> dict[int, NoteStatsDTO]:
+        """Stats of each (note_id, content) pair, keyed by note id."""
+        if self.workers < 2 or len(rows) < self.min_notes:
+            return {note_id: self.analyzer.note_stats(content) for note_id, content in rows}
+
+        # Several chunks per worker so one long note does not leave the other cores idle
+        size = max(1, min(self.notes_per_chunk, len(rows) // (self.workers * 4) or 1))
+        chunks = [rows[i:i + size] for i in range(0, len(rows), size)]
+        stats: dict[int, NoteStatsDTO] = {}
+        for part in self._get_pool().map(_note_stats_chunk, chunks):
+            stats.update(part)
+        logger.info("note_stats_many(n=%d, chunks=%d) [Success]", len(rows), len(chunks))
+        return stats
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,81 @@
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+
+from backend.infrastructure.dto.time_series_record_dto import TimeSeriesRecordDTO
+
+from backend.application.dto.time_series_dto import TimeSeriesDTO
+
+EPOCH = date(1970, 1, 1)
+# 1970-01-01 was a Thursday: shifting by 3 makes Monday weekday 0 and starts weeks on Monday
+WEEKDAY_SHIFT = 3
+ROLLING_SHORT, ROLLING_LONG = 7, 30
+
+
+class TimeSeriesService:
+    """
+    Time analytics over time-record arrays. Everything is a NumPy operation over
+    the records (bincount) or over the daily series (cumsum, diff), so the cost
+    is one pass over the sessions plus one over the days covered.
+    """
+    @staticmethod
+    def _to_date(day: int) -> date:
+        return EPOCH + timedelta(days=int(day))
+
+    @staticmethod
+    def rolling_mean(daily: np.ndarray, window: int) -> np.ndarray:
+        """Mean of the last `window` days; the first days average over the ones available."""
+        totals = np.concatenate(([0.0], np.cumsum(daily)))
+        ends = np.arange(1, len(daily) + 1)
+        starts = np.maximum(ends - window, 0)
+        return (totals[ends] - totals[starts]) / (ends - starts)
+
+    @staticmethod
+    def streaks(active: np.ndarray) -> tuple[int, int]:
+        """(longest, current) runs of active days; the current run may end today or yesterday."""
+        edges = np.diff(np.concatenate(([0], active.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        if len(starts) == 0:
+            return 0, 0
+        lengths = ends - starts
+        current = int(lengths[-1]) if ends[-1] >= len(active) - 1 else 0
+        return int(lengths.max()), current
+
+    def build(self, records: TimeSeriesRecordDTO, today: date | None = None) -> TimeSeriesDTO:
+        today = today or datetime.now(timezone.utc).date()
+        days, minutes = records.days, records.minutes
+        if len(days) == 0:
+            return TimeSeriesDTO(
+                first_day=None, daily_minutes=[], rolling_7_minutes=[], rolling_30_minutes=[],
+                first_week=None, weekly_minutes=[], weekday_minutes=[0.0] * 7, weekday_sessions=[0] * 7,
+                longest_streak=0, current_streak=0, n_sessions=0, minutes_total=0.0, n_days_active=0
+            )
+
+        first_day = int(days.min())
+        last_day = max(int(days.max()), (today - EPOCH).days)
+        daily = np.bincount(days - first_day, weights=minutes, minlength=last_day - first_day + 1)
+        sessions_per_day = np.bincount(days - first_day, minlength=len(daily))
+        longest, current = self.streaks(sessions_per_day > 0)
+
+        weeks = (days + WEEKDAY_SHIFT) // 7
+        first_week = int(weeks.min())
+        last_week = (last_day + WEEKDAY_SHIFT) // 7
+        weekly = np.bincount(weeks - first_week, weights=minutes, minlength=last_week - first_week + 1)
+
+        weekdays = (days + WEEKDAY_SHIFT) % 7
+        return TimeSeriesDTO(
+            first_day=self._to_date(first_day),
+            daily_minutes=daily.tolist(),
+            rolling_7_minutes=self.rolling_mean(daily, ROLLING_SHORT).tolist(),
+            rolling_30_minutes=self.rolling_mean(daily, ROLLING_LONG).tolist(),
+            first_week=self._to_date(first_week * 7 - WEEKDAY_SHIFT),
+            weekly_minutes=weekly.tolist(),
+            weekday_minutes=np.bincount(weekdays, weights=minutes, minlength=7).tolist(),
+            weekday_sessions=np.bincount(weekdays, minlength=7).tolist(),
+            longest_streak=longest,
+            current_streak=current,
+            n_sessions=len(days),
+            minutes_total=float(minutes.sum()),
+            n_days_active=int(np.count_nonzero(sessions_per_day))
+        )
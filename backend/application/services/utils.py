@@ -30,3 +30,25 @@ def generate_unique_name(base_name: str, sibling_names: list[str]) -> str:
     
     return f"{clean_name} ({proximo_sufijo})"
 
+
+
+"""
+Same naming rule as generate_unique_name for a whole batch in one pass:
+every generated name is reserved for the following ones.
+"""
+def generate_unique_names(base_names: list[str], sibling_names: list[str]) -> list[str]:
+    taken = set(sibling_names)
+    next_suffix: dict[str, int] = {}
+    result = []
+    for base_name in base_names:
+        clean_name = base_name.strip()
+        name = clean_name
+        if name in taken:
+            counter = next_suffix.get(clean_name, 2)
+            while f"{clean_name} ({counter})" in taken:
+                counter += 1
+            name = f"{clean_name} ({counter})"
+            next_suffix[clean_name] = counter + 1
+        taken.add(name)
+        result.append(name)
+    return result
@@ -0,0 +1,31 @@
+from log import logger
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from backend.application.backend_api import BackendAPI
+from backend.application.results.operation_result import OperationResult
+
+
+class VaultService:
+    """Runs the same facade call on several vaults in parallel."""
+    def __init__(self, max_workers: int = 4):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vault")
+
+    def fan_out(self, apis: dict[str, BackendAPI],
+                call: Callable[[str, BackendAPI], OperationResult]) -> dict[str, OperationResult]:
+        """
+        call receives (vault_name, api). Each vault has its own engine and session, and a session is only used
+        by one worker at a time, so vaults never share connections.
+        """
+        futures = {name: self._pool.submit(call, name, api) for name, api in apis.items()}
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception:
+                logger.exception("fan_out(vault=%s) [Unexpected error]", name)
+                results[name] = OperationResult(False, "Ocurrió un error interno", None)
+        return results
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True)
@@ -0,0 +1,45 @@
+from backend.infrastructure.repositories.backup_repository import BackupRepository
+from backend.infrastructure.dto.backup_record_dto import BackupRecordDTO
+
+from backend.application.decorators.usecase_guard import handle_usecase_errors
+from backend.application.results.operation_result import OperationResult
+from backend.application.dto.backup_report_dto import BackupReportDTO
+from backend.application.services.heatmap_services import HeatmapService
+
+
+def _to_report(record: BackupRecordDTO) -> BackupReportDTO:
+    return BackupReportDTO(
+        snapshot_dir=record.snapshot_dir,
+        db_pages=record.db_pages,
+        files_copied=record.files_copied,
+        files_linked=record.files_linked,
+        bytes_copied=record.bytes_copied,
+        seconds=record.seconds
+    )
+
+# --- OPERATIONS ---
+@handle_usecase_errors
+def create_backup(backup_repo: BackupRepository, dest_dir: str) -> OperationResult[BackupReportDTO]:
+    if not dest_dir.strip():
+        return OperationResult(False, "La carpeta de respaldo no puede estar vacía", None)
+    record = backup_repo.create_snapshot(dest_dir)
+    return OperationResult(True, "Respaldo creado exitosamente", _to_report(record))
+
+@handle_usecase_errors
+def restore_backup(backup_repo: BackupRepository,
+                   heatmap_service: HeatmapService,
+                   snapshot_dir: str) -> OperationResult[BackupReportDTO]:
+    bad_files = backup_repo.verify_snapshot(snapshot_dir)
+    if bad_files:
+        return OperationResult(False, f"El respaldo está dañado: {len(bad_files)} archivos no coinciden con el manifiesto", None)
+    record = backup_repo.restore_snapshot(snapshot_dir)
+    heatmap_service.clear()
+    return OperationResult(True, "Respaldo restaurado exitosamente", _to_report(record))
+
+# ------ QUERIES -----
+@handle_usecase_errors
+def verify_backup(backup_repo: BackupRepository, snapshot_dir: str) -> OperationResult[list[str]]:
+    bad_files = backup_repo.verify_snapshot(snapshot_dir)
+    if bad_files:
+        return OperationResult(False, f"El respaldo está dañado: {len(bad_files)} archivos no coinciden con el manifiesto", bad_files)
+    return OperationResult(True, "Respaldo verificado correctamente", bad_files)
@@ -1,4 +1,8 @@
+import io
 import os
+import threading
+import time
+from typing import Callable
 
 from backend.infrastructure.repositories.image_repository import ImageRepository
 from backend.infrastructure.repositories.theme_repository import ThemeRepository
@@ -8,10 +12,20 @@ from backend.application.decorators.usecase_guard import handle_usecase_errors
 from backend.application.results.operation_result import OperationResult
 from backend.application.dto.image_summary_dto import ImageSummaryDTO
 from backend.application.dto.image_detail_dto import ImageDetailDTO
+from backend.application.dto.trash_report_dto import TrashReportDTO
+from backend.application.dto.image_store_report_dto import ImageStoreReportDTO
+from backend.application.dto.image_store_repair_dto import ImageStoreRepairDTO
+from backend.application.dto.image_dedup_report_dto import ImageDedupReportDTO
+from backend.application.dto.image_import_item_dto import ImageImportItemDTO
+from backend.application.dto.image_import_report_dto import ImageImportReportDTO
+from backend.application.dto.image_export_report_dto import ImageExportReportDTO
+from backend.application.services.utils import generate_unique_names
 from backend.application.services.image_services import ImageService 
 
-from backend.domain.models.image import Image
+from backend.domain.models.image import Image, SUPPORTED_EXTENSIONS
+from backend.domain.errors.image_errors import ImageDomainError
 from backend.domain.dto.new_image_dto import NewImageDTO
+from backend.domain.dto.new_image_source_dto import NewImageSourceDTO
 
 # --- OPERATIONS ---
 @handle_usecase_errors
@@ -28,6 +42,97 @@ def create_image(image_repo: ImageRepository,
     
     return OperationResult(True, "Imagen guardada exitosamente", image_id)
 
+@handle_usecase_errors
+def create_image_from_source(image_repo: ImageRepository,
+                             image_services: ImageService,
+                             name: str,
+                             source: str | io.IOBase,
+                             extension: str,
+                             theme_id: int | None = None
+                             ) -> OperationResult[int]:
+    """Importa desde una ruta o un stream binario sin cargar el archivo completo en memoria."""
+    sibling_names = image_services.get_names_in_theme_id(theme_id)
+    image_dto: NewImageSourceDTO = Image.create_from_source(name, source, set(sibling_names), extension, theme_id)
+    image_id = image_repo.add_from_source(image_dto)
+    
+    return OperationResult(True, "Imagen guardada exitosamente", image_id)
+
+def _list_image_files(directory: str, recursive: bool) -> list[str]:
+    if recursive:
+        paths = [os.path.join(root, f) for root, _, files in os.walk(directory) for f in files]
+    else:
+        paths = [entry.path for entry in os.scandir(directory) if entry.is_file()]
+    return sorted(p for p in paths if os.path.splitext(p)[1][1:].lower() in SUPPORTED_EXTENSIONS)
+
+_IMPORT_ERRORS = {
+    "invalid_content": "El archivo no es una imagen válida",
+    "file_error": "No se pudo leer o copiar el archivo",
+    "cancelled": "Importación cancelada",
+}
+
+@handle_usecase_errors
+def import_image_folder(image_repo: ImageRepository,
+                        image_services: ImageService,
+                        theme_repo: ThemeRepository,
+                        directory: str,
+                        theme_id: int | None = None,
+                        recursive: bool = False,
+                        progress: Callable[[int, int], None] | None = None,
+                        cancel: threading.Event | None = None
+                        ) -> OperationResult[ImageImportReportDTO]:
+    """Importa todas las imágenes de una carpeta en paralelo y en una sola transacción."""
+    started = time.perf_counter()
+    if theme_id and not theme_repo.get_by_id(theme_id):
+        return OperationResult(False, "El tema destino no existe", None)
+    if not os.path.isdir(directory):
+        return OperationResult(False, "La carpeta no existe", None)
+
+    paths = _list_image_files(directory, recursive)
+    sibling_names = image_services.get_names_in_theme_id(theme_id)
+    names = generate_unique_names([os.path.basename(p) for p in paths], sibling_names)
+
+    items: dict[int, ImageImportItemDTO] = {}
+    sources, positions = [], []
+    for i, (path, name) in enumerate(zip(paths, names)):
+        try:
+            extension = os.path.splitext(path)[1][1:]
+            sources.append(Image.create_from_source(name, path, set(sibling_names), extension, theme_id))
+            positions.append(i)
+        except ImageDomainError as e:
+            items[i] = ImageImportItemDTO(source=path, name=name, image_id=None, status="failed", detail=str(e))
+
+    records = image_repo.add_many_from_sources(sources, progress=progress, cancel=cancel)
+    for i, record in zip(positions, records):
+        if record.error == "cancelled":
+            status = "cancelled"
+        elif record.error:
+            status = "failed"
+        else:
+            status = "duplicate" if record.reused else "imported"
+        items[i] = ImageImportItemDTO(
+            source=paths[i],
+            name=names[i],
+            image_id=record.image_id,
+            status=status,
+            detail=_IMPORT_ERRORS.get(record.error, "Contenido ya almacenado" if record.reused else "")
+        )
+
+    ordered = [items[i] for i in range(len(paths))]
+    report = ImageImportReportDTO(
+        total=len(paths),
+        imported=sum(1 for item in ordered if item.status == "imported"),
+        duplicates=sum(1 for item in ordered if item.status == "duplicate"),
+        failed=sum(1 for item in ordered if item.status == "failed"),
+        cancelled=cancel is not None and cancel.is_set(),
+        seconds=round(time.perf_counter() - started, 3),
+        items=ordered
+    )
+    if report.cancelled:
+        return OperationResult(False, "Importación cancelada: no se importó ninguna imagen", report)
+    info = (f"{report.imported + report.duplicates} imágenes importadas"
+            f" ({report.duplicates} con contenido repetido), {report.failed} con errores")
+    return OperationResult(True, info, report)
+
 @handle_usecase_errors
 def delete_many_images(image_repo: ImageRepository, image_ids: list[int]) -> OperationResult[None]:
     image_repo.delete_many(image_ids)
@@ -75,6 +180,97 @@ def move_image_to_theme(image_repo: ImageRepository,
     image_repo.update(image)
     return OperationResult(True, "Imagen movida exitosamente", None)
 
+@handle_usecase_errors
+def empty_image_trash(image_repo: ImageRepository) -> OperationResult[TrashReportDTO]:
+    record = image_repo.collect_trash()
+    report = TrashReportDTO(
+        files_scanned=record.scanned,
+        files_deleted=record.deleted,
+        bytes_freed=record.bytes_freed,
+        bytes_remaining=record.bytes_remaining,
+        seconds=record.seconds
+    )
+    return OperationResult(True, f"Papelera limpiada: {record.deleted} archivos eliminados", report)
+
+@handle_usecase_errors
+def repair_image_store(image_repo: ImageRepository,
+                       remove_missing: bool = True,
+                       trash_orphans: bool = True,
+                       accept_sizes: bool = False) -> OperationResult[ImageStoreRepairDTO]:
+    record = image_repo.reconcile_store()
+    rows_removed, files_trashed, sizes_updated = image_repo.repair_store(
+        record, remove_missing, trash_orphans, accept_sizes
+    )
+    repair = ImageStoreRepairDTO(
+        rows_removed=rows_removed,
+        files_trashed=files_trashed,
+        sizes_updated=sizes_updated
+    )
+    return OperationResult(True, "Almacén de imágenes reparado", repair)
+
+@handle_usecase_errors
+def export_image(image_repo: ImageRepository, image_id: int, dest_path: str) -> OperationResult[None]:
+    if not os.path.isdir(os.path.dirname(os.path.abspath(dest_path))):
+        return OperationResult(False, "La carpeta destino no existe", None)
+    if image_repo.export(image_id, dest_path) is None:
+        return OperationResult(False, "Imagen no encontrada", None)
+    return OperationResult(True, "Imagen exportada correctamente", None)
+
+@handle_usecase_errors
+def export_theme_images(image_repo: ImageRepository,
+                        theme_repo: ThemeRepository,
+                        theme_id: int,
+                        dest_dir: str,
+                        progress: Callable[[int, int], None] | None = None
+                        ) -> OperationResult[ImageExportReportDTO]:
+    """Exporta las imágenes del tema y sus subtemas respetando la estructura de carpetas."""
+    if not theme_repo.get_by_id(theme_id):
+        return OperationResult(False, "El tema no existe", None)
+    if not os.path.isdir(dest_dir):
+        return OperationResult(False, "La carpeta destino no existe", None)
+
+    record = image_repo.export_theme(theme_id, dest_dir, progress)
+    report = ImageExportReportDTO(
+        folder=record.root_dir,
+        files_exported=record.files,
+        bytes_copied=record.bytes_copied,
+        failed_image_ids=[image_id for image_id, _ in record.failed],
+        seconds=record.seconds
+    )
+    info = f"{record.files} imágenes exportadas en {record.root_dir}"
+    if record.failed:
+        info += f" ({len(record.failed)} no se pudieron copiar)"
+    return OperationResult(True, info, report)
+
+@handle_usecase_errors
+def backfill_image_metadata(image_repo: ImageRepository) -> OperationResult[int]:
+    record = image_repo.backfill_metadata()
+    info = f"Metadatos guardados para {record.rows_updated} imágenes"
+    if record.unreadable:
+        info += f" ({record.unreadable} archivos ilegibles)"
+    return OperationResult(True, info, record.rows_updated)
+
+@handle_usecase_errors
+def migrate_image_layout(image_repo: ImageRepository) -> OperationResult[int]:
+    record = image_repo.migrate_layout()
+    info = f"Archivos de imagen reubicados: {record.files_moved}"
+    if record.missing:
+        info += f" ({record.missing} archivos no encontrados)"
+    return OperationResult(True, info, record.paths_rewritten)
+
+@handle_usecase_errors
+def deduplicate_image_store(image_repo: ImageRepository) -> OperationResult[ImageDedupReportDTO]:
+    record = image_repo.deduplicate()
+    report = ImageDedupReportDTO(
+        images_hashed=record.rows_hashed,
+        blobs_created=record.blobs_created,
+        duplicates_removed=record.duplicates_removed,
+        bytes_freed=record.bytes_freed,
+        missing_files=record.missing,
+        seconds=record.seconds
+    )
+    return OperationResult(True, f"Imágenes deduplicadas: {record.duplicates_removed} copias eliminadas", report)
+
 # ------ QUERIES -----
 @handle_usecase_errors
 def get_image_details(image_repo: ImageRepository, image_id: int) -> OperationResult[ImageDetailDTO]:
@@ -88,7 +284,13 @@ def get_image_details(image_repo: ImageRepository, image_id: int) -> OperationRe
         name = image._name,
         file_path = image._file_path, 
         theme_id = image._theme_id,
-        created_at = image._created_at
+        created_at = image._created_at,
+        byte_size = image._byte_size,
+        width = image._width,
+        height = image._height,
+        format = image._format,
+        orientation = image._orientation or 1,
+        taken_at = image._taken_at
     )
 
     return OperationResult(True, "Datos de imagen obtenidos", image_dto)
@@ -145,7 +347,55 @@ def get_image_extension(image_repo: ImageRepository, image_id: int) -> Operation
     return OperationResult(True, "Extensión obtenida", clean_ext)
 
 
+@handle_usecase_errors
+def get_image_thumbnail(image_repo: ImageRepository, image_id: int, size: int) -> OperationResult[str]:
+    """
+    Path of a cached thumbnail of the image. Returns at once when it is cached and
+    fresh; otherwise it blocks until it has been rendered.
+    """
+    if size not in image_repo.thumbnails.sizes:
+        return OperationResult(False, "Tamaño de miniatura no soportado", None)
+    future = image_repo.get_thumbnail(image_id, size)
+    if future is None:
+        return OperationResult(False, "Imagen no encontrada", None)
+    if future.exception() is not None:
+        return OperationResult(False, "No se pudo generar la miniatura", None)
+    return OperationResult(True, "Miniatura obtenida", future.result())
+
+
+@handle_usecase_errors
+def request_image_thumbnail(image_repo: ImageRepository, image_id: int, size: int,
+                            on_ready: Callable[[str | None], None]) -> OperationResult[None]:
+    """
+    Non-blocking get_image_thumbnail: on_ready(path) is called once the thumbnail is
+    cached (right away if it already was, otherwise from another thread), or
+    on_ready(None) if it could not be rendered.
+    """
+    if size not in image_repo.thumbnails.sizes:
+        return OperationResult(False, "Tamaño de miniatura no soportado", None)
+    future = image_repo.get_thumbnail(image_id, size)
+    if future is None:
+        return OperationResult(False, "Imagen no encontrada", None)
+    future.add_done_callback(lambda f: on_ready(None if f.cancelled() or f.exception() else f.result()))
+    return OperationResult(True, "Miniatura solicitada", None)
+
+
 @handle_usecase_errors
 def get_image_ids_by_theme_hierarchy(theme_id: int, search_repo: SearchEfficiencyRepository) -> OperationResult[list[int]]:
     ids_images = search_repo.get_images_from_theme_and_descendants(theme_id)
-    return OperationResult(True, "", ids_images)
\ No newline at end of file
+    return OperationResult(True, "", ids_images)
+
+@handle_usecase_errors
+def check_image_store(image_repo: ImageRepository) -> OperationResult[ImageStoreReportDTO]:
+    record = image_repo.reconcile_store()
+    report = ImageStoreReportDTO(
+        n_images=record.n_rows,
+        n_files=record.n_files,
+        missing_image_ids=[image_id for image_id, _ in record.missing],
+        orphaned_files=record.orphaned,
+        size_mismatch_image_ids=[image_id for image_id, _, _ in record.size_mismatches],
+        seconds=record.seconds
+    )
+    is_clean = not (report.missing_image_ids or report.orphaned_files or report.size_mismatch_image_ids)
+    info = "El almacén de imágenes está íntegro" if is_clean else "Se encontraron inconsistencias en el almacén de imágenes"
+    return OperationResult(True, info, report)
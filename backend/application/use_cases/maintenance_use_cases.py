@@ -0,0 +1,18 @@
+from backend.application.decorators.usecase_guard import handle_usecase_errors
+from backend.application.results.operation_result import OperationResult
+from backend.application.dto.maintenance_report_dto import MaintenanceReportDTO
+from backend.application.services.maintenance_services import MaintenanceService
+
+# --- OPERATIONS ---
+@handle_usecase_errors
+def run_maintenance(maintenance_service: MaintenanceService) -> OperationResult[MaintenanceReportDTO]:
+    report = maintenance_service.run(force=True)
+    return OperationResult(True, "Mantenimiento completado", report)
+
+# ------ QUERIES -----
+@handle_usecase_errors
+def get_last_maintenance_report(maintenance_service: MaintenanceService) -> OperationResult[MaintenanceReportDTO]:
+    report = maintenance_service.last_report()
+    if report is None:
+        return OperationResult(False, "Aún no se ha ejecutado ningún mantenimiento", None)
+    return OperationResult(True, "Último mantenimiento obtenido", report)
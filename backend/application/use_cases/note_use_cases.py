@@ -1,8 +1,9 @@
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 
 from backend.infrastructure.repositories.note_repository import NoteRepository
 from backend.infrastructure.repositories.theme_repository import ThemeRepository
 from backend.infrastructure.repositories.search_efficiency_repository import SearchEfficiencyRepository
+from backend.infrastructure.repositories.analytics_repository import AnalyticsRepository
 
 from backend.application.decorators.usecase_guard import handle_usecase_errors
 from backend.application.results.operation_result import OperationResult
@@ -11,6 +12,12 @@ from backend.application.dto.note_details_dto import NoteDetailDTO
 from backend.application.dto.note_analytics_dto import NoteAnalyticsDTO
 from backend.application.services.note_services import NoteService
 from backend.application.services.analyzer_services import AnalyzerService
+from backend.application.services.parallel_analyzer_services import ParallelAnalyzerService
+from backend.application.services.time_series_services import TimeSeriesService
+from backend.application.dto.time_series_dto import TimeSeriesDTO
+from backend.application.services.heatmap_services import HeatmapService, SCOPE_NOTE
+from backend.application.dto.heatmap_dto import HeatmapDTO
+from backend.application.services.analytics_cache_services import AnalyticsCacheService
 
 from backend.domain.models.note import Note
 from backend.domain.dto.new_note_dto import NewNoteDTO
@@ -29,16 +36,22 @@ def create_note(note_repo: NoteRepository,
     return OperationResult(True, "Nota creada exitosamente", note_id)
 
 @handle_usecase_errors
-def delete_note(note_repo: NoteRepository, note_id: int) -> OperationResult[None]:
+def delete_note(note_repo: NoteRepository,
+                heatmap_service: HeatmapService,
+                note_id: int) -> OperationResult[None]:
     note = note_repo.get_by_id(note_id)
     if not note:
         return OperationResult(False, "No se pudo eliminar la nota porque no existe", None)
     note_repo.delete(note_id)
+    heatmap_service.clear()
     return OperationResult(True, "Nota eliminada correctamente", None)
 
 @handle_usecase_errors
-def delete_many_notes(note_repo: NoteRepository, note_ids: list[int]) -> OperationResult[None]:
+def delete_many_notes(note_repo: NoteRepository,
+                      heatmap_service: HeatmapService,
+                      note_ids: list[int]) -> OperationResult[None]:
     note_repo.delete_many(note_ids)
+    heatmap_service.clear()
     return OperationResult(True, "Notas eliminadas correctamente", None)
 
 @handle_usecase_errors
@@ -57,6 +70,7 @@ def rename_note(note_repo: NoteRepository,
 def move_to_theme(note_repo: NoteRepository, 
                           theme_repo: ThemeRepository,
                           note_service: NoteService,
+                          heatmap_service: HeatmapService,
                           note_id: int, 
                           new_theme_id: int | None = None) -> OperationResult[None]:
     note = note_repo.get_by_id(note_id)
@@ -69,22 +83,43 @@ def move_to_theme(note_repo: NoteRepository,
     sibling_names = note_service.get_names_in_theme_id(new_theme_id)
     note.change_theme_id(new_theme_id, set(sibling_names))
     note_repo.update(note)
+    # Every session of the note changes theme: any cached day may be off
+    heatmap_service.clear()
     return OperationResult(True, "Tema de la nota actualizado", None)
 
 @handle_usecase_errors
-def update_note_content(note_repo: NoteRepository, note_id: int, content: str) -> OperationResult[None]:
+def update_note_content(note_repo: NoteRepository,
+                        analyzer_service: AnalyzerService,
+                        note_id: int, content: str) -> OperationResult[None]:
     note = note_repo.get_by_id(note_id)
     if not note:
         return OperationResult(False, "No se pudo actualizar el contenido de la nota porque no existe", None)
     """The time must be in UTC."""
     now = datetime.now(timezone.utc)
     note.set_content(content, now)
-    note_repo.update(note)
+    # Lexical stats are saved with the content so theme analytics never re-reads it
+    note_repo.update(note, analyzer_service.note_stats(note._content))
     return OperationResult(True, "Contenido agregado a la nota", None)
 
+@handle_usecase_errors
+def backfill_note_stats(note_repo: NoteRepository,
+                        parallel_analyzer: ParallelAnalyzerService,
+                        batch_size: int = 1000) -> OperationResult[int]:
+    """
+    Stores lexical stats for notes saved before they existed; a no-op once every
+    note has them. Each batch is tokenized over the process pool when it is large.
+    """
+    n_notes = 0
+    while rows := note_repo.get_contents_without_stats(batch_size):
+        note_repo.save_stats_many(parallel_analyzer.note_stats_many(rows))
+        n_notes += len(rows)
+    return OperationResult(True, f"Estadísticas léxicas calculadas para {n_notes} notas", n_notes)
+
 @handle_usecase_errors
 def register_time_to_note(
     note_repo: NoteRepository, 
+                search_repo: SearchEfficiencyRepository,
+                heatmap_service: HeatmapService,
                 minutes: float, note_id: int) -> OperationResult[None]:
     note = note_repo.get_by_id(note_id)
     if not note:
@@ -93,6 +128,10 @@ def register_time_to_note(
     now = datetime.now(timezone.utc)
     note.add_minutes(minutes, now)
     note_repo.add_time_record(note_id, minutes)
+    # The record is stamped on insert: around midnight it may fall on the next day
+    days = {now.date(), datetime.now(timezone.utc).date()}
+    theme_ids = search_repo.get_theme_ancestors_ids(note._theme_id) if note._theme_id is not None else []
+    heatmap_service.invalidate_days(days, note_id, theme_ids)
     return OperationResult(True, "Se creó el tiempo correctamente", None)
 
 # ------ QUERIES -----
@@ -151,11 +190,33 @@ def get_notes_without_themes(note_repo: NoteRepository) -> OperationResult[list[
     return OperationResult(True, "Todas las notas sin padres han sido"\
                                "listadas", notes_dto)
 
+@handle_usecase_errors
+def search_notes(note_repo: NoteRepository, query: str) -> OperationResult[list[NoteSummaryDTO]]:
+    clean_query = query.strip()
+    if not clean_query:
+        return OperationResult(False, "La búsqueda no puede estar vacía", None)
+    notes = note_repo.search(clean_query)
+    notes_dto = [NoteSummaryDTO(
+        id = n.id,
+        name = n.name
+    ) for n in notes]
+    return OperationResult(True, f"{len(notes_dto)} notas encontradas", notes_dto)
+
 @handle_usecase_errors
 def get_note_analytics(note_repo: NoteRepository, 
+                       analy_repo: AnalyticsRepository,
                        analyzer_service: AnalyzerService,
+                       analytics_cache: AnalyticsCacheService,
                        note_id: int) -> OperationResult[NoteAnalyticsDTO]:
     
+    stamp = analy_repo.get_note_version_stamp(note_id)
+    if stamp is None:
+        return OperationResult(False, "No se pudo obtener las analiticas de la nota porque la nota dada es inexistente", None)
+    cache_key = ("note", note_id)
+    cached = analytics_cache.get(cache_key, stamp)
+    if cached is not None:
+        return OperationResult(True, "Success", obj=cached)
+
     note = note_repo.get_by_id(note_id)
     if not note:
         return OperationResult(False, "No se pudo obtener las analiticas de la nota porque la nota dada es inexistente", None)
@@ -164,11 +225,8 @@ def get_note_analytics(note_repo: NoteRepository,
     n_sessions = note_repo.get_time_records_count(note_id)
     n_days_active = note_repo.get_active_days_count(note_id)
 
-    text = note._content
-    n_words_total = analyzer_service.count_total(text)
-    n_meaningful = analyzer_service.count_meaningful(text)
-    n_unique = analyzer_service.count_unique(text)
-    lexical_rate = analyzer_service.get_diversity(n_unique, n_meaningful)
+    stats = analyzer_service.analyze(note._content)
+    lexical_rate = analyzer_service.get_diversity(stats.n_unique, stats.n_meaningful)
     
     note_analytics = NoteAnalyticsDTO(
         name=note._name,
@@ -177,14 +235,79 @@ def get_note_analytics(note_repo: NoteRepository,
         minutes_total=note._minutes,
         n_sessions=n_sessions,
         n_days_active=n_days_active,
-        n_words_total=n_words_total,
-        n_content_words_total=n_meaningful,
-        n_u_content_words_totals=n_unique,
+        n_words_total=stats.n_words_total,
+        n_content_words_total=stats.n_meaningful,
+        n_u_content_words_totals=stats.n_unique,
         lexical_diversity_rate=lexical_rate
     )
+    analytics_cache.put(cache_key, stamp, note_analytics)
     
     return OperationResult(True, "Success", obj=note_analytics)
 
 
     
-    
\ No newline at end of file
+    
+
+@handle_usecase_errors
+def get_note_analytics_many(analy_repo: AnalyticsRepository,
+                            analyzer_service: AnalyzerService,
+                            note_ids: list[int]) -> OperationResult[dict[int, NoteAnalyticsDTO]]:
+    """Same DTO as get_note_analytics for each id, from one query; only notes without stored stats are tokenized."""
+    records = {r.id: r for r in analy_repo.get_note_analytics_records(list(dict.fromkeys(note_ids)))}
+
+    analytics: dict[int, NoteAnalyticsDTO] = {}
+    for note_id in note_ids:
+        r = records.get(note_id)
+        if r is None or note_id in analytics:
+            continue
+        if r.n_words_total is None:
+            stats = analyzer_service.analyze(r.content)
+            n_words_total, n_meaningful, n_unique = stats.n_words_total, stats.n_meaningful, stats.n_unique
+        else:
+            n_words_total, n_meaningful, n_unique = r.n_words_total, r.n_meaningful, r.n_unique
+        analytics[note_id] = NoteAnalyticsDTO(
+            name=r.name,
+            created_at=r.created_at,
+            last_edited_at=r.last_edited_at,
+            minutes_total=r.minutes_total,
+            n_sessions=r.n_sessions,
+            n_days_active=r.n_days_active,
+            n_words_total=n_words_total,
+            n_content_words_total=n_meaningful,
+            n_u_content_words_totals=n_unique,
+            lexical_diversity_rate=analyzer_service.get_diversity(n_unique, n_meaningful)
+        )
+
+    n_missing = len(set(note_ids)) - len(analytics)
+    info = f"Analíticas de {len(analytics)} notas calculadas"
+    if n_missing:
+        info += f"; {n_missing} notas no existen"
+    return OperationResult(True, info, obj=analytics)
+
+@handle_usecase_errors
+def get_note_time_series(note_repo: NoteRepository,
+                         analy_repo: AnalyticsRepository,
+                         time_series_service: TimeSeriesService,
+                         note_id: int) -> OperationResult[TimeSeriesDTO]:
+    if not note_repo.get_by_id(note_id):
+        return OperationResult(False, "No se pudo obtener la serie temporal porque la nota dada es inexistente", None)
+    series = time_series_service.build(analy_repo.get_time_series(note_id=note_id))
+    return OperationResult(True, "Success", obj=series)
+
+@handle_usecase_errors
+def get_note_heatmap(note_repo: NoteRepository,
+                     analy_repo: AnalyticsRepository,
+                     heatmap_service: HeatmapService,
+                     note_id: int,
+                     start: date | None = None,
+                     end: date | None = None) -> OperationResult[HeatmapDTO]:
+    if not note_repo.get_by_id(note_id):
+        return OperationResult(False, "No se pudo obtener el mapa de actividad porque la nota dada es inexistente", None)
+    start, end = heatmap_service.resolve_range(start, end)
+    if start > end:
+        return OperationResult(False, "La fecha inicial del mapa de actividad es posterior a la final", None)
+    daily = heatmap_service.daily_minutes(
+        (SCOPE_NOTE, note_id, start, end),
+        lambda days: analy_repo.get_daily_minutes(start, end, note_id=note_id, days=days)
+    )
+    return OperationResult(True, "Success", obj=heatmap_service.build(start, end, daily))
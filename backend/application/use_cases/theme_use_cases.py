@@ -1,16 +1,26 @@
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
+from itertools import groupby
 
 from backend.infrastructure.repositories.theme_repository import ThemeRepository
+from backend.infrastructure.repositories.image_repository import ImageRepository
 from backend.infrastructure.repositories.analytics_repository import AnalyticsRepository
 from backend.infrastructure.repositories.search_efficiency_repository import SearchEfficiencyRepository
+from backend.infrastructure.dto.note_lexical_record_dto import NoteLexicalRecordDTO
 
 from backend.application.decorators.usecase_guard import handle_usecase_errors
 from backend.application.dto.theme_details_dto import ThemeDetailDTO
 from backend.application.results.operation_result import OperationResult
 from backend.application.dto.theme_summary_dto import ThemeSummaryDTO
 from backend.application.services.analyzer_services import AnalyzerService
+from backend.application.services.hyperloglog import HyperLogLog
 from backend.application.dto.theme_analytics_dto import ThemeAnalyticsDTO
+from backend.application.dto.text_stats_dto import TextStatsDTO
 from backend.application.services.theme_services import ThemeService
+from backend.application.services.time_series_services import TimeSeriesService
+from backend.application.dto.time_series_dto import TimeSeriesDTO
+from backend.application.services.heatmap_services import HeatmapService, SCOPE_THEME, SCOPE_VAULT
+from backend.application.dto.heatmap_dto import HeatmapDTO
+from backend.application.services.analytics_cache_services import AnalyticsCacheService
 
 from backend.domain.models.theme import Theme
 
@@ -31,18 +41,29 @@ def create_theme(
     return OperationResult(True, "Tema creado exitosamente", id_theme)
 
 @handle_usecase_errors
-def delete_theme(theme_repo: ThemeRepository, theme_id: int) -> OperationResult[None]:
+def delete_theme(theme_repo: ThemeRepository,
+                 image_repo: ImageRepository,
+                 heatmap_service: HeatmapService,
+                 theme_id: int) -> OperationResult[None]:
     theme = theme_repo.get_by_id(theme_id)
     if not theme:
         return OperationResult(False, "No se pudo eliminar el tema porque no existe", None)
     theme_repo.delete(theme_id)
+    # The cascade drops the image rows; their files go once no blob references them
+    image_repo.sweep_blobs()
+    heatmap_service.clear()
     return OperationResult(successful=True, 
                                 info="Se eliminó correctamente el tema",
                                 obj=None)            
 
 @handle_usecase_errors
-def delete_many_themes(theme_repo: ThemeRepository, theme_ids: list[int]) -> OperationResult[None]:
+def delete_many_themes(theme_repo: ThemeRepository,
+                       image_repo: ImageRepository,
+                       heatmap_service: HeatmapService,
+                       theme_ids: list[int]) -> OperationResult[None]:
     theme_repo.delete_many(theme_ids)
+    image_repo.sweep_blobs()
+    heatmap_service.clear()
     return OperationResult(True, "Temas eliminados correctamente", None)
 
 
@@ -67,6 +88,7 @@ def remove_theme(theme_repo: ThemeRepository,
                            theme_service: ThemeService,
                            theme_id: int, 
                            search_repo: SearchEfficiencyRepository,
+                           heatmap_service: HeatmapService,
                            new_parent_id: int | None = None
                            ) -> OperationResult[None]:
     theme = theme_repo.get_by_id(theme_id)
@@ -83,6 +105,8 @@ def remove_theme(theme_repo: ThemeRepository,
 
     theme.change_parent_id(new_parent_id, set(names_in_theme), descendients)
     theme_repo.update(theme)
+    # The subtree's sessions leave the old ancestors and join the new ones
+    heatmap_service.clear()
     return OperationResult(successful=True, info="Se cambió el padre del tema correctamente", obj=None)
 
 
@@ -159,13 +183,44 @@ def list_root_themes(theme_repo: ThemeRepository) -> OperationResult[list[ThemeS
     return OperationResult(True, f"Temas sin padre listados correctamente",
                                obj=themes_dto)     
 
+def _merge_lexical_stats(records: list[NoteLexicalRecordDTO],
+                         unanalyzed: TextStatsDTO,
+                         exact: bool) -> tuple[int, int]:
+    """
+    Meaningful words add up per note. Unique words are the size of the union of
+    vocabularies when `exact`, else the estimate of the merged HyperLogLog sketches.
+    `unanalyzed` covers the notes without stored stats, analyzed as one stream.
+    """
+    n_meaningful = unanalyzed.n_meaningful + sum(record.n_meaningful for record in records)
+    if exact:
+        vocabulary = set(unanalyzed.frequencies)
+        for record in records:
+            vocabulary |= record.vocabulary
+        return n_meaningful, len(vocabulary)
+
+    sketch = HyperLogLog()
+    sketch.update(unanalyzed.frequencies)
+    for record in records:
+        sketch.merge(HyperLogLog.from_bytes(record.sketch))
+    return n_meaningful, sketch.count()
+
 @handle_usecase_errors
 def get_theme_analytics(analy_repo: AnalyticsRepository,
                       search_repo: SearchEfficiencyRepository,
                       theme_repo: ThemeRepository, 
                       analyzer_service: AnalyzerService,
-                      theme_id: int) -> OperationResult[ThemeAnalyticsDTO]:
+                      analytics_cache: AnalyticsCacheService,
+                      theme_id: int,
+                      exact: bool = False) -> OperationResult[ThemeAnalyticsDTO]:
     
+    stamp = analy_repo.get_theme_version_stamp(theme_id)
+    if stamp is None:
+        return OperationResult(False, "No se pudo obtener las analiticas del tema porque el tema dado es inexistente", None)
+    cache_key = ("theme", theme_id, exact)
+    cached = analytics_cache.get(cache_key, stamp)
+    if cached is not None:
+        return OperationResult(True, "Success", obj=cached)
+
     theme = theme_repo.get_by_id(theme_id)
     if not theme:
         return OperationResult(False, "No se pudo obtener las analiticas del tema porque el tema dado es inexistente", None)
@@ -173,9 +228,11 @@ def get_theme_analytics(analy_repo: AnalyticsRepository,
     raw_stats = analy_repo.get_time_and_note_counts(descendants, theme_id)
     n_notes_directly = analy_repo.count_direct_notes(theme_id)
     n_entities = raw_stats.total_notes + raw_stats.n_subthemes
-    content_total = analy_repo.get_aggregated_content(descendants, theme_id)
-    n_meaningful = analyzer_service.count_meaningful(content_total)
-    n_unique = analyzer_service.count_unique(content_total)
+    records = analy_repo.get_note_lexical_stats(descendants, theme_id, exact)
+    unanalyzed = analyzer_service.analyze_stream(
+        analy_repo.iter_aggregated_content(descendants, theme_id, unanalyzed_only=True, exact=exact)
+    )
+    n_meaningful, n_unique = _merge_lexical_stats(records, unanalyzed, exact)
 
     theme_analytics = ThemeAnalyticsDTO(
         name=theme._name,
@@ -188,5 +245,165 @@ def get_theme_analytics(analy_repo: AnalyticsRepository,
         n_content_words_total=n_meaningful,
         n_u_content_words_totals=n_unique
     )
+    analytics_cache.put(cache_key, stamp, theme_analytics)
+
+    return OperationResult(True, "Success", obj=theme_analytics)
+
+@handle_usecase_errors
+def get_theme_time_series(analy_repo: AnalyticsRepository,
+                          search_repo: SearchEfficiencyRepository,
+                          theme_repo: ThemeRepository,
+                          time_series_service: TimeSeriesService,
+                          theme_id: int) -> OperationResult[TimeSeriesDTO]:
+    if not theme_repo.get_by_id(theme_id):
+        return OperationResult(False, "No se pudo obtener la serie temporal porque el tema dado es inexistente", None)
+    descendants = search_repo.get_theme_descendants_ids(theme_id)
+    series = time_series_service.build(analy_repo.get_time_series(family_theme_ids=descendants))
+    return OperationResult(True, "Success", obj=series)
+
+@handle_usecase_errors
+def get_theme_heatmap(analy_repo: AnalyticsRepository,
+                      search_repo: SearchEfficiencyRepository,
+                      theme_repo: ThemeRepository,
+                      heatmap_service: HeatmapService,
+                      theme_id: int,
+                      start: date | None = None,
+                      end: date | None = None) -> OperationResult[HeatmapDTO]:
+    if not theme_repo.get_by_id(theme_id):
+        return OperationResult(False, "No se pudo obtener el mapa de actividad porque el tema dado es inexistente", None)
+    start, end = heatmap_service.resolve_range(start, end)
+    if start > end:
+        return OperationResult(False, "La fecha inicial del mapa de actividad es posterior a la final", None)
+    daily = heatmap_service.daily_minutes(
+        (SCOPE_THEME, theme_id, start, end),
+        lambda days: analy_repo.get_daily_minutes(
+            start, end, family_theme_ids=search_repo.get_theme_descendants_ids(theme_id), days=days
+        )
+    )
+    return OperationResult(True, "Success", obj=heatmap_service.build(start, end, daily))
+
+@handle_usecase_errors
+def get_vault_heatmap(analy_repo: AnalyticsRepository,
+                      heatmap_service: HeatmapService,
+                      start: date | None = None,
+                      end: date | None = None) -> OperationResult[HeatmapDTO]:
+    start, end = heatmap_service.resolve_range(start, end)
+    if start > end:
+        return OperationResult(False, "La fecha inicial del mapa de actividad es posterior a la final", None)
+    daily = heatmap_service.daily_minutes(
+        (SCOPE_VAULT, None, start, end),
+        lambda days: analy_repo.get_daily_minutes(start, end, days=days)
+    )
+    return OperationResult(True, "Success", obj=heatmap_service.build(start, end, daily))
+
+class _ThemeRollup:
+    """Running totals of a theme's subtree while the post-order pass merges children into parents."""
+    __slots__ = ("n_notes", "minutes", "days", "n_subthemes", "n_meaningful", "vocabulary", "sketch")
+
+    def __init__(self, exact: bool):
+        self.n_notes = 0
+        self.minutes = 0.0
+        self.days: set[str] = set()
+        self.n_subthemes = 0
+        self.n_meaningful = 0
+        self.vocabulary: set[str] | None = set() if exact else None
+        self.sketch: HyperLogLog | None = None if exact else HyperLogLog()
+
+    def n_unique(self) -> int:
+        return len(self.vocabulary) if self.vocabulary is not None else self.sketch.count()
+
+    def absorb(self, child: "_ThemeRollup") -> None:
+        self.n_notes += child.n_notes
+        self.minutes += child.minutes
+        self.n_subthemes += child.n_subthemes + 1
+        self.n_meaningful += child.n_meaningful
+        # Sets are merged small into large: the bigger one is reused, not copied
+        self.days = _union(self.days, child.days)
+        if self.vocabulary is not None:
+            self.vocabulary = _union(self.vocabulary, child.vocabulary)
+        else:
+            self.sketch.merge(child.sketch)
+
+def _union(a: set, b: set) -> set:
+    if len(a) < len(b):
+        a, b = b, a
+    a |= b
+    return a
+
+@handle_usecase_errors
+def get_all_themes_analytics(analy_repo: AnalyticsRepository,
+                             theme_repo: ThemeRepository,
+                             analyzer_service: AnalyzerService,
+                             exact: bool = False) -> OperationResult[dict[int, ThemeAnalyticsDTO]]:
+    """
+    Analytics of every theme at once, by theme id. Direct stats come from grouped
+    queries over the whole vault and are rolled up the tree in one post-order
+    pass, instead of one subtree walk per theme. Same figures as get_theme_analytics.
+    """
+    themes = {t._id: t for t in theme_repo.get_all_themes()}
+    rollups = {theme_id: _ThemeRollup(exact) for theme_id in themes}
+
+    for theme_id, direct in analy_repo.get_direct_stats_by_theme().items():
+        if theme_id in rollups:
+            rollup = rollups[theme_id]
+            rollup.n_notes = direct.n_notes
+            rollup.minutes = direct.minutes
+            rollup.days = set(direct.active_days)
+
+    for record in analy_repo.get_note_lexical_stats(None, None, exact):
+        rollup = rollups.get(record.theme_id)
+        if rollup is None:
+            continue
+        rollup.n_meaningful += record.n_meaningful
+        if exact:
+            rollup.vocabulary |= record.vocabulary
+        else:
+            rollup.sketch.merge(HyperLogLog.from_bytes(record.sketch))
+
+    contents = analy_repo.iter_content_by_theme(unanalyzed_only=True, exact=exact)
+    for theme_id, group in groupby(contents, key=lambda row: row[0]):
+        stats = analyzer_service.analyze_stream(content for _, content in group)
+        rollup = rollups.get(theme_id)
+        if rollup is None:
+            continue
+        rollup.n_meaningful += stats.n_meaningful
+        if exact:
+            rollup.vocabulary.update(stats.frequencies)
+        else:
+            rollup.sketch.update(stats.frequencies)
+
+    children: dict[int, list[int]] = {}
+    roots = []
+    for theme in themes.values():
+        if theme._parent_id in themes:
+            children.setdefault(theme._parent_id, []).append(theme._id)
+        else:
+            roots.append(theme._id)
+    preorder = []
+    stack = roots
+    while stack:
+        theme_id = stack.pop()
+        preorder.append(theme_id)
+        stack.extend(children.get(theme_id, ()))
+
+    analytics: dict[int, ThemeAnalyticsDTO] = {}
+    direct_notes = {theme_id: rollup.n_notes for theme_id, rollup in rollups.items()}
+    # Reversed preorder visits every child before its parent
+    for theme_id in reversed(preorder):
+        theme = themes[theme_id]
+        rollup = rollups.pop(theme_id)
+        analytics[theme_id] = ThemeAnalyticsDTO(
+            name=theme._name,
+            created_at=theme._created_at,
+            last_edited_at=theme._last_edited_at,
+            minutes_total=rollup.minutes,
+            n_notes_directly=direct_notes[theme_id],
+            n_entities=rollup.n_notes + rollup.n_subthemes,
+            n_days_active=len(rollup.days),
+            n_content_words_total=rollup.n_meaningful,
+            n_u_content_words_totals=rollup.n_unique()
+        )
+        if theme._parent_id in rollups:
+            rollups[theme._parent_id].absorb(rollup)
 
-    return OperationResult(True, "Success", obj=theme_analytics)
\ No newline at end of file
+    return OperationResult(True, f"Analíticas de {len(analytics)} temas calculadas", obj=analytics)
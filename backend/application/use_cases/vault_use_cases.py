@@ -0,0 +1,67 @@
+from backend.application.backend_api import BackendAPI
+from backend.application.decorators.usecase_guard import handle_usecase_errors
+from backend.application.results.operation_result import OperationResult
+from backend.application.dto.vault_item_dto import VaultItemDTO
+from backend.application.services.vault_services import VaultService
+
+
+def _merge(results: dict[str, OperationResult]) -> tuple[list[VaultItemDTO], list[str]]:
+    """Tags every item with its vault. Returns (items, failed_vaults)."""
+    items, failed = [], []
+    for vault, res in results.items():
+        if not res.successful or res.obj is None:
+            failed.append(vault)
+            continue
+        items.extend(VaultItemDTO(vault=vault, item=obj) for obj in res.obj)
+    return items, failed
+
+def _info(n_items: int, failed: list[str]) -> str:
+    if failed:
+        return f"{n_items} resultados; fallaron las bóvedas: {', '.join(sorted(failed))}"
+    return f"{n_items} resultados"
+
+# ------ QUERIES -----
+@handle_usecase_errors
+def list_root_themes_across_vaults(vault_service: VaultService,
+                                   apis: dict[str, BackendAPI]) -> OperationResult[list[VaultItemDTO]]:
+    results = vault_service.fan_out(apis, lambda _, api: api.list_root_themes())
+    items, failed = _merge(results)
+    items.sort(key=lambda v: (v.item.name.lower(), v.vault))
+    return OperationResult(True, _info(len(items), failed), items)
+
+@handle_usecase_errors
+def search_notes_across_vaults(vault_service: VaultService,
+                               apis: dict[str, BackendAPI],
+                               query: str) -> OperationResult[list[VaultItemDTO]]:
+    if not query.strip():
+        return OperationResult(False, "La búsqueda no puede estar vacía", None)
+    results = vault_service.fan_out(apis, lambda _, api: api.search_notes(query))
+    items, failed = _merge(results)
+    items.sort(key=lambda v: (v.item.name.lower(), v.vault))
+    return OperationResult(True, _info(len(items), failed), items)
+
+@handle_usecase_errors
+def get_theme_analytics_across_vaults(vault_service: VaultService,
+                                      apis: dict[str, BackendAPI],
+                                      theme_refs: list[tuple[str, int]]) -> OperationResult[list[VaultItemDTO]]:
+    """theme_refs: (vault, theme_id) pairs. Each vault computes its share in parallel."""
+    unknown = {vault for vault, _ in theme_refs if vault not in apis}
+    if unknown:
+        return OperationResult(False, f"Bóvedas no abiertas: {', '.join(sorted(unknown))}", None)
+
+    ids_by_vault: dict[str, list[int]] = {}
+    for vault, theme_id in theme_refs:
+        ids_by_vault.setdefault(vault, []).append(theme_id)
+
+    def analytics_for(vault: str, api: BackendAPI) -> OperationResult:
+        dtos = []
+        for theme_id in ids_by_vault[vault]:
+            res = api.get_theme_analytics(theme_id)
+            if not res.successful:
+                return res
+            dtos.append(res.obj)
+        return OperationResult(True, "", dtos)
+
+    results = vault_service.fan_out({vault: apis[vault] for vault in ids_by_vault}, analytics_for)
+    items, failed = _merge(results)
+    return OperationResult(True, _info(len(items), failed), items)
@@ -0,0 +1,187 @@
+from log import logger
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from backend.infrastructure.repositories.sql_alchemy import models
+from backend.infrastructure.repositories.sql_alchemy.engine import create_sqlite_engine
+from backend.infrastructure.repositories.sql_alchemy.schema_migrations import (
+    upgrade_schema, enable_incremental_vacuum, data_version, set_data_version, DATA_VERSION
+)
+from backend.infrastructure.repositories._image_storage import ImageStorage
+from backend.infrastructure.repositories._thumbnail_cache import ThumbnailCache
+from backend.infrastructure.repositories.image_repository import ImageRepository
+from backend.infrastructure.repositories.note_repository import NoteRepository
+from backend.infrastructure.repositories.theme_repository import ThemeRepository
+from backend.infrastructure.repositories.analytics_repository import AnalyticsRepository
+from backend.infrastructure.repositories.search_efficiency_repository import SearchEfficiencyRepository
+from backend.infrastructure.repositories.backup_repository import BackupRepository
+from backend.infrastructure.repositories.maintenance_repository import MaintenanceRepository
+
+from backend.application.backend_api import BackendAPI
+from backend.application.services.vault_services import VaultService
+from backend.application.use_cases.vault_use_cases import (
+    list_root_themes_across_vaults, search_notes_across_vaults, get_theme_analytics_across_vaults
+)
+
+DB_NAME = "app.db"
+
+
+@dataclass
+class Vault:
+    """One vault: a folder with its own database and image store."""
+    name: str
+    root: str
+    engine: Engine
+    session: Session
+    api: BackendAPI
+    image_store: ImageStorage
+    thumbnails: ThumbnailCache
+
+
+def _build_api(session: Session, image_store: ImageStorage, thumbnails: ThumbnailCache) -> BackendAPI:
+    img_repo = ImageRepository(session, image_store, thumbnails)
+    return BackendAPI(
+        NoteRepository(session),
+        ThemeRepository(session),
+        AnalyticsRepository(session),
+        SearchEfficiencyRepository(session),
+        img_repo,
+        BackupRepository(session, image_store),
+        MaintenanceRepository(session)
+    )
+
+
+def open_vault(name: str, root: str) -> Vault:
+    """Builds the engine, repositories and facade of the vault stored in `root`."""
+    os.makedirs(root, exist_ok=True)
+    engine = create_sqlite_engine(f"sqlite:///{os.path.normpath(os.path.join(root, DB_NAME))}")
+    models.Base.metadata.create_all(engine)
+    upgrade_schema(engine)
+    enable_incremental_vacuum(engine)
+    session = sessionmaker(bind=engine)()
+
+    image_store = ImageStorage(
+        upload_dir=os.path.normpath(os.path.join(root, "_uploads", "images")),
+        trash_dir=os.path.normpath(os.path.join(root, "_uploads", "trash"))
+    )
+    thumbnails = ThumbnailCache(os.path.normpath(os.path.join(root, "_uploads", "thumbnails")))
+    api = _build_api(session, image_store, thumbnails)
+    # One-off migrations (content-addressed images, sharded layout, image metadata, note stats).
+    # Each one scans its table, so they only run until they all succeed on this database
+    if data_version(engine) < DATA_VERSION:
+        results = [
+            api.deduplicate_image_store(),
+            api.migrate_image_layout(),
+            api.backfill_image_metadata(),
+            api.backfill_note_stats(),
+        ]
+        if all(result.successful for result in results):
+            set_data_version(engine, DATA_VERSION)
+    logger.info("open_vault(name=%s, root=%s) [Success]", name, root)
+    return Vault(name=name, root=root, engine=engine, session=session, api=api,
+                 image_store=image_store, thumbnails=thumbnails)
+
+
+class VaultManager:
+    """
+    Keeps several vaults open at once and answers queries across all of them.
+    One vault is the active one: the facade the UI works with.
+    """
+    def __init__(self, max_workers: int = 4):
+        self._vaults: dict[str, Vault] = {}
+        self._active: str | None = None
+        self._vault_service = VaultService(max_workers)
+        self._workers = 0
+        self._workers_done = threading.Condition()
+
+    # --- Lifecycle ---
+    def open(self, name: str, root: str) -> Vault:
+        if name in self._vaults:
+            return self._vaults[name]
+        vault = open_vault(name, root)
+        self._vaults[name] = vault
+        if self._active is None:
+            self._active = name
+        return vault
+
+    def close(self, name: str) -> None:
+        vault = self._vaults.pop(name, None)
+        if vault is None:
+            return
+        vault.api.close()
+        vault.session.close()
+        vault.engine.dispose()
+        if self._active == name:
+            self._active = next(iter(self._vaults), None)
+        logger.info("close_vault(name=%s) [Success]", name)
+
+    def close_all(self) -> None:
+        # A worker still committing would find its engine disposed: let them finish first
+        with self._workers_done:
+            if self._workers:
+                logger.info("close_all() waiting for %d background tasks", self._workers)
+            self._workers_done.wait_for(lambda: self._workers == 0)
+        for name in list(self._vaults):
+            self.close(name)
+        self._vault_service.shutdown()
+
+    @contextmanager
+    def background_api(self, name: str | None = None) -> Iterator[BackendAPI]:
+        """
+        A facade of the vault (the active one by default) over a session of its own,
+        for a task running on a worker thread: the vault's session belongs to the UI
+        thread. It shares the image store and thumbnails. close_all waits for it.
+        """
+        vault = self._vaults[name or self._active]
+        with self._workers_done:
+            self._workers += 1
+        session = sessionmaker(bind=vault.engine)()
+        try:
+            yield _build_api(session, vault.image_store, vault.thumbnails)
+        finally:
+            session.close()
+            with self._workers_done:
+                self._workers -= 1
+                self._workers_done.notify_all()
+
+    # --- Access ---
+    def names(self) -> list[str]:
+        return list(self._vaults)
+
+    def get(self, name: str) -> BackendAPI:
+        return self._vaults[name].api
+
+    def set_active(self, name: str) -> BackendAPI:
+        if name not in self._vaults:
+            raise KeyError(name)
+        self._active = name
+        return self._vaults[name].api
+
+    @property
+    def active_name(self) -> str | None:
+        return self._active
+
+    def active(self) -> BackendAPI:
+        if self._active is None:
+            raise RuntimeError("VaultManager: no vault is open")
+        return self._vaults[self._active].api
+
+    def _apis(self, names: list[str] | None) -> dict[str, BackendAPI]:
+        selected = names if names is not None else list(self._vaults)
+        return {name: self._vaults[name].api for name in selected if name in self._vaults}
+
+    # --- Fan-out queries ---
+    def list_root_themes(self, names: list[str] | None = None):
+        return list_root_themes_across_vaults(self._vault_service, self._apis(names))
+
+    def search_notes(self, query: str, names: list[str] | None = None):
+        return search_notes_across_vaults(self._vault_service, self._apis(names), query)
+
+    def get_theme_analytics(self, theme_refs: list[tuple[str, int]]):
+        return get_theme_analytics_across_vaults(self._vault_service, self._apis(None), theme_refs)
@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+from typing import BinaryIO
+
+@dataclass(frozen=True)
+class NewImageSourceDTO:
+    """DTO for transporting a new image that is streamed from a path or file-like object."""
+    name: str
+    source: str | BinaryIO  # Path of the source file or an open binary stream
+    extension: str  # Extension of the image file, e.g., 'png', 'jpg'
+    theme_id: int | None = None
@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class NoteStatsDTO:
+    """DTO for transporting the lexical statistics of a note's content to the repository."""
+    n_words_total: int
+    n_meaningful: int
+    n_unique: int
+    vocabulary: frozenset[str]
+    sketch: bytes
@@ -9,3 +9,6 @@ class DuplicateImageNameError(ImageDomainError):
 
 class InvalidImageExtensionError(ImageDomainError):
     pass
+
+class InvalidImageContentError(ImageDomainError):
+    pass
@@ -1,14 +1,35 @@
 from datetime import datetime
+from typing import BinaryIO
 
 from backend.domain.errors.image_errors import (
     InvalidImageNameError,
     DuplicateImageNameError,
-    InvalidImageExtensionError
+    InvalidImageExtensionError,
+    InvalidImageContentError
 )
 from backend.domain.dto.new_image_dto import NewImageDTO 
+from backend.domain.dto.new_image_source_dto import NewImageSourceDTO
+
+SUPPORTED_EXTENSIONS = ['png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff', 'webp']
+
+# Leading bytes of each supported format: (offset, signature, format)
+SIGNATURES = [
+    (0, b"\x89PNG\r\n\x1a\n", "png"),
+    (0, b"\xff\xd8\xff", "jpeg"),
+    (0, b"GIF87a", "gif"),
+    (0, b"GIF89a", "gif"),
+    (0, b"BM", "bmp"),
+    (0, b"II*\x00", "tiff"),
+    (0, b"MM\x00*", "tiff"),
+    (8, b"WEBP", "webp"),
+]
+SIGNATURE_LENGTH = 12
 
 class Image:
-    __slots__ = ("_id", "_name", "_file_path", "_theme_id", "_created_at")
+    __slots__ = (
+        "_id", "_name", "_file_path", "_theme_id", "_created_at",
+        "_byte_size", "_width", "_height", "_format", "_orientation", "_taken_at"
+    )
 
     def __init__(
         self,
@@ -16,23 +37,30 @@ class Image:
         name: str,
         file_path: str,
         created_at: datetime,
-        theme_id: int | None = None
+        theme_id: int | None = None,
+        byte_size: int | None = None,
+        width: int | None = None,
+        height: int | None = None,
+        format: str | None = None,
+        orientation: int | None = None,
+        taken_at: datetime | None = None
     ):
         self._id = id
         self._name = name
         self._file_path = file_path
         self._theme_id = theme_id
         self._created_at = created_at
+        # File metadata, stored at import so viewers never re-read the file
+        self._byte_size = byte_size
+        self._width = width
+        self._height = height
+        self._format = format
+        self._orientation = orientation
+        self._taken_at = taken_at
 
     # --- Creation ---
     @staticmethod
-    def create(
-        name: str,
-        blob_data: bytes,
-        sibling_names: set[str],
-        extension: str,
-        theme_id: int | None = None,
-    ) -> NewImageDTO:
+    def _validate_new(name: str, sibling_names: set[str], extension: str) -> tuple[str, str]:
         clean_name = name.strip()
         extension_clean = extension.strip().lower()
         if not clean_name:
@@ -42,8 +70,30 @@ class Image:
         if clean_name.lower() in normalized_sib_names:
             raise DuplicateImageNameError("Ya existe una imagen con ese nombre en este tema")
 
-        if extension_clean not in ['png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff', 'webp']:
+        if extension_clean not in SUPPORTED_EXTENSIONS:
             raise InvalidImageExtensionError("Extensión de imagen no soportada")
+        return clean_name, extension_clean
+
+    @staticmethod
+    def check_content(head: bytes) -> str:
+        """Identifies the format from the first bytes of the file. Raises if it is not a supported image."""
+        for offset, signature, image_format in SIGNATURES:
+            if head[offset:offset + len(signature)] == signature:
+                if image_format == "webp" and not head.startswith(b"RIFF"):
+                    continue
+                return image_format
+        raise InvalidImageContentError("El archivo no es una imagen válida")
+
+    @staticmethod
+    def create(
+        name: str,
+        blob_data: bytes,
+        sibling_names: set[str],
+        extension: str,
+        theme_id: int | None = None,
+    ) -> NewImageDTO:
+        clean_name, extension_clean = Image._validate_new(name, sibling_names, extension)
+        Image.check_content(blob_data[:SIGNATURE_LENGTH])
 
         return NewImageDTO(
             name=clean_name,
@@ -52,6 +102,23 @@ class Image:
             theme_id=theme_id
         ) #RETURN DTO
 
+    @staticmethod
+    def create_from_source(
+        name: str,
+        source: str | BinaryIO,
+        sibling_names: set[str],
+        extension: str,
+        theme_id: int | None = None,
+    ) -> NewImageSourceDTO:
+        """Like create(), but the content is only read by the repository (check_content runs while it streams)."""
+        clean_name, extension_clean = Image._validate_new(name, sibling_names, extension)
+        return NewImageSourceDTO(
+            name=clean_name,
+            source=source,
+            extension=extension_clean,
+            theme_id=theme_id
+        )
+
     # --- Changes ---
     def change_name(self, new_name: str, sibling_names: set[str]) -> None:
         new_name_clean = new_name.strip()
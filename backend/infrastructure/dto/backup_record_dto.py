@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class BackupRecordDTO:
+    """DTO to represent the outcome of a backup or restore run."""
+    snapshot_dir: str
+    db_pages: int
+    files_copied: int
+    files_linked: int
+    bytes_copied: int
+    seconds: float
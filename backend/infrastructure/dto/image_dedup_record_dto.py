@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class ImageDedupRecordDTO:
+    """DTO to represent the result of moving legacy images to content-addressed blobs."""
+    rows_hashed: int
+    blobs_created: int
+    duplicates_removed: int
+    bytes_freed: int
+    missing: int
+    seconds: float
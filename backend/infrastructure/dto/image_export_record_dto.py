@@ -0,0 +1,11 @@
+from dataclasses import dataclass, field
+
+@dataclass(frozen=True)
+class ImageExportRecordDTO:
+    """DTO to represent the outcome of exporting the images of a theme subtree."""
+    root_dir: str
+    files: int
+    bytes_copied: int
+    failed: list[tuple[int, str]] = field(default_factory=list)  # (image_id, reason)
+    methods: dict[str, int] = field(default_factory=dict)  # copy method -> files
+    seconds: float = 0.0
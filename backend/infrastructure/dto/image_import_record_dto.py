@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class ImageImportRecordDTO:
+    """DTO to represent the outcome of one file of a bulk import."""
+    index: int
+    image_id: int | None = None
+    content_hash: str | None = None
+    reused: bool = False  # The content was already stored
+    error: str | None = None  # invalid_content | file_error | cancelled
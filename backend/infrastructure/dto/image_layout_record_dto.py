@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class ImageLayoutRecordDTO:
+    """DTO to represent the result of moving image files to the sharded layout."""
+    blobs_checked: int
+    files_moved: int
+    paths_rewritten: int
+    missing: int
+    seconds: float
@@ -0,0 +1,9 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class ImageMetadataRecordDTO:
+    """DTO to represent the result of filling in metadata for existing images."""
+    rows_scanned: int
+    rows_updated: int
+    unreadable: int
+    seconds: float
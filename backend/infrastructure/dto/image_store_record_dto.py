@@ -0,0 +1,12 @@
+from dataclasses import dataclass, field
+
+@dataclass(frozen=True)
+class ImageStoreRecordDTO:
+    """DTO to represent the differences between image rows and the files on disk."""
+    n_rows: int
+    n_files: int
+    missing: list[tuple[int, str]] = field(default_factory=list)  # (image_id, file_path)
+    orphaned: list[str] = field(default_factory=list)  # file paths
+    size_mismatches: list[tuple[int, int, int]] = field(default_factory=list)  # (image_id, recorded, actual)
+    unsized: list[tuple[int, int]] = field(default_factory=list)  # (image_id, actual)
+    seconds: float = 0.0
@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+@dataclass(frozen=True)
+class NoteAnalyticsRecordDTO:
+    """DTO to represent a note's time aggregates and stored lexical counts; content only when the counts are missing."""
+    id: int
+    name: str
+    created_at: datetime
+    last_edited_at: datetime
+    minutes_total: float
+    n_sessions: int
+    n_days_active: int
+    n_words_total: int | None
+    n_meaningful: int | None
+    n_unique: int | None
+    content: str | None
@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class NoteLexicalRecordDTO:
+    """DTO to represent the stored lexical statistics of a note."""
+    note_id: int
+    theme_id: int
+    n_words_total: int
+    n_meaningful: int
+    vocabulary: frozenset[str] | None
+    sketch: bytes | None
@@ -0,0 +1,9 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class ThemeDirectStatsDTO:
+    """DTO to represent the statistics of the notes placed directly in a theme (no subthemes)."""
+    theme_id: int
+    n_notes: int
+    minutes: float
+    active_days: frozenset[str]
@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+@dataclass(frozen=True)
+class TimeSeriesRecordDTO:
+    """DTO to represent time records as parallel arrays: note id, UTC day (days since 1970-01-01) and minutes."""
+    note_ids: np.ndarray
+    days: np.ndarray
+    minutes: np.ndarray
@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class TrashRecordDTO:
+    """DTO to represent the outcome of a trash collection run."""
+    scanned: int
+    deleted: int
+    bytes_freed: int
+    bytes_remaining: int
+    seconds: float
@@ -0,0 +1,168 @@
+import errno
+import hashlib
+import os
+import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class FileStat:
+    name: str
+    path: str
+    size: int
+    mtime: float
+
+
+def sha256_file(path: str, chunk_size: int = CHUNK_SIZE) -> str:
+    """Hashes a file in chunks so memory stays flat for large files."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def copy_with_hash(src: str, dst: str, chunk_size: int = CHUNK_SIZE) -> tuple[str, int]:
+    """
+    Copies src to dst hashing the data on the way (single read of the source).
+    Preserves the modification time. Returns (sha256, bytes_copied).
+    """
+    digest = hashlib.sha256()
+    copied = 0
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        while chunk := fsrc.read(chunk_size):
+            digest.update(chunk)
+            fdst.write(chunk)
+            copied += len(chunk)
+    st = os.stat(src)
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+    return digest.hexdigest(), copied
+
+
+# ioctl that shares extents between two files (btrfs, xfs, ...): _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+# errno values meaning "this kernel/filesystem cannot do it": try the next method
+_UNSUPPORTED = {errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP, errno.ENOTSUP,
+                errno.ENOTTY, errno.EBADF, errno.EPERM}
+
+
+def _try_reflink(fsrc, fdst) -> bool:
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+    try:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        return True
+    except OSError as e:
+        if e.errno in _UNSUPPORTED:
+            return False
+        raise
+
+
+def _try_kernel_copy(fsrc, fdst, size: int, copy) -> bool:
+    """Drives copy_file_range / sendfile until size bytes are copied. False if unsupported before any byte."""
+    copied = 0
+    while copied < size:
+        try:
+            n = copy(fsrc.fileno(), fdst.fileno(), copied, min(size - copied, 1 << 30))
+        except OSError as e:
+            if copied == 0 and e.errno in _UNSUPPORTED:
+                return False
+            raise
+        if n == 0:
+            break
+        copied += n
+    return True
+
+
+def fast_copy(src: str, dst: str, chunk_size: int = CHUNK_SIZE) -> str:
+    """
+    Copies src to dst without moving the data through Python when the kernel allows it:
+    reflink (FICLONE), then copy_file_range, then sendfile, then a chunked copy.
+    Returns the method used.
+    """
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        if size and _try_reflink(fsrc, fdst):
+            return "reflink"
+        if size and hasattr(os, "copy_file_range") and _try_kernel_copy(
+            fsrc, fdst, size, lambda i, o, off, n: os.copy_file_range(i, o, n, off, off)
+        ):
+            return "copy_file_range"
+        if size and sys.platform.startswith("linux") and _try_kernel_copy(
+            fsrc, fdst, size, lambda i, o, off, n: os.sendfile(o, i, off, n)
+        ):
+            return "sendfile"
+        fsrc.seek(0)
+        fdst.seek(0)
+        fdst.truncate()
+        shutil.copyfileobj(fsrc, fdst, chunk_size)
+        return "chunked"
+
+
+def iter_files(root: str):
+    """Yields (relative_path, os.DirEntry) for every regular file below root."""
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield os.path.relpath(entry.path, root), entry
+        except FileNotFoundError:
+            continue
+
+
+def _stat_many(entries: list[os.DirEntry]) -> list[FileStat]:
+    result = []
+    for entry in entries:
+        try:
+            st = entry.stat(follow_symlinks=False)
+        except FileNotFoundError:
+            continue
+        result.append(FileStat(entry.name, entry.path, st.st_size, st.st_mtime))
+    return result
+
+
+def _scan_dir(pool: ThreadPoolExecutor, path: str, chunk: int) -> list:
+    """Lists one directory and submits stat chunks and subdirectories to the pool."""
+    futures, files = [], []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    futures.append(pool.submit(_scan_dir, pool, entry.path, chunk))
+                elif entry.is_file(follow_symlinks=False):
+                    files.append(entry)
+                    if len(files) >= chunk:
+                        futures.append(pool.submit(_stat_many, files))
+                        files = []
+    except FileNotFoundError:
+        return []
+    if files:
+        futures.append(pool.submit(_stat_many, files))
+    return futures
+
+
+def scan_files(root: str, workers: int = 8, chunk: int = 512) -> list[FileStat]:
+    """
+    Recursively lists and stats every regular file below root.
+    Subdirectories and stat calls are spread over a thread pool.
+    """
+    stats: list[FileStat] = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = _scan_dir(pool, root, chunk)
+        while pending:
+            result = pending.pop().result()
+            if result and isinstance(result[0], FileStat):
+                stats.extend(result)
+            elif result:
+                pending.extend(result)
+    return stats
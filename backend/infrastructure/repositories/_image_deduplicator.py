@@ -0,0 +1,115 @@
+from log import logger
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from backend.infrastructure.repositories._image_storage import ImageStorage, ImageStorageError
+from backend.infrastructure.repositories._file_utils import sha256_file
+from backend.infrastructure.repositories.sql_alchemy import models
+from backend.infrastructure.dto.image_dedup_record_dto import ImageDedupRecordDTO
+
+
+def _hash_or_none(path: str) -> tuple[str, int] | None:
+    try:
+        return sha256_file(path), os.path.getsize(path)
+    except OSError:
+        return None
+
+
+class ImageDeduplicator:
+    """
+    Migration for stores created before content addressing.
+    Rows without content_hash are hashed in parallel, batch by batch; the first
+    file seen for a hash becomes the blob and the other copies go to the trash.
+    Each batch is committed on its own, so an interrupted run just resumes.
+    """
+    def __init__(self, session: Session, image_store: ImageStorage,
+                 workers: int = 8, batch_size: int = 500):
+        self.session = session
+        self.image_store = image_store
+        self.workers = workers
+        self.batch_size = batch_size
+
+    def _next_batch(self, after_id: int) -> list[tuple[int, str]]:
+        stmt = (
+            select(models.ImageModel.id, models.ImageModel.file_path)
+            .where(models.ImageModel.content_hash.is_(None), models.ImageModel.id > after_id)
+            .order_by(models.ImageModel.id)
+            .limit(self.batch_size)
+        )
+        return [tuple(row) for row in self.session.execute(stmt)]
+
+    def _apply_batch(self, rows: list[tuple[int, str]], hashes: list) -> tuple[int, int, dict[str, int]]:
+        """Links one batch of rows to blobs and commits. Returns (hashed, blobs_created, redundant files)."""
+        blobs: dict[str, models.ImageBlobModel] = {}
+        wanted = {h for h, _ in filter(None, hashes)}
+        if wanted:
+            stmt = select(models.ImageBlobModel).where(models.ImageBlobModel.content_hash.in_(wanted))
+            blobs = {b.content_hash: b for b in self.session.execute(stmt).scalars()}
+
+        updates: list[dict] = []
+        redundant: dict[str, int] = {}  # file_path -> size
+        created = 0
+        for (image_id, file_path), hashed in zip(rows, hashes):
+            if hashed is None:
+                continue
+            content_hash, size = hashed
+            blob = blobs.get(content_hash)
+            if blob is None:
+                # The file stays where it is; only later copies are redundant
+                blob = models.ImageBlobModel(
+                    content_hash=content_hash, file_path=file_path, byte_size=size, ref_count=0
+                )
+                self.session.add(blob)
+                blobs[content_hash] = blob
+                created += 1
+            elif os.path.normcase(os.path.abspath(blob.file_path)) != os.path.normcase(os.path.abspath(file_path)):
+                redundant[file_path] = size
+            updates.append({"id": image_id, "content_hash": content_hash,
+                            "file_path": blob.file_path, "byte_size": size})
+
+        # Blob rows must exist before the image triggers count references to them
+        self.session.flush()
+        if updates:
+            self.session.execute(update(models.ImageModel), updates)
+        self.session.commit()
+        return len(updates), created, redundant
+
+    def run(self) -> ImageDedupRecordDTO:
+        started = time.perf_counter()
+        hashed = created = removed = freed = missing = 0
+        last_id = 0
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while rows := self._next_batch(last_id):
+                last_id = rows[-1][0]
+                hashes = list(pool.map(_hash_or_none, [path for _, path in rows]))
+                missing += hashes.count(None)
+
+                n_hashed, n_created, redundant = self._apply_batch(rows, hashes)
+                hashed += n_hashed
+                created += n_created
+
+                # Rows already point to the blob; a failed move only leaves an orphan for the reconciler
+                for file_path, size in redundant.items():
+                    try:
+                        moved = self.image_store.move_to_trash(file_path)
+                        self.image_store.release_trash([moved])
+                        removed += 1
+                        freed += size
+                    except ImageStorageError as e:
+                        logger.error("deduplicate() could not trash %s: %s", file_path, e)
+
+        record = ImageDedupRecordDTO(
+            rows_hashed=hashed,
+            blobs_created=created,
+            duplicates_removed=removed,
+            bytes_freed=freed,
+            missing=missing,
+            seconds=round(time.perf_counter() - started, 3)
+        )
+        logger.info("deduplicate() [Success] - %s", record)
+        return record
@@ -0,0 +1,141 @@
+from log import logger
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.infrastructure.repositories._file_utils import fast_copy
+from backend.infrastructure.repositories.sql_alchemy import models
+from backend.infrastructure.dto.image_export_record_dto import ImageExportRecordDTO
+
+TEMP_SUFFIX = ".part"
+
+
+def _safe_name(name: str) -> str:
+    """Names valid as file or folder names on every OS."""
+    clean = re.sub(r'[<>:"/\\|?*\x00-\x1f]', "_", name).strip().rstrip(".")
+    return clean or "_"
+
+
+def _unique(name: str, taken: set[str]) -> str:
+    stem, ext = os.path.splitext(name)
+    candidate, n = name, 2
+    while candidate.lower() in taken:
+        candidate = f"{stem} ({n}){ext}"
+        n += 1
+    taken.add(candidate.lower())
+    return candidate
+
+
+def export_file(src: str, dst: str) -> tuple[int, str]:
+    """Copies one image next to dst and renames it into place. Returns (bytes, method)."""
+    tmp = dst + TEMP_SUFFIX
+    try:
+        method = fast_copy(src, tmp)
+        st = os.stat(src)
+        os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+        os.replace(tmp, dst)
+        return st.st_size, method
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class ImageExporter:
+    """
+    Copies image files out of the store. A theme subtree is exported as nested
+    folders named after the themes; files are copied by a thread pool (the
+    copies run in the kernel, so threads do not contend for the GIL).
+    """
+    def __init__(self, session: Session, workers: int = 8):
+        self.session = session
+        self.workers = workers
+
+    def _subtree(self, theme_id: int) -> list[tuple[int, str, int | None]]:
+        hierarchy = (
+            select(models.ThemeModel.id, models.ThemeModel.name, models.ThemeModel.parent_id)
+            .where(models.ThemeModel.id == theme_id)
+            .cte(name="export_hierarchy", recursive=True)
+        )
+        hierarchy = hierarchy.union_all(
+            select(models.ThemeModel.id, models.ThemeModel.name, models.ThemeModel.parent_id)
+            .where(models.ThemeModel.parent_id == hierarchy.c.id)
+        )
+        return [tuple(row) for row in self.session.execute(select(hierarchy))]
+
+    def _plan(self, theme_id: int, dest_dir: str) -> tuple[str, list[tuple[int, str, str]]]:
+        """Resolves every destination path up front. Returns (root_dir, [(image_id, src, dst)])."""
+        themes = self._subtree(theme_id)
+        children: dict[int | None, list[tuple[int, str]]] = {}
+        names = {}
+        for tid, name, parent_id in themes:
+            names[tid] = name
+            if tid != theme_id:
+                children.setdefault(parent_id, []).append((tid, name))
+
+        folders = {theme_id: os.path.join(dest_dir, _unique(_safe_name(names[theme_id]), {n.lower() for n in os.listdir(dest_dir)}))}
+        taken: dict[int, set[str]] = {theme_id: set()}
+        stack = [theme_id]
+        while stack:
+            parent = stack.pop()
+            for tid, name in children.get(parent, []):
+                folders[tid] = os.path.join(folders[parent], _unique(_safe_name(name), taken[parent]))
+                taken[tid] = set()
+                stack.append(tid)
+
+        stmt = (
+            select(models.ImageModel.id, models.ImageModel.name, models.ImageModel.file_path, models.ImageModel.theme_id)
+            .where(models.ImageModel.theme_id.in_(list(folders)))
+            .order_by(models.ImageModel.id)
+        )
+        jobs = []
+        for image_id, name, file_path, tid in self.session.execute(stmt):
+            ext = os.path.splitext(file_path)[1]
+            filename = _safe_name(name)
+            if not filename.lower().endswith(ext.lower()):
+                filename += ext
+            jobs.append((image_id, file_path, os.path.join(folders[tid], _unique(filename, taken[tid]))))
+        return folders[theme_id], jobs
+
+    def export_theme(self, theme_id: int, dest_dir: str,
+                     progress: Callable[[int, int], None] | None = None) -> ImageExportRecordDTO:
+        """progress(done, total) is called from the calling thread as copies finish."""
+        started = time.perf_counter()
+        root_dir, jobs = self._plan(theme_id, dest_dir)
+        for folder in {os.path.dirname(dst) for _, _, dst in jobs} | {root_dir}:
+            os.makedirs(folder, exist_ok=True)
+
+        copied = 0
+        methods: Counter[str] = Counter()
+        failed = []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(export_file, src, dst): image_id for image_id, src, dst in jobs}
+            for done, future in enumerate(as_completed(futures), start=1):
+                image_id = futures[future]
+                try:
+                    size, method = future.result()
+                    copied += size
+                    methods[method] += 1
+                except OSError as e:
+                    logger.error("export_theme(theme_id=%s) image %s [OSError]: %s", theme_id, image_id, e)
+                    failed.append((image_id, e.strerror or str(e)))
+                if progress is not None:
+                    progress(done, len(jobs))
+
+        failed.sort()
+        record = ImageExportRecordDTO(
+            root_dir=root_dir,
+            files=len(jobs) - len(failed),
+            bytes_copied=copied,
+            failed=failed,
+            methods=dict(methods),
+            seconds=round(time.perf_counter() - started, 3)
+        )
+        logger.info("export_theme(theme_id=%s) [Success] - %s", theme_id, record)
+        return record
@@ -0,0 +1,102 @@
+from log import logger
+import os
+import time
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from backend.infrastructure.repositories._image_storage import ImageStorage
+from backend.infrastructure.repositories.sql_alchemy import models
+from backend.infrastructure.dto.image_layout_record_dto import ImageLayoutRecordDTO
+
+
+def _same(a: str, b: str) -> bool:
+    return os.path.normcase(os.path.abspath(a)) == os.path.normcase(os.path.abspath(b))
+
+
+class ImageLayoutMigration:
+    """
+    Moves blob files that are not at ImageStorage.blob_path (flat or legacy
+    names) into the sharded layout and rewrites their paths, batch by batch.
+
+    Files are moved before the batch commits; if the commit fails they are moved
+    back. After a crash between both steps the file is already at its new place
+    and the old one is gone: the next run only rewrites the paths.
+    """
+    def __init__(self, session: Session, image_store: ImageStorage, batch_size: int = 500):
+        self.session = session
+        self.image_store = image_store
+        self.batch_size = batch_size
+
+    def _next_batch(self, after_hash: str) -> list[tuple[str, str]]:
+        stmt = (
+            select(models.ImageBlobModel.content_hash, models.ImageBlobModel.file_path)
+            .where(models.ImageBlobModel.content_hash > after_hash)
+            .order_by(models.ImageBlobModel.content_hash)
+            .limit(self.batch_size)
+        )
+        return [tuple(row) for row in self.session.execute(stmt)]
+
+    def _migrate_batch(self, blobs: list[tuple[str, str]]) -> tuple[int, int, int]:
+        """Returns (files_moved, paths_rewritten, missing) for one committed batch."""
+        moved: list[tuple[str, str]] = []  # (old, new) to undo
+        rewrites: list[tuple[str, str]] = []  # (content_hash, new_path)
+        missing = 0
+
+        for content_hash, file_path in blobs:
+            target = self.image_store.blob_path(content_hash, os.path.splitext(file_path)[1])
+            if _same(file_path, target):
+                continue
+            if os.path.exists(file_path):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(file_path, target)
+                moved.append((file_path, target))
+            elif not os.path.exists(target):
+                missing += 1
+                continue
+            rewrites.append((content_hash, target))
+
+        try:
+            for content_hash, target in rewrites:
+                self.session.execute(
+                    update(models.ImageBlobModel)
+                    .where(models.ImageBlobModel.content_hash == content_hash)
+                    .values(file_path=target)
+                )
+                self.session.execute(
+                    update(models.ImageModel)
+                    .where(models.ImageModel.content_hash == content_hash)
+                    .values(file_path=target)
+                )
+            self.session.commit()
+        except BaseException:
+            self.session.rollback()
+            for old, new in reversed(moved):
+                try:
+                    os.replace(new, old)
+                except OSError as e:
+                    logger.critical("layout migration rollback failed: could not move %s back: %s", new, e)
+            raise
+        return len(moved), len(rewrites), missing
+
+    def run(self) -> ImageLayoutRecordDTO:
+        started = time.perf_counter()
+        checked = moved = rewritten = missing = 0
+        last_hash = ""
+        while blobs := self._next_batch(last_hash):
+            last_hash = blobs[-1][0]
+            checked += len(blobs)
+            m, r, x = self._migrate_batch(blobs)
+            moved += m
+            rewritten += r
+            missing += x
+
+        record = ImageLayoutRecordDTO(
+            blobs_checked=checked,
+            files_moved=moved,
+            paths_rewritten=rewritten,
+            missing=missing,
+            seconds=round(time.perf_counter() - started, 3)
+        )
+        logger.info("migrate_layout() [Success] - %s", record)
+        return record
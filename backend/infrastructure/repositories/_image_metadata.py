@@ -0,0 +1,96 @@
+from log import logger
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from PIL import Image, ExifTags
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from backend.infrastructure.repositories.sql_alchemy import models
+from backend.infrastructure.dto.image_metadata_record_dto import ImageMetadataRecordDTO
+
+EXIF_DATE_FORMAT = "%Y:%m:%d %H:%M:%S"
+
+
+def _parse_exif_date(value) -> datetime | None:
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.strptime(value.strip("\x00 ").strip(), EXIF_DATE_FORMAT)
+    except ValueError:
+        return None
+
+
+def read_metadata(path: str) -> dict:
+    """
+    Reads dimensions, format, EXIF orientation and capture date from the file
+    header (Image.open does not decode pixels). Returns ImageModel column values;
+    an unreadable file gives an empty dict so imports never fail on metadata.
+    """
+    try:
+        with Image.open(path) as img:
+            exif = img.getexif()
+            orientation = exif.get(ExifTags.Base.Orientation)
+            # The capture date lives in the Exif sub-IFD; DateTime (last change) is the fallback
+            exif_ifd = exif.get_ifd(ExifTags.IFD.Exif)
+            taken_at = (
+                _parse_exif_date(exif_ifd.get(ExifTags.Base.DateTimeOriginal))
+                or _parse_exif_date(exif.get(ExifTags.Base.DateTime))
+            )
+            return {
+                "width": img.width,
+                "height": img.height,
+                "format": (img.format or "").lower() or None,
+                "orientation": orientation if isinstance(orientation, int) and 1 <= orientation <= 8 else 1,
+                "taken_at": taken_at,
+            }
+    except (OSError, ValueError, SyntaxError, Image.DecompressionBombError):
+        return {}
+
+
+class ImageMetadataBackfill:
+    """
+    Migration for images imported before metadata was stored: reads the
+    headers of rows without width in parallel and updates them batch by batch.
+    Each batch is committed, so an interrupted run resumes where it stopped.
+    """
+    def __init__(self, session: Session, workers: int = 8, batch_size: int = 500):
+        self.session = session
+        self.workers = workers
+        self.batch_size = batch_size
+
+    def run(self) -> ImageMetadataRecordDTO:
+        started = time.perf_counter()
+        scanned = updated = 0
+        last_id = 0
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while True:
+                stmt = (
+                    select(models.ImageModel.id, models.ImageModel.file_path)
+                    .where(models.ImageModel.width.is_(None), models.ImageModel.id > last_id)
+                    .order_by(models.ImageModel.id)
+                    .limit(self.batch_size)
+                )
+                rows = self.session.execute(stmt).all()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                scanned += len(rows)
+
+                metadata = pool.map(read_metadata, [file_path for _, file_path in rows])
+                updates = [{"id": image_id, **meta} for (image_id, _), meta in zip(rows, metadata) if meta]
+                if updates:
+                    self.session.execute(update(models.ImageModel), updates)
+                self.session.commit()
+                updated += len(updates)
+
+        record = ImageMetadataRecordDTO(
+            rows_scanned=scanned,
+            rows_updated=updated,
+            unreadable=scanned - updated,
+            seconds=round(time.perf_counter() - started, 3)
+        )
+        logger.info("backfill_metadata() [Success] - %s", record)
+        return record
@@ -0,0 +1,130 @@
+from log import logger
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from backend.infrastructure.repositories._image_storage import ImageStorage
+from backend.infrastructure.repositories._file_utils import scan_files
+from backend.infrastructure.repositories.sql_alchemy import models
+from backend.infrastructure.dto.image_store_record_dto import ImageStoreRecordDTO
+
+
+def _norm(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _size_or_none(path: str) -> int | None:
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return None
+
+
+class ImageReconciler:
+    """
+    Compares image rows with the files in the upload directory.
+    The directory is scanned once in parallel; rows are streamed in batches,
+    so memory depends on the number of files, not on row objects.
+    """
+    def __init__(self, session: Session, image_store: ImageStorage,
+                 workers: int = 16, batch_size: int = 1000):
+        self.session = session
+        self.image_store = image_store
+        self.workers = workers
+        self.batch_size = batch_size
+
+    def reconcile(self) -> ImageStoreRecordDTO:
+        started = time.perf_counter()
+        files = {
+            _norm(f.path): f for f in scan_files(self.image_store.upload_dir, self.workers)
+            if not self.image_store.is_temp(f.name)
+        }
+        referenced: set[str] = set()
+        # Rows whose path was not seen by the scan (e.g. outside the upload dir)
+        unresolved: list[tuple[int, str, int | None]] = []
+
+        missing, mismatches, unsized = [], [], []
+        n_rows = 0
+
+        stmt = (
+            select(models.ImageModel.id, models.ImageModel.file_path, models.ImageModel.byte_size)
+            .execution_options(yield_per=self.batch_size)
+        )
+        for image_id, file_path, byte_size in self.session.execute(stmt):
+            n_rows += 1
+            key = _norm(file_path)
+            found = files.get(key)
+            if found is None:
+                unresolved.append((image_id, file_path, byte_size))
+                continue
+            referenced.add(key)
+            if byte_size is None:
+                unsized.append((image_id, found.size))
+            elif byte_size != found.size:
+                mismatches.append((image_id, byte_size, found.size))
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            sizes = pool.map(_size_or_none, [path for _, path, _ in unresolved])
+            for (image_id, file_path, byte_size), size in zip(unresolved, sizes):
+                if size is None:
+                    missing.append((image_id, file_path))
+                elif byte_size is None:
+                    unsized.append((image_id, size))
+                elif byte_size != size:
+                    mismatches.append((image_id, byte_size, size))
+
+        orphaned = [f.path for key, f in files.items() if key not in referenced]
+
+        record = ImageStoreRecordDTO(
+            n_rows=n_rows,
+            n_files=len(files),
+            missing=missing,
+            orphaned=orphaned,
+            size_mismatches=mismatches,
+            unsized=unsized,
+            seconds=round(time.perf_counter() - started, 3)
+        )
+        logger.info(
+            "reconcile() [Success] - %d rows, %d files, %d missing, %d orphaned, %d size mismatches (%.3fs)",
+            n_rows, len(files), len(missing), len(orphaned), len(mismatches), record.seconds
+        )
+        return record
+
+    def repair(self, record: ImageStoreRecordDTO, remove_missing: bool,
+               trash_orphans: bool, accept_sizes: bool) -> tuple[int, int, int]:
+        """
+        Applies batch repairs in one transaction, then moves orphans to the trash.
+        Returns (rows_removed, files_trashed, sizes_updated).
+        """
+        rows_removed = sizes_updated = files_trashed = 0
+
+        if remove_missing and record.missing:
+            ids = [image_id for image_id, _ in record.missing]
+            for i in range(0, len(ids), self.batch_size):
+                chunk = ids[i:i + self.batch_size]
+                self.session.execute(delete(models.ImageModel).where(models.ImageModel.id.in_(chunk)))
+            rows_removed = len(ids)
+
+        # Unknown sizes are always filled in; recorded ones are only overwritten on request
+        sizes = [{"id": image_id, "byte_size": size} for image_id, size in record.unsized]
+        if accept_sizes:
+            sizes += [{"id": image_id, "byte_size": actual} for image_id, _, actual in record.size_mismatches]
+        for i in range(0, len(sizes), self.batch_size):
+            self.session.execute(update(models.ImageModel), sizes[i:i + self.batch_size])
+        sizes_updated = len(sizes)
+
+        self.session.commit()
+
+        if trash_orphans and record.orphaned:
+            moved = self.image_store.move_to_trash_many(record.orphaned)
+            self.image_store.release_trash(moved)
+            files_trashed = len(moved)
+
+        logger.info(
+            "repair() [Success] - %d rows removed, %d files trashed, %d sizes updated",
+            rows_removed, files_trashed, sizes_updated
+        )
+        return rows_removed, files_trashed, sizes_updated
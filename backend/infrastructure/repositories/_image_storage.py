@@ -1,7 +1,14 @@
 from log import logger
+import hashlib
 import os
-from datetime import datetime
-import re
+import threading
+import uuid
+from typing import BinaryIO, Callable
+
+from backend.infrastructure.repositories._file_utils import CHUNK_SIZE, FileStat
+
+TEMP_SUFFIX = ".part"
+HEAD_SIZE = 12
 
 class ImageStorageError(Exception):
     """Base exception for image storage errors."""
@@ -11,41 +18,129 @@ class ImageStorage:
     def __init__(self, upload_dir: str = "_uploads/images/", trash_dir: str = "_uploads/trash/"):
         self.upload_dir = upload_dir
         self.trash_dir = trash_dir
+        # Trash files a pending rollback may still restore (name -> original path); the trash GC never deletes them
+        self._pinned: dict[str, str] = {}
+        self._pin_lock = threading.Lock()
 
         os.makedirs(self.upload_dir, exist_ok=True)
         os.makedirs(self.trash_dir, exist_ok=True)
 
     # ---------- helpers ----------
-    def _generate_filename(self, name: str, extension: str) -> str:
-        """Cleans the name and appends a timestamp to ensure uniqueness."""
-        clean_name = re.sub(r'[^\w\s-]', '', name).strip().replace(' ', '_')
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        return f"{clean_name}_{timestamp}.{extension.lower().replace('.', '')}"
+    def _blob_filename(self, content_hash: str, extension: str) -> str:
+        """Files are named after their content, so identical images share one file."""
+        return f"{content_hash}.{extension.lower().replace('.', '')}"
+
+    def blob_path(self, content_hash: str, extension: str) -> str:
+        """
+        Sharded layout: <upload_dir>/ab/cd/abcd....ext. Two hash-prefix levels
+        keep every directory small (65536 buckets) however many images there are.
+        """
+        return os.path.join(
+            self.upload_dir, content_hash[:2], content_hash[2:4],
+            self._blob_filename(content_hash, extension)
+        )
 
-    def save(self, *, name: str, extension: str, blob_data: bytes) -> str:
-        """Saves an image to disk and returns the full file path."""
-        filename = self._generate_filename(name, extension)
-        full_path = os.path.join(self.upload_dir, filename)
+    def save(self, *, content_hash: str, extension: str, blob_data: bytes) -> str:
+        """Saves an image to disk under its content hash and returns the full file path."""
+        full_path = self.blob_path(content_hash, extension)
 
         try:
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
             with open(full_path, "wb") as f:
                 f.write(blob_data)
             return full_path
         except OSError as e:
             raise ImageStorageError("file_write_error") from e
 
+    @staticmethod
+    def is_temp(filename: str) -> bool:
+        """In-flight imports; scans of the upload directory must skip them."""
+        return filename.endswith(TEMP_SUFFIX)
+
+    def new_temp_path(self) -> str:
+        """Unique temp file name in the upload directory (same filesystem, so os.replace is atomic)."""
+        return os.path.join(self.upload_dir, f".{uuid.uuid4().hex}{TEMP_SUFFIX}")
+
+    def save_stream(self, source: str | BinaryIO, check_head: Callable[[bytes], object],
+                    chunk_size: int = CHUNK_SIZE) -> tuple[str, str, int]:
+        """
+        Copies source (a path or a binary stream) into a temp file of the upload
+        directory in chunks, hashing on the way. check_head receives the first
+        bytes before anything is written and may raise to reject the file.
+        Returns (temp_path, sha256, byte_size); see commit_temp / discard_temp.
+        """
+        tmp_path = self.new_temp_path()
+        digest = hashlib.sha256()
+        size = 0
+        owns_source = isinstance(source, (str, os.PathLike))
+        fsrc = None
+        try:
+            fsrc = open(source, "rb") if owns_source else source
+            head = b""
+            while len(head) < HEAD_SIZE and (chunk := fsrc.read(HEAD_SIZE - len(head))):
+                head += chunk
+            check_head(head)
+
+            with open(tmp_path, "wb") as fdst:
+                chunk = head
+                while chunk:
+                    digest.update(chunk)
+                    fdst.write(chunk)
+                    size += len(chunk)
+                    chunk = fsrc.read(chunk_size)
+                fdst.flush()
+                os.fsync(fdst.fileno())
+            return tmp_path, digest.hexdigest(), size
+        except OSError as e:
+            self.discard_temp(tmp_path)
+            raise ImageStorageError("file_write_error") from e
+        except BaseException:
+            self.discard_temp(tmp_path)
+            raise
+        finally:
+            if owns_source and fsrc is not None:
+                fsrc.close()
+
+    def commit_temp(self, tmp_path: str, content_hash: str, extension: str) -> str:
+        """Atomically renames a streamed temp file to its blob name. Returns the final path."""
+        full_path = self.blob_path(content_hash, extension)
+        try:
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            os.replace(tmp_path, full_path)
+            return full_path
+        except OSError as e:
+            raise ImageStorageError("file_write_error") from e
+
+    def discard_temp(self, tmp_path: str) -> None:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Could not delete temp file {tmp_path}: {e}")
+
     def move_to_trash(self, file_path: str) -> str:
-        """Moves a file to the trash directory. Returns the base name of the moved file."""
+        """
+        Moves a file to the trash directory. Returns the base name of the moved file.
+        The file stays pinned until release_trash or restore_from_trash is called.
+        """
         if not os.path.exists(file_path):
             return os.path.basename(file_path)
         
         filename = os.path.basename(file_path)
         dst = os.path.join(self.trash_dir, filename)
 
+        with self._pin_lock:
+            self._pinned[filename] = file_path
         try:
-            os.rename(file_path, dst)
+            # A blob trashed earlier may still be there with the same name (and content)
+            os.replace(file_path, dst)
+            # rename keeps the original mtime; stamp it so the trash GC measures time spent in trash
+            os.utime(dst)
             return filename
         except OSError as e:
+            with self._pin_lock:
+                self._pinned.pop(filename, None)
             raise ImageStorageError("file_move_error") from e
 
     def move_to_trash_many(self, file_paths: list[str]) -> list[str]:
@@ -64,6 +159,35 @@ class ImageStorage:
             self.restore_many_from_trash(moved_filenames)
             raise ImageStorageError("bulk_move_failed_and_restored") from e
 
+    def release_trash(self, filenames: list[str]) -> None:
+        """Unpins trashed files once the operation that moved them has been committed."""
+        with self._pin_lock:
+            for filename in filenames:
+                self._pinned.pop(filename, None)
+
+    def is_pinned(self, filename: str) -> bool:
+        with self._pin_lock:
+            return filename in self._pinned
+
+    def remove_trashed(self, entry: FileStat) -> bool:
+        """
+        Deletes a scanned trash file only if it is unpinned and unchanged since
+        the scan (same size and mtime). The check and the delete hold the pin
+        lock, so a blob trashed again under the same name is never lost.
+        Returns whether the file was deleted.
+        """
+        with self._pin_lock:
+            if entry.name in self._pinned:
+                return False
+            try:
+                st = os.stat(entry.path)
+            except FileNotFoundError:
+                return False
+            if st.st_size != entry.size or st.st_mtime != entry.mtime:
+                return False
+            os.remove(entry.path)
+            return True
+
     # Compensation methods (Rollback)
 
     def undo_save(self, file_path: str) -> None:
@@ -75,15 +199,19 @@ class ImageStorage:
             logger.critical(f"File rollback failed: Could not delete {file_path}: {e}")
  
     def restore_from_trash(self, filename: str) -> None:
-        """Moves a file back from the trash to the images directory."""
+        """Moves a file back from the trash to where it was (its shard directory)."""
         src = os.path.join(self.trash_dir, filename)
-        dst = os.path.join(self.upload_dir, filename)
+        with self._pin_lock:
+            dst = self._pinned.get(filename) or os.path.join(self.upload_dir, filename)
 
         try:
             if os.path.exists(src):
-                os.rename(src, dst)
+                os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+                os.replace(src, dst)
         except OSError as e:
             logger.critical(f"File rollback failed: Could not restore {filename}: {e}")
+        finally:
+            self.release_trash([filename])
 
     def restore_many_from_trash(self, filenames: list[str]) -> None:
         """Restores a list of files from the trash directory."""
@@ -0,0 +1,25 @@
+import zlib
+
+from backend.infrastructure.repositories.sql_alchemy import models
+from backend.domain.dto.note_stats_dto import NoteStatsDTO
+
+
+def encode_vocabulary(words: frozenset[str]) -> bytes:
+    # Tokens are \w+ runs, so they never contain the separator
+    return zlib.compress("\n".join(sorted(words)).encode("utf-8"))
+
+
+def decode_vocabulary(blob: bytes) -> frozenset[str]:
+    text = zlib.decompress(blob).decode("utf-8")
+    return frozenset(text.split("\n")) if text else frozenset()
+
+
+def to_model(note_id: int, stats: NoteStatsDTO) -> models.NoteStatsModel:
+    return models.NoteStatsModel(
+        note_id=note_id,
+        n_words_total=stats.n_words_total,
+        n_meaningful=stats.n_meaningful,
+        n_unique=stats.n_unique,
+        vocabulary=encode_vocabulary(stats.vocabulary),
+        sketch=stats.sketch
+    )
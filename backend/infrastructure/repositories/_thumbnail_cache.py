@@ -0,0 +1,110 @@
+from log import logger
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from PIL import Image, ImageOps
+
+THUMBNAIL_SIZES = (128, 512)
+
+
+def _render_thumbnail(src: str, dst: str, size: int) -> str:
+    """Runs in a worker process: decodes src and writes a PNG preview that fits in size x size."""
+    tmp = f"{dst}.{os.getpid()}.tmp"
+    with Image.open(src) as img:
+        # JPEG only: let the decoder downscale by 1/2..1/8 instead of decoding every pixel
+        img.draft("RGB", (size, size))
+        thumb = ImageOps.exif_transpose(img)
+        thumb.thumbnail((size, size), Image.Resampling.LANCZOS)
+        if thumb.mode not in ("RGB", "RGBA"):
+            thumb = thumb.convert("RGBA")
+        thumb.save(tmp, "PNG")
+    os.replace(tmp, dst)
+    return dst
+
+
+def _is_fresh(src: str, dst: str) -> bool:
+    """A thumbnail is valid while it is newer than its source file."""
+    try:
+        return os.stat(dst).st_mtime_ns >= os.stat(src).st_mtime_ns
+    except OSError:
+        return False
+
+
+class ThumbnailCache:
+    """
+    Fixed-size previews cached on disk as <key>_<size>.png, where key is the
+    image content hash. Rendering happens in a process pool (PIL decoding is
+    CPU bound); concurrent requests for the same thumbnail share one render.
+    Nothing here waits for a render: callers get a Future of the path.
+    """
+    def __init__(self, cache_dir: str = "_uploads/thumbnails/",
+                 sizes: tuple[int, ...] = THUMBNAIL_SIZES,
+                 workers: int | None = None):
+        self.cache_dir = cache_dir
+        self.sizes = sizes
+        self.workers = workers or max(1, (os.cpu_count() or 2) // 2)
+        self._pool: ProcessPoolExecutor | None = None
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.RLock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def path_for(self, key: str, size: int) -> str:
+        return os.path.join(self.cache_dir, f"{key}_{size}.png")
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Created on first use so opening a vault does not spawn processes
+        if self._pool is None:
+            # Spawned, not forked: the UI and maintenance threads are already running
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def _submit(self, src: str, dst: str, size: int) -> Future:
+        with self._lock:
+            future = self._inflight.get(dst)
+            if future is None:
+                # Absolute paths: a spawned worker does not share this process's state
+                future = self._get_pool().submit(_render_thumbnail, os.path.abspath(src), os.path.abspath(dst), size)
+                self._inflight[dst] = future
+                future.add_done_callback(lambda f, d=dst: self._done(d, f))
+            return future
+
+    def _done(self, dst: str, future: Future) -> None:
+        with self._lock:
+            self._inflight.pop(dst, None)
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("render_thumbnail(%s) [Error]: %s", dst, future.exception())
+
+    # ---------- public ----------
+    def request(self, src: str, key: str, size: int) -> Future:
+        """Future of the thumbnail path: already done if the cached file is fresh, else its render."""
+        dst = self.path_for(key, size)
+        if _is_fresh(src, dst):
+            future = Future()
+            future.set_result(dst)
+            return future
+        return self._submit(src, dst, size)
+
+    def prefetch(self, src: str, key: str) -> None:
+        """Queues every size without waiting (used right after an import)."""
+        for size in self.sizes:
+            dst = self.path_for(key, size)
+            if not _is_fresh(src, dst):
+                self._submit(src, dst, size)
+
+    def discard(self, key: str) -> None:
+        """Removes the thumbnails of a content that no longer exists."""
+        for size in self.sizes:
+            try:
+                os.remove(self.path_for(key, size))
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logger.error("discard_thumbnail(%s, %s) [OSError]: %s", key, size, e)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,98 @@
+from log import logger
+import time
+
+from backend.infrastructure.repositories._image_storage import ImageStorage
+from backend.infrastructure.repositories._file_utils import FileStat, scan_files
+from backend.infrastructure.dto.trash_record_dto import TrashRecordDTO
+
+
+class TrashCollector:
+    """
+    Garbage collector for the image trash directory.
+    Files older than max_age_days are deleted, then the oldest ones until the
+    trash fits in max_total_bytes. Files pinned by a pending rollback are never touched.
+    """
+    def __init__(self, image_store: ImageStorage,
+                 max_age_days: float = 30.0,
+                 max_total_bytes: int = 512 * 1024 * 1024,
+                 batch_size: int = 200,
+                 workers: int = 8,
+                 stat_chunk: int = 512):
+        self.image_store = image_store
+        self.max_age_days = max_age_days
+        self.max_total_bytes = max_total_bytes
+        self.batch_size = batch_size
+        self.workers = workers
+        self.stat_chunk = stat_chunk
+        self._pending: list[FileStat] | None = None
+
+    # ---------- scan ----------
+    def scan(self) -> list[FileStat]:
+        """Scans the trash in parallel and returns every file, oldest first."""
+        entries = scan_files(self.image_store.trash_dir, self.workers, self.stat_chunk)
+        entries.sort(key=lambda e: e.mtime)
+        return entries
+
+    # ---------- policy ----------
+    def plan(self, entries: list[FileStat], now: float | None = None) -> list[FileStat]:
+        """Chooses what to delete: expired files first, then the oldest until under budget."""
+        now = time.time() if now is None else now
+        max_age = self.max_age_days * 86400
+        total = sum(e.size for e in entries)
+        doomed = []
+        for entry in entries:
+            if self.image_store.is_pinned(entry.name):
+                continue
+            if now - entry.mtime > max_age or total > self.max_total_bytes:
+                doomed.append(entry)
+                total -= entry.size
+        return doomed
+
+    def delete_batch(self, entries: list[FileStat]) -> tuple[int, int]:
+        """Deletes a batch of trash files. Returns (files_deleted, bytes_freed)."""
+        deleted = freed = 0
+        for entry in entries:
+            # The plan may be from an earlier run: since then a rollback may have pinned
+            # the file, or the same blob may have been trashed again (fresh mtime)
+            try:
+                if self.image_store.remove_trashed(entry):
+                    deleted += 1
+                    freed += entry.size
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logger.error("trash_gc delete(%s) [OSError]: %s", entry.path, e)
+        return deleted, freed
+
+    # ---------- runs ----------
+    def collect(self) -> TrashRecordDTO:
+        """Full on-demand run."""
+        started = time.perf_counter()
+        entries = self.scan()
+        doomed = self.plan(entries)
+        deleted = freed = 0
+        for i in range(0, len(doomed), self.batch_size):
+            d, f = self.delete_batch(doomed[i:i + self.batch_size])
+            deleted += d
+            freed += f
+
+        record = TrashRecordDTO(
+            scanned=len(entries),
+            deleted=deleted,
+            bytes_freed=freed,
+            bytes_remaining=sum(e.size for e in entries) - freed,
+            seconds=round(time.perf_counter() - started, 3)
+        )
+        logger.info("trash_gc collect() [Success] - %s", record)
+        return record
+
+    def step(self) -> tuple[bool, str]:
+        """Scheduled run: scans on the first call, then deletes one batch per call."""
+        if self._pending is None:
+            self._pending = self.plan(self.scan())
+        batch, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+        deleted, freed = self.delete_batch(batch)
+        finished = not self._pending
+        if finished:
+            self._pending = None
+        return finished, f"{deleted} archivos eliminados ({freed} bytes)"
@@ -1,11 +1,27 @@
 from log import logger
-from sqlalchemy import func, distinct
+from datetime import date
+from itertools import chain
+from typing import Iterator
+
+import numpy as np
+from sqlalchemy import case, func, distinct, select, true
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
 from backend.infrastructure.repositories.sql_alchemy import models
 from backend.infrastructure.errors.db import RepositoryError
 from backend.infrastructure.dto.theme_raw_stats_dto import ThemeRawStatsDTO
+from backend.infrastructure.dto.note_lexical_record_dto import NoteLexicalRecordDTO
+from backend.infrastructure.dto.theme_direct_stats_dto import ThemeDirectStatsDTO
+from backend.infrastructure.dto.time_series_record_dto import TimeSeriesRecordDTO
+from backend.infrastructure.dto.note_analytics_record_dto import NoteAnalyticsRecordDTO
+from backend.infrastructure.repositories._note_stats import decode_vocabulary
+
+# Rows fetched per round trip when streaming note contents
+CONTENT_CHUNK_SIZE = 64
+# julianday() of 1970-01-01 00:00 UTC
+UNIX_EPOCH_JULIAN_DAY = 2440587.5
+
 
 class AnalyticsRepository:
     def __init__(self, session: Session):
@@ -59,19 +75,361 @@ class AnalyticsRepository:
             logger.exception("count_direct_notes(id=%s) [Unexpected error]", theme_id)
             raise RepositoryError("unexpected_error") from e
 
-    def get_aggregated_content(self, family_theme_ids: list[int], theme_id: int) -> str:
-        """Retrieves the content for lexical analysis."""
+    @staticmethod
+    def _content_stmt(columns: list, family_theme_ids: list[int] | None, unanalyzed_only: bool, exact: bool):
+        """Note contents of the themes (every theme when None); see iter_aggregated_content."""
+        stmt = select(*columns).where(models.NoteModel.content.is_not(None))
+        if family_theme_ids is None:
+            stmt = stmt.where(models.NoteModel.theme_id.is_not(None))
+        else:
+            stmt = stmt.where(models.NoteModel.theme_id.in_(family_theme_ids))
+        if unanalyzed_only:
+            digest_column = models.NoteStatsModel.vocabulary if exact else models.NoteStatsModel.sketch
+            stmt = (
+                stmt.outerjoin(models.NoteStatsModel, models.NoteStatsModel.note_id == models.NoteModel.id)
+                .where(digest_column.is_(None))
+            )
+        return stmt
+
+    def _stream(self, stmt, op: str, chunk_size: int) -> Iterator:
+        n_rows = 0
         try:
-            notes_content = (
-                self.session.query(models.NoteModel.content)
-                .filter(models.NoteModel.theme_id.in_(family_theme_ids))
+            for row in self.session.execute(stmt.execution_options(yield_per=chunk_size)):
+                n_rows += 1
+                yield row
+            logger.info("%s [Success] - %d notes", op, n_rows)
+        except SQLAlchemyError as e:
+            logger.error("%s [SQLAlchemyError]: %s", op, e)
+            raise RepositoryError("db_error") from e
+
+    def iter_aggregated_content(self, family_theme_ids: list[int], theme_id: int,
+                                unanalyzed_only: bool = False, exact: bool = False,
+                                chunk_size: int = CONTENT_CHUNK_SIZE) -> Iterator[str]:
+        """
+        Yields the content of every note in the themes, fetching `chunk_size` rows
+        at a time: memory is bounded by one chunk, not by the subtree. With
+        `unanalyzed_only`, only notes without the stored digest that
+        get_note_lexical_stats would use (vocabulary if `exact`, else sketch).
+        """
+        stmt = self._content_stmt([models.NoteModel.content], family_theme_ids, unanalyzed_only, exact)
+        for (content,) in self._stream(stmt, f"iter_aggregated_content(theme_id={theme_id})", chunk_size):
+            yield content
+
+    def iter_content_by_theme(self, unanalyzed_only: bool = False, exact: bool = False,
+                              chunk_size: int = CONTENT_CHUNK_SIZE) -> Iterator[tuple[int, str]]:
+        """(theme_id, content) of every note in a theme, ordered by theme; streamed like iter_aggregated_content."""
+        stmt = self._content_stmt(
+            [models.NoteModel.theme_id, models.NoteModel.content], None, unanalyzed_only, exact
+        ).order_by(models.NoteModel.theme_id)
+        for theme_id, content in self._stream(stmt, "iter_content_by_theme()", chunk_size):
+            yield theme_id, content
+
+    def get_note_lexical_stats(self, family_theme_ids: list[int] | None, theme_id: int | None,
+                               exact: bool = False) -> list[NoteLexicalRecordDTO]:
+        """
+        Stored lexical statistics of the notes in the themes (every theme when
+        None): the vocabulary when `exact`, else only the HyperLogLog sketch
+        (far smaller to load). Notes without the one needed are left out; see
+        iter_aggregated_content.
+        """
+        digest_column = models.NoteStatsModel.vocabulary if exact else models.NoteStatsModel.sketch
+        theme_filter = (
+            models.NoteModel.theme_id.is_not(None) if family_theme_ids is None
+            else models.NoteModel.theme_id.in_(family_theme_ids)
+        )
+        try:
+            rows = (
+                self.session.query(
+                    models.NoteModel.id,
+                    models.NoteModel.theme_id,
+                    models.NoteStatsModel.n_words_total,
+                    models.NoteStatsModel.n_meaningful,
+                    digest_column
+                )
+                .join(models.NoteStatsModel, models.NoteStatsModel.note_id == models.NoteModel.id)
+                .filter(theme_filter, digest_column.is_not(None))
+                .all()
+            )
+            logger.info("get_note_lexical_stats(theme_id=%s) [Success] - %d notes", theme_id, len(rows))
+            return [
+                NoteLexicalRecordDTO(
+                    note_id=note_id,
+                    theme_id=note_theme_id,
+                    n_words_total=n_words_total,
+                    n_meaningful=n_meaningful,
+                    vocabulary=decode_vocabulary(digest) if exact else None,
+                    sketch=digest if not exact else None
+                )
+                for note_id, note_theme_id, n_words_total, n_meaningful, digest in rows
+            ]
+        except SQLAlchemyError as e:
+            logger.error("get_note_lexical_stats(id=%s) [SQLAlchemyError]: %s", theme_id, e)
+            raise RepositoryError("db_error") from e
+        except Exception as e:
+            logger.exception("get_note_lexical_stats(id=%s) [Unexpected error]", theme_id)
+            raise RepositoryError("unexpected_error") from e
+
+    def get_note_analytics_records(self, note_ids: list[int]) -> list[NoteAnalyticsRecordDTO]:
+        """
+        Per-note analytics inputs for every id in one query: sessions, minutes and
+        active days come from a single GROUP BY over the id set, lexical counts
+        from note_stats. Content is only fetched for notes without stored counts.
+        Ids with no note are absent.
+        """
+        times = (
+            select(
+                models.TimeModel.note_id,
+                func.count(models.TimeModel.id).label("n_sessions"),
+                func.sum(models.TimeModel.minutes).label("minutes"),
+                func.count(distinct(func.date(models.TimeModel.created_at))).label("days")
+            )
+            .where(models.TimeModel.note_id.in_(note_ids))
+            .group_by(models.TimeModel.note_id)
+            .subquery()
+        )
+        stmt = (
+            select(
+                models.NoteModel.id,
+                models.NoteModel.name,
+                models.NoteModel.created_at,
+                models.NoteModel.last_edited_at,
+                func.coalesce(times.c.minutes, 0),
+                func.coalesce(times.c.n_sessions, 0),
+                func.coalesce(times.c.days, 0),
+                models.NoteStatsModel.n_words_total,
+                models.NoteStatsModel.n_meaningful,
+                models.NoteStatsModel.n_unique,
+                case((models.NoteStatsModel.note_id.is_(None), models.NoteModel.content), else_=None)
+            )
+            .outerjoin(times, times.c.note_id == models.NoteModel.id)
+            .outerjoin(models.NoteStatsModel, models.NoteStatsModel.note_id == models.NoteModel.id)
+            .where(models.NoteModel.id.in_(note_ids))
+        )
+        try:
+            records = [NoteAnalyticsRecordDTO(*row) for row in self.session.execute(stmt)]
+            logger.info("get_note_analytics_records(n=%d) [Success] - %d notes found", len(note_ids), len(records))
+            return records
+        except SQLAlchemyError as e:
+            logger.error("get_note_analytics_records(n=%d) [SQLAlchemyError]: %s", len(note_ids), e)
+            raise RepositoryError("db_error") from e
+        except Exception as e:
+            logger.exception("get_note_analytics_records(n=%d) [Unexpected error]", len(note_ids))
+            raise RepositoryError("unexpected_error") from e
+
+    def _time_stamp(self, *where):
+        """Count, max id and minutes of the matching time records: a new or removed session changes it."""
+        return (
+            select(
+                func.count(models.TimeModel.id).label("n_times"),
+                func.max(models.TimeModel.id).label("max_time_id"),
+                func.sum(models.TimeModel.minutes).label("minutes")
+            )
+            .where(*where)
+            .subquery()
+        )
+
+    def get_note_version_stamp(self, note_id: int) -> tuple | None:
+        """
+        Cheap value that changes whenever the note's analytics may change (name,
+        edit time, content version, sessions), in one query. None if the note
+        does not exist.
+        """
+        times = self._time_stamp(models.TimeModel.note_id == note_id)
+        stmt = (
+            select(
+                models.NoteModel.name,
+                models.NoteModel.last_edited_at,
+                models.NoteModel.content_version,
+                times.c.n_times, times.c.max_time_id, times.c.minutes
+            )
+            .select_from(models.NoteModel)
+            .join(times, true())
+            .where(models.NoteModel.id == note_id)
+        )
+        try:
+            row = self.session.execute(stmt).first()
+            logger.info("get_note_version_stamp(id=%s) [Success]", note_id)
+            return tuple(row) if row else None
+        except SQLAlchemyError as e:
+            logger.error("get_note_version_stamp(id=%s) [SQLAlchemyError]: %s", note_id, e)
+            raise RepositoryError("db_error") from e
+
+    def get_theme_version_stamp(self, theme_id: int) -> tuple | None:
+        """
+        Same as get_note_version_stamp for a theme subtree: the theme row, which
+        themes and notes the subtree holds (counts, id sums and membership
+        version sums), the sum of their content versions and the subtree's
+        sessions, in one query. Every row that enters the subtree carries a
+        membership version above any the stamp was taken with, so a change of
+        members always changes the sums even when counts and ids balance out.
+        """
+        hierarchy = (
+            select(models.ThemeModel.id, models.ThemeModel.membership_version)
+            .where(models.ThemeModel.id == theme_id)
+            .cte(recursive=True, name="theme_stamp_hierarchy")
+        )
+        hierarchy = hierarchy.union_all(
+            select(models.ThemeModel.id, models.ThemeModel.membership_version)
+            .where(models.ThemeModel.parent_id == hierarchy.c.id)
+        )
+        in_subtree = models.NoteModel.theme_id.in_(select(hierarchy.c.id))
+        themes = select(
+            func.count(hierarchy.c.id).label("n_themes"),
+            func.sum(hierarchy.c.id).label("theme_ids"),
+            func.sum(hierarchy.c.membership_version).label("theme_memberships")
+        ).subquery()
+        notes = select(
+            func.count(models.NoteModel.id).label("n_notes"),
+            func.sum(models.NoteModel.id).label("note_ids"),
+            func.sum(models.NoteModel.membership_version).label("note_memberships"),
+            func.sum(models.NoteModel.content_version).label("content_versions"),
+            func.sum(case((models.NoteModel.theme_id == theme_id, 1), else_=0)).label("n_direct")
+        ).where(in_subtree).subquery()
+        times = self._time_stamp(
+            models.TimeModel.note_id.in_(select(models.NoteModel.id).where(in_subtree))
+        )
+        stmt = (
+            select(
+                models.ThemeModel.name,
+                models.ThemeModel.last_edited_at,
+                themes.c.n_themes, themes.c.theme_ids, themes.c.theme_memberships,
+                notes.c.n_notes, notes.c.note_ids, notes.c.note_memberships, notes.c.content_versions, notes.c.n_direct,
+                times.c.n_times, times.c.max_time_id, times.c.minutes
+            )
+            .select_from(models.ThemeModel)
+            .join(themes, true())
+            .join(notes, true())
+            .join(times, true())
+            .where(models.ThemeModel.id == theme_id)
+        )
+        try:
+            row = self.session.execute(stmt).first()
+            logger.info("get_theme_version_stamp(id=%s) [Success]", theme_id)
+            return tuple(row) if row else None
+        except SQLAlchemyError as e:
+            logger.error("get_theme_version_stamp(id=%s) [SQLAlchemyError]: %s", theme_id, e)
+            raise RepositoryError("db_error") from e
+
+    def get_direct_stats_by_theme(self) -> dict[int, ThemeDirectStatsDTO]:
+        """
+        Note count, minutes and active days of the notes placed directly in each
+        theme, from three grouped queries over the whole vault. Themes without
+        notes are absent.
+        """
+        try:
+            n_notes = dict(
+                self.session.query(models.NoteModel.theme_id, func.count(models.NoteModel.id))
+                .filter(models.NoteModel.theme_id.is_not(None))
+                .group_by(models.NoteModel.theme_id)
+                .all()
+            )
+            minutes = dict(
+                self.session.query(models.NoteModel.theme_id, func.sum(models.TimeModel.minutes))
+                .join(models.TimeModel, models.NoteModel.id == models.TimeModel.note_id)
+                .filter(models.NoteModel.theme_id.is_not(None))
+                .group_by(models.NoteModel.theme_id)
                 .all()
             )
-            logger.info("get_aggregated_content(theme_id=%s) [Success]", theme_id)
-            return " ".join([c[0] for c in notes_content if c[0]])
+            days: dict[int, set[str]] = {}
+            for theme_id, day in (
+                self.session.query(models.NoteModel.theme_id, func.date(models.TimeModel.created_at))
+                .join(models.TimeModel, models.NoteModel.id == models.TimeModel.note_id)
+                .filter(models.NoteModel.theme_id.is_not(None))
+                .distinct()
+            ):
+                days.setdefault(theme_id, set()).add(day)
+
+            logger.info("get_direct_stats_by_theme() [Success] - %d themes with notes", len(n_notes))
+            return {
+                theme_id: ThemeDirectStatsDTO(
+                    theme_id=theme_id,
+                    n_notes=count,
+                    minutes=minutes.get(theme_id) or 0,
+                    active_days=frozenset(days.get(theme_id, ()))
+                )
+                for theme_id, count in n_notes.items()
+            }
+        except SQLAlchemyError as e:
+            logger.error("get_direct_stats_by_theme() [SQLAlchemyError]: %s", e)
+            raise RepositoryError("db_error") from e
+        except Exception as e:
+            logger.exception("get_direct_stats_by_theme() [Unexpected error]")
+            raise RepositoryError("unexpected_error") from e
+
+    def get_time_series(self, note_id: int | None = None,
+                        family_theme_ids: list[int] | None = None) -> TimeSeriesRecordDTO:
+        """
+        Time records of one note, or of every note in the themes, as NumPy arrays
+        (unordered). Days are computed in SQL with julianday() and the rows go
+        straight into the arrays without building datetime objects.
+        """
+        stmt = (
+            select(
+                models.TimeModel.note_id,
+                func.julianday(models.TimeModel.created_at) - UNIX_EPOCH_JULIAN_DAY,
+                models.TimeModel.minutes
+            )
+        )
+        if note_id is not None:
+            stmt = stmt.where(models.TimeModel.note_id == note_id)
+            scope = f"note_id={note_id}"
+        else:
+            stmt = (
+                stmt.join(models.NoteModel, models.NoteModel.id == models.TimeModel.note_id)
+                .where(models.NoteModel.theme_id.in_(family_theme_ids or []))
+            )
+            scope = f"themes={len(family_theme_ids or [])}"
+        try:
+            rows = self.session.execute(stmt).all()
+            table = np.fromiter(chain.from_iterable(rows), dtype=np.float64, count=3 * len(rows)).reshape(-1, 3)
+            logger.info("get_time_series(%s) [Success] - %d records", scope, len(rows))
+            return TimeSeriesRecordDTO(
+                note_ids=table[:, 0].astype(np.int64),
+                days=np.floor(table[:, 1]).astype(np.int64),
+                minutes=table[:, 2]
+            )
         except SQLAlchemyError as e:
-            logger.error("get_aggregated_content(id=%s) [SQLAlchemyError]: %s", theme_id, e)
+            logger.error("get_time_series(%s) [SQLAlchemyError]: %s", scope, e)
             raise RepositoryError("db_error") from e
         except Exception as e:
-            logger.exception("get_aggregated_content(id=%s) [Unexpected error]", theme_id)
-            raise RepositoryError("unexpected_error") from e
\ No newline at end of file
+            logger.exception("get_time_series(%s) [Unexpected error]", scope)
+            raise RepositoryError("unexpected_error") from e
+
+    def get_daily_minutes(self, start: date, end: date,
+                          note_id: int | None = None,
+                          family_theme_ids: list[int] | None = None,
+                          days: list[date] | None = None) -> dict[date, float]:
+        """
+        Minutes per UTC day from start to end (inclusive) of one note, of the notes
+        in the themes or, with neither, of the whole vault, in one grouped query.
+        `days` restricts it to those days. Days without sessions are absent.
+        """
+        day = func.date(models.TimeModel.created_at)
+        stmt = (
+            select(day, func.sum(models.TimeModel.minutes))
+            .where(day.between(start.isoformat(), end.isoformat()))
+            .group_by(day)
+        )
+        if note_id is not None:
+            stmt = stmt.where(models.TimeModel.note_id == note_id)
+            scope = f"note_id={note_id}"
+        elif family_theme_ids is not None:
+            stmt = (
+                stmt.join(models.NoteModel, models.NoteModel.id == models.TimeModel.note_id)
+                .where(models.NoteModel.theme_id.in_(family_theme_ids))
+            )
+            scope = f"themes={len(family_theme_ids)}"
+        else:
+            scope = "vault"
+        if days is not None:
+            stmt = stmt.where(day.in_([d.isoformat() for d in days]))
+        try:
+            rows = self.session.execute(stmt).all()
+            logger.info("get_daily_minutes(%s, %s..%s) [Success] - %d days", scope, start, end, len(rows))
+            return {date.fromisoformat(d): minutes for d, minutes in rows}
+        except SQLAlchemyError as e:
+            logger.error("get_daily_minutes(%s) [SQLAlchemyError]: %s", scope, e)
+            raise RepositoryError("db_error") from e
+        except Exception as e:
+            logger.exception("get_daily_minutes(%s) [Unexpected error]", scope)
+            raise RepositoryError("unexpected_error") from e
@@ -0,0 +1,281 @@
+from log import logger
+import json
+import os
+import shutil
+import sqlite3
+import time
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from backend.infrastructure.repositories._image_storage import ImageStorage, ImageStorageError
+from backend.infrastructure.repositories._file_utils import copy_with_hash, iter_files, sha256_file
+from backend.infrastructure.errors.db import RepositoryError
+from backend.infrastructure.dto.backup_record_dto import BackupRecordDTO
+
+MANIFEST_NAME = "manifest.json"
+DB_NAME = "app.db"
+IMAGES_DIR = "images"
+
+
+class BackupRepository:
+    """
+    Online backups of the database and the image store.
+    The database is copied with the sqlite3 backup API in small page steps,
+    releasing the lock between steps so the application can keep writing.
+    Images are hardlinked from the previous snapshot when unchanged.
+    """
+    def __init__(self, session: Session, image_store: ImageStorage | None = None,
+                 pages_per_step: int = 256, step_pause: float = 0.005):
+        self.session = session
+        self.image_store = image_store or ImageStorage()
+        self.pages_per_step = pages_per_step
+        self.step_pause = step_pause
+        logger.info("BackupRepository initialized successfully: %s", session)
+
+    # ---------- helpers ----------
+    def _db_path(self) -> str:
+        database = self.session.get_bind().url.database
+        if not database or database == ":memory:":
+            raise RepositoryError("backup_unsupported")
+        return os.path.abspath(database)
+
+    def _copy_db(self, src_path: str, dst_path: str) -> int:
+        """Copies a database page by page. Returns the number of pages copied."""
+        pages = {"total": 0}
+
+        def progress(status, remaining, total):
+            pages["total"] = total
+            # Gives writers a chance to grab the lock between steps
+            time.sleep(self.step_pause)
+
+        src = sqlite3.connect(src_path)
+        dst = sqlite3.connect(dst_path)
+        try:
+            src.backup(dst, pages=self.pages_per_step, progress=progress)
+        finally:
+            dst.close()
+            src.close()
+        return pages["total"]
+
+    @staticmethod
+    def _read_manifest(snapshot_dir: str) -> dict | None:
+        path = os.path.join(snapshot_dir, MANIFEST_NAME)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _latest_snapshot(dest_dir: str) -> str | None:
+        """Returns the most recent complete snapshot (one with a manifest)."""
+        if not os.path.isdir(dest_dir):
+            return None
+        snapshots = sorted(
+            entry.path for entry in os.scandir(dest_dir)
+            if entry.is_dir() and os.path.exists(os.path.join(entry.path, MANIFEST_NAME))
+        )
+        return snapshots[-1] if snapshots else None
+
+    def _snapshot_images(self, snapshot_dir: str, previous_dir: str | None,
+                         previous_files: dict) -> tuple[dict, int, int, int]:
+        """Copies changed files and hardlinks unchanged ones from the previous snapshot."""
+        files = {}
+        copied = linked = bytes_copied = 0
+        images_dir = os.path.join(snapshot_dir, IMAGES_DIR)
+
+        for rel_path, entry in iter_files(self.image_store.upload_dir):
+            if self.image_store.is_temp(entry.name):
+                continue
+            st = entry.stat()
+            dst = os.path.join(images_dir, rel_path)
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+
+            prev = previous_files.get(rel_path)
+            if prev and previous_dir and prev["size"] == st.st_size and prev["mtime_ns"] == st.st_mtime_ns:
+                try:
+                    os.link(os.path.join(previous_dir, IMAGES_DIR, rel_path), dst)
+                    files[rel_path] = prev
+                    linked += 1
+                    continue
+                except OSError:
+                    # Filesystem without hardlinks or previous file gone: fall back to a copy
+                    pass
+
+            sha, size = copy_with_hash(entry.path, dst)
+            files[rel_path] = {"sha256": sha, "size": size, "mtime_ns": st.st_mtime_ns}
+            copied += 1
+            bytes_copied += size
+
+        return files, copied, linked, bytes_copied
+
+    # ---------- operations ----------
+    def create_snapshot(self, dest_dir: str) -> BackupRecordDTO:
+        """Creates a new snapshot folder inside dest_dir."""
+        started = time.perf_counter()
+        snapshot_dir = None
+        try:
+            db_path = self._db_path()
+            os.makedirs(dest_dir, exist_ok=True)
+
+            previous_dir = self._latest_snapshot(dest_dir)
+            previous = self._read_manifest(previous_dir) if previous_dir else None
+            previous_files = previous["files"] if previous else {}
+
+            name = datetime.now().strftime("snapshot_%Y%m%d_%H%M%S_%f")
+            snapshot_dir = os.path.join(dest_dir, name)
+            os.makedirs(snapshot_dir)
+
+            db_dst = os.path.join(snapshot_dir, DB_NAME)
+            db_pages = self._copy_db(db_path, db_dst)
+
+            files, copied, linked, bytes_copied = self._snapshot_images(
+                snapshot_dir, previous_dir, previous_files
+            )
+
+            manifest = {
+                "created_at": datetime.now().isoformat(),
+                "db": {"path": DB_NAME, "sha256": sha256_file(db_dst), "size": os.path.getsize(db_dst)},
+                "files": files,
+            }
+            # The manifest is written last: its presence marks the snapshot as complete
+            tmp_manifest = os.path.join(snapshot_dir, MANIFEST_NAME + ".tmp")
+            with open(tmp_manifest, "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            os.replace(tmp_manifest, os.path.join(snapshot_dir, MANIFEST_NAME))
+
+            seconds = round(time.perf_counter() - started, 3)
+            logger.info(
+                "create_snapshot(dest=%s) [Success] - %d pages, %d copied, %d linked, %.3fs",
+                snapshot_dir, db_pages, copied, linked, seconds
+            )
+            return BackupRecordDTO(
+                snapshot_dir=snapshot_dir,
+                db_pages=db_pages,
+                files_copied=copied,
+                files_linked=linked,
+                bytes_copied=bytes_copied,
+                seconds=seconds
+            )
+
+        except RepositoryError:
+            raise
+        except (OSError, sqlite3.Error) as e:
+            logger.exception("create_snapshot(dest=%s) [BackupError]: %s", dest_dir, e)
+            if snapshot_dir:
+                shutil.rmtree(snapshot_dir, ignore_errors=True)
+            raise RepositoryError("backup_error") from e
+
+    def verify_snapshot(self, snapshot_dir: str) -> list[str]:
+        """Checks every file of a snapshot against its manifest. Returns the corrupt or missing paths."""
+        manifest = self._read_manifest(snapshot_dir)
+        if manifest is None:
+            logger.warning("verify_snapshot(dir=%s) [Manifest not found]", snapshot_dir)
+            raise RepositoryError("manifest_not_found")
+
+        expected = {manifest["db"]["path"]: manifest["db"]["sha256"]}
+        expected.update({
+            os.path.join(IMAGES_DIR, rel): meta["sha256"] for rel, meta in manifest["files"].items()
+        })
+
+        bad = []
+        for rel, sha in expected.items():
+            path = os.path.join(snapshot_dir, rel)
+            try:
+                if sha256_file(path) != sha:
+                    bad.append(rel)
+            except OSError:
+                bad.append(rel)
+
+        logger.info("verify_snapshot(dir=%s) [Success] - %d bad files", snapshot_dir, len(bad))
+        return bad
+
+    def _stage_images(self, snapshot_dir: str, files: dict) -> tuple[list[tuple[str, str]], int]:
+        """
+        Copies the snapshot files that differ from the live ones to temp files of
+        the upload directory and checks their hashes; nothing live is touched.
+        Returns the (temp, destination) pairs and the bytes copied.
+        """
+        staged = []
+        bytes_copied = 0
+        upload_dir = self.image_store.upload_dir
+        try:
+            for rel, meta in files.items():
+                dst = os.path.join(upload_dir, rel)
+                if os.path.exists(dst) and os.path.getsize(dst) == meta["size"] \
+                        and sha256_file(dst) == meta["sha256"]:
+                    continue
+                tmp = self.image_store.new_temp_path()
+                staged.append((tmp, dst))
+                sha, size = copy_with_hash(os.path.join(snapshot_dir, IMAGES_DIR, rel), tmp)
+                if sha != meta["sha256"]:
+                    raise RepositoryError("checksum_mismatch")
+                bytes_copied += size
+            return staged, bytes_copied
+        except BaseException:
+            for tmp, _ in staged:
+                self.image_store.discard_temp(tmp)
+            raise
+
+    def _trash_unlisted(self, files: dict) -> int:
+        """Moves live image files the snapshot does not list to the trash (the trash GC deletes them later)."""
+        unlisted = [
+            entry.path for rel, entry in iter_files(self.image_store.upload_dir)
+            if not self.image_store.is_temp(entry.name) and rel not in files
+        ]
+        moved = self.image_store.move_to_trash_many(unlisted)
+        self.image_store.release_trash(moved)
+        return len(moved)
+
+    def restore_snapshot(self, snapshot_dir: str) -> BackupRecordDTO:
+        """
+        Restores a snapshot over the live database and image store.
+        The caller must verify the snapshot first. Every changed image is staged
+        and checked before the database is replaced, so a failure up to that
+        point leaves the live vault untouched; staged files are then renamed
+        into place and files the snapshot does not list go to the trash.
+        """
+        started = time.perf_counter()
+        manifest = self._read_manifest(snapshot_dir)
+        if manifest is None:
+            raise RepositoryError("manifest_not_found")
+        staged = []
+        try:
+            db_path = self._db_path()
+            staged, bytes_copied = self._stage_images(snapshot_dir, manifest["files"])
+
+            # Releases the session's connection so the restore can take the write lock
+            self.session.close()
+            db_pages = self._copy_db(os.path.join(snapshot_dir, manifest["db"]["path"]), db_path)
+
+            copied = len(staged)
+            while staged:
+                tmp, dst = staged[-1]
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                os.replace(tmp, dst)
+                staged.pop()
+            trashed = self._trash_unlisted(manifest["files"])
+
+            seconds = round(time.perf_counter() - started, 3)
+            logger.info(
+                "restore_snapshot(dir=%s) [Success] - %d pages, %d files restored, %d unlisted trashed, %.3fs",
+                snapshot_dir, db_pages, copied, trashed, seconds
+            )
+            return BackupRecordDTO(
+                snapshot_dir=snapshot_dir,
+                db_pages=db_pages,
+                files_copied=copied,
+                files_linked=0,
+                bytes_copied=bytes_copied,
+                seconds=seconds
+            )
+
+        except RepositoryError:
+            raise
+        except (OSError, sqlite3.Error, ImageStorageError) as e:
+            logger.exception("restore_snapshot(dir=%s) [RestoreError]: %s", snapshot_dir, e)
+            raise RepositoryError("restore_error") from e
+        finally:
+            # Only left over if the restore failed before every staged file was renamed into place
+            for tmp, _ in staged:
+                self.image_store.discard_temp(tmp)
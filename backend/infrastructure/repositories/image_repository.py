@@ -1,18 +1,50 @@
 from log import logger
-from sqlalchemy import delete, select
+import hashlib
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Callable
+
+from sqlalchemy import delete, select, update
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 from backend.infrastructure.repositories._image_storage import ImageStorage, ImageStorageError
+from backend.infrastructure.repositories._trash_collector import TrashCollector
+from backend.infrastructure.repositories._image_reconciler import ImageReconciler
+from backend.infrastructure.repositories._image_deduplicator import ImageDeduplicator
+from backend.infrastructure.repositories._thumbnail_cache import ThumbnailCache
+from backend.infrastructure.repositories._image_metadata import ImageMetadataBackfill, read_metadata
+from backend.infrastructure.dto.image_metadata_record_dto import ImageMetadataRecordDTO
+from backend.infrastructure.repositories._image_layout_migration import ImageLayoutMigration
+from backend.infrastructure.dto.image_layout_record_dto import ImageLayoutRecordDTO
+from backend.infrastructure.repositories._image_exporter import ImageExporter, export_file
+from backend.infrastructure.dto.image_export_record_dto import ImageExportRecordDTO
+from backend.infrastructure.dto.image_dedup_record_dto import ImageDedupRecordDTO
+from backend.infrastructure.dto.image_import_record_dto import ImageImportRecordDTO
+from backend.infrastructure.dto.trash_record_dto import TrashRecordDTO
+from backend.infrastructure.dto.image_store_record_dto import ImageStoreRecordDTO
 from backend.infrastructure.repositories.sql_alchemy import models
 from backend.infrastructure.errors.db import RepositoryError, UniqueConstraintViolation
 
 from backend.domain.models.image import Image 
+from backend.domain.errors.image_errors import InvalidImageContentError
 from backend.domain.dto.new_image_dto import NewImageDTO
+from backend.domain.dto.new_image_source_dto import NewImageSourceDTO
 
 class ImageRepository():
-    def __init__(self, session):
+    def __init__(self, session, image_store: ImageStorage | None = None,
+                 thumbnails: ThumbnailCache | None = None):
         self.session = session
-        self.image_store = ImageStorage()
+        self.image_store = image_store or ImageStorage()
+        self.thumbnails = thumbnails or ThumbnailCache()
+        self.trash_collector = TrashCollector(self.image_store)
+        self.reconciler = ImageReconciler(session, self.image_store)
+        self.deduplicator = ImageDeduplicator(session, self.image_store)
+        self.metadata_backfill = ImageMetadataBackfill(session)
+        self.layout_migration = ImageLayoutMigration(session, self.image_store)
+        self.exporter = ImageExporter(session)
         logger.info("ImageRepository initialized successfully: %s", session)
 
     def _to_domain(self, img: models.ImageModel) -> Image:
@@ -21,44 +53,242 @@ class ImageRepository():
             name=img.name,
             file_path=img.file_path,
             theme_id=img.theme_id,
-            created_at=img.created_at
+            created_at=img.created_at,
+            byte_size=img.byte_size,
+            width=img.width,
+            height=img.height,
+            format=img.format,
+            orientation=img.orientation,
+            taken_at=img.taken_at
         )
 
     # --- CRUD ---
     def add(self, image: NewImageDTO) -> int:
+        content_hash = hashlib.sha256(image.blob_data).hexdigest()
+        return self._add_with_blob(
+            image.name, image.theme_id, content_hash, len(image.blob_data), image.extension,
+            lambda extension: self.image_store.save(
+                content_hash=content_hash,
+                extension=extension,
+                blob_data=image.blob_data
+            )
+        )
+
+    def add_from_source(self, image: NewImageSourceDTO) -> int:
+        """Streams the source into the store (flat memory use); the content is checked while copying."""
+        try:
+            tmp_path, content_hash, byte_size = self.image_store.save_stream(image.source, Image.check_content)
+        except ImageStorageError as e:
+            logger.exception("add_image_from_source(name=%s) [StorageError]: %s", image.name, e)
+            raise RepositoryError("file_error") from e
+        try:
+            return self._add_with_blob(
+                image.name, image.theme_id, content_hash, byte_size, image.extension,
+                lambda extension: self.image_store.commit_temp(tmp_path, content_hash, extension)
+            )
+        finally:
+            # Known content (or a failure) leaves the temp file behind
+            self.image_store.discard_temp(tmp_path)
+
+    def _stage(self, image: NewImageSourceDTO, cancel: threading.Event | None) -> tuple[str, str, int, dict] | None:
+        """Worker side of add_many_from_sources: streams one source into a temp file and reads its metadata."""
+        if cancel is not None and cancel.is_set():
+            return None
+        tmp_path, content_hash, byte_size = self.image_store.save_stream(image.source, Image.check_content)
+        return tmp_path, content_hash, byte_size, read_metadata(tmp_path)
+
+    def add_many_from_sources(self, images: list[NewImageSourceDTO],
+                              workers: int = 8,
+                              progress: Callable[[int, int], None] | None = None,
+                              cancel: threading.Event | None = None) -> list[ImageImportRecordDTO]:
+        """
+        Bulk import. Sources are checked, hashed and copied to temp files by a
+        thread pool; then every blob and row is inserted in one transaction.
+        progress(done, total) is called from the calling thread. If cancel is set
+        before the transaction, nothing is imported.
+        """
+        started = time.perf_counter()
+        total = len(images)
+        staged: dict[int, tuple[str, str, int, dict]] = {}
+        errors: dict[int, str] = {}
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(self._stage, image, cancel): i for i, image in enumerate(images)}
+                for done, future in enumerate(as_completed(futures), start=1):
+                    i = futures[future]
+                    try:
+                        result = future.result()
+                        if result is None:
+                            errors[i] = "cancelled"
+                        else:
+                            staged[i] = result
+                    except InvalidImageContentError:
+                        errors[i] = "invalid_content"
+                    except ImageStorageError as e:
+                        logger.error("add_many_images(%s) [StorageError]: %s", images[i].name, e)
+                        errors[i] = "file_error"
+                    if progress is not None:
+                        progress(done, total)
+
+            if cancel is not None and cancel.is_set():
+                logger.info("add_many_images(n=%d) [Cancelled]", total)
+                return [
+                    ImageImportRecordDTO(index=i, error=errors.get(i, "cancelled"))
+                    for i in range(total)
+                ]
+            records = self._insert_staged(images, staged)
+        finally:
+            for tmp_path, *_ in staged.values():
+                self.image_store.discard_temp(tmp_path)
+
+        records.update({i: ImageImportRecordDTO(index=i, error=error) for i, error in errors.items()})
+        logger.info(
+            "add_many_images(n=%d) [Success] - %d imported, %d failed (%.3fs)",
+            total, len(staged), len(errors), time.perf_counter() - started
+        )
+        return [records[i] for i in range(total)]
+
+    def _insert_staged(self, images: list[NewImageSourceDTO],
+                       staged: dict[int, tuple[str, str, int, dict]]) -> dict[int, ImageImportRecordDTO]:
+        """Single transaction for a bulk import. Files renamed into place are undone if it fails."""
+        written: list[str] = []
+        is_committed = False
+        try:
+            hashes = {content_hash for _, content_hash, *_ in staged.values()}
+            blobs = {}
+            if hashes:
+                stmt = select(models.ImageBlobModel).where(models.ImageBlobModel.content_hash.in_(hashes))
+                blobs = {blob.content_hash: blob for blob in self.session.execute(stmt).scalars()}
+            known = set(blobs)
+            restored: set[str] = set()
+
+            for i in sorted(staged):
+                tmp_path, content_hash, byte_size, _ = staged[i]
+                blob = blobs.get(content_hash)
+                if blob is None:
+                    file_path = self.image_store.commit_temp(tmp_path, content_hash, images[i].extension)
+                    written.append(file_path)
+                    blob = models.ImageBlobModel(
+                        content_hash=content_hash, file_path=file_path, byte_size=byte_size, ref_count=0
+                    )
+                    self.session.add(blob)
+                    blobs[content_hash] = blob
+                elif content_hash in known and content_hash not in restored and not os.path.exists(blob.file_path):
+                    file_path = self.image_store.commit_temp(
+                        tmp_path, content_hash, os.path.splitext(blob.file_path)[1]
+                    )
+                    written.append(file_path)
+                    self._relink_blob(blob, file_path)
+                    restored.add(content_hash)
+            # Blob rows must exist before the insert trigger counts references
+            self.session.flush()
+
+            rows = {}
+            for i in sorted(staged):
+                blob = blobs[staged[i][1]]
+                rows[i] = models.ImageModel(
+                    name=images[i].name,
+                    file_path=blob.file_path,
+                    byte_size=blob.byte_size,
+                    content_hash=blob.content_hash,
+                    theme_id=images[i].theme_id,
+                    **staged[i][3]
+                )
+            self.session.add_all(rows.values())
+            self.session.flush()
+            # Read ids before commit expires the objects
+            records = {}
+            seen = set(known)
+            for i, row in rows.items():
+                content_hash = staged[i][1]
+                records[i] = ImageImportRecordDTO(
+                    index=i, image_id=row.id, content_hash=content_hash, reused=content_hash in seen
+                )
+                seen.add(content_hash)
+            self.session.commit()
+            is_committed = True
+
+            for content_hash in (hashes - known) | restored:
+                self.thumbnails.prefetch(blobs[content_hash].file_path, content_hash)
+            return records
+
+        except ImageStorageError as e:
+            self.session.rollback()
+            logger.exception("add_many_images [StorageError]: %s", e)
+            raise RepositoryError("file_error") from e
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.exception("add_many_images [SQLAlchemyError]: %s", e)
+            raise RepositoryError("db_error") from e
+        finally:
+            if not is_committed:
+                for file_path in written:
+                    self.image_store.undo_save(file_path)
+
+    def _relink_blob(self, blob: models.ImageBlobModel, file_path: str) -> None:
+        """
+        Points a blob whose file was lost, and every image sharing it, at the file
+        just written in its place. Part of the caller's transaction.
+        """
+        blob.file_path = file_path
+        self.session.execute(
+            update(models.ImageModel)
+            .where(models.ImageModel.content_hash == blob.content_hash)
+            .values(file_path=file_path)
+        )
+
+    def _add_with_blob(self, name: str, theme_id: int | None, content_hash: str,
+                       byte_size: int, extension: str, write: Callable[[str], str]) -> int:
+        """Adds the image row. write(extension) stores the content and is only called if the blob needs the file."""
         file_path = None
         is_committed = False
         try:
-            # 1. Save the file (errors will be captured)
-            file_path = self.image_store.save(
-                name=image.name,
-                extension=image.extension,
-                blob_data=image.blob_data
-            )
-            # 2. Add record to the database
+            # 1. Identical bytes share one blob: only a new content (or a lost file) is written
+            blob = self.session.get(models.ImageBlobModel, content_hash)
+            if blob is None:
+                file_path = write(extension)
+                blob = models.ImageBlobModel(
+                    content_hash=content_hash,
+                    file_path=file_path,
+                    byte_size=byte_size,
+                    ref_count=0
+                )
+                self.session.add(blob)
+                # The blob row must exist before the insert trigger counts the reference
+                self.session.flush()
+            elif not os.path.exists(blob.file_path):
+                file_path = write(os.path.splitext(blob.file_path)[1])
+                self._relink_blob(blob, file_path)
+
+            # 2. Add record to the database (metadata comes from the header, no pixel decoding)
             obj = models.ImageModel(
-                name=image.name,
-                file_path=file_path, 
-                theme_id=image.theme_id
+                name=name,
+                file_path=blob.file_path,
+                byte_size=blob.byte_size,
+                content_hash=content_hash,
+                theme_id=theme_id,
+                **read_metadata(blob.file_path)
             )
             self.session.add(obj)
             self.session.commit()
             is_committed = True
-            logger.info("add_image(id=%s) [Success]", obj.id)
+            self.thumbnails.prefetch(blob.file_path, content_hash)
+            logger.info("add_image(id=%s, hash=%s) [Success]", obj.id, content_hash)
             return obj.id
 
         except ImageStorageError as e:
-            logger.exception("add_image(name=%s) [StorageError]: %s", image.name, e)
+            logger.exception("add_image(name=%s) [StorageError]: %s", name, e)
             raise RepositoryError("file_error") from e
 
         except IntegrityError as e:
             self.session.rollback()
-            logger.exception("add_image(name=%s) [IntegrityError]: %s", image.name, e)
+            logger.exception("add_image(name=%s) [IntegrityError]: %s", name, e)
             raise UniqueConstraintViolation("unique_violation") from e
         
         except SQLAlchemyError as e:
             self.session.rollback()
-            logger.exception("add_image(name=%s) [SQLAlchemyError]: %s", image.name, e)
+            logger.exception("add_image(name=%s) [SQLAlchemyError]: %s", name, e)
             raise RepositoryError("db_error") from e
         
         finally:
@@ -77,17 +307,26 @@ class ImageRepository():
         if not image_obj:
             logger.warning("delete_image(id=%s) [Not found]", image_id)
             raise RepositoryError("not_found")
-        moved = False
+        moved_name = None
         is_commited = False
         try:
-            # 1. Delete the file (errors will be captured)
-            self.image_store.move_to_trash(image_obj.file_path)
-            moved = True 
+            # 1. Delete the file only if this is the last reference to it (errors will be captured)
+            content_hash = image_obj.content_hash
+            blob = self.session.get(models.ImageBlobModel, content_hash) if content_hash else None
+            is_last_ref = blob is None or blob.ref_count <= 1
+            if is_last_ref:
+                moved_name = self.image_store.move_to_trash(image_obj.file_path)
             
             # 2. Delete record in the database
             self.session.delete(image_obj)
+            if blob is not None and is_last_ref:
+                self.session.delete(blob)
             self.session.commit()
             is_commited = True
+            if moved_name:
+                self.image_store.release_trash([moved_name])
+            if blob is not None and is_last_ref:
+                self.thumbnails.discard(content_hash)
 
             logger.info("delete_image(id=%s) [Success]", image_id)
 
@@ -106,8 +345,8 @@ class ImageRepository():
             raise RepositoryError("unexpected_error") from e
         
         finally:
-            if not is_commited and moved:
-                self.image_store.restore_from_trash(image_obj.file_path)
+            if not is_commited and moved_name:
+                self.image_store.restore_from_trash(moved_name)
 
 
     def update(self, image: Image) -> None:
@@ -141,14 +380,35 @@ class ImageRepository():
         is_commited = False
         
         try:
-            stmt_select = select(models.ImageModel.file_path).where(models.ImageModel.id.in_(image_ids))
-            file_paths = self.session.execute(stmt_select).scalars().all()
+            stmt_select = (
+                select(models.ImageModel.file_path, models.ImageModel.content_hash)
+                .where(models.ImageModel.id.in_(image_ids))
+            )
+            rows = self.session.execute(stmt_select).all()
+            file_paths = [path for path, content_hash in rows if content_hash is None]
+            dead_blobs = []
+            # A blob dies when every remaining reference is in this batch
+            refs = Counter(content_hash for _, content_hash in rows if content_hash)
+            if refs:
+                stmt_blobs = select(models.ImageBlobModel).where(models.ImageBlobModel.content_hash.in_(refs))
+                for blob in self.session.execute(stmt_blobs).scalars():
+                    if blob.ref_count <= refs[blob.content_hash]:
+                        dead_blobs.append(blob.content_hash)
+                        file_paths.append(blob.file_path)
+
             moved_files = self.image_store.move_to_trash_many(file_paths)
             stmt_delete = delete(models.ImageModel).where(models.ImageModel.id.in_(image_ids))
             self.session.execute(stmt_delete)
+            if dead_blobs:
+                self.session.execute(
+                    delete(models.ImageBlobModel).where(models.ImageBlobModel.content_hash.in_(dead_blobs))
+                )
 
             self.session.commit()
             is_commited = True
+            self.image_store.release_trash(moved_files)
+            for content_hash in dead_blobs:
+                self.thumbnails.discard(content_hash)
             
             logger.info("delete_many_images(ids=%s) [Success] - %d files moved to trash", image_ids, len(moved_files))
 
@@ -166,8 +426,98 @@ class ImageRepository():
             raise RepositoryError("unexpected_error") from e
         finally:
             if not is_commited and moved_files:
-                self.image_store.restore_many_from_trash([f for sublist in moved_files for f in sublist])
+                self.image_store.restore_many_from_trash(moved_files)
         
+    def sweep_blobs(self) -> int:
+        """
+        Trashes the blobs nobody references any more (e.g. after a theme cascade
+        or a repair removed their last image rows). Returns how many were removed.
+        """
+        moved_files = []
+        is_commited = False
+        try:
+            stmt = select(models.ImageBlobModel).where(models.ImageBlobModel.ref_count <= 0)
+            blobs = self.session.execute(stmt).scalars().all()
+            if not blobs:
+                return 0
+            moved_files = self.image_store.move_to_trash_many([blob.file_path for blob in blobs])
+            dead_hashes = [blob.content_hash for blob in blobs]
+            for blob in blobs:
+                self.session.delete(blob)
+            self.session.commit()
+            is_commited = True
+            self.image_store.release_trash(moved_files)
+            for content_hash in dead_hashes:
+                self.thumbnails.discard(content_hash)
+            logger.info("sweep_blobs() [Success] - %d unreferenced blobs trashed", len(blobs))
+            return len(blobs)
+
+        except ImageStorageError as e:
+            logger.exception("sweep_blobs() [StorageError]: %s", e)
+            raise RepositoryError("file_error") from e
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.exception("sweep_blobs() [SQLAlchemyError]: %s", e)
+            raise RepositoryError("db_error") from e
+        finally:
+            if not is_commited and moved_files:
+                self.image_store.restore_many_from_trash(moved_files)
+
+    def deduplicate(self) -> ImageDedupRecordDTO:
+        """Links images saved before content addressing to shared blobs, trashing duplicate files."""
+        try:
+            record = self.deduplicator.run()
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.exception("deduplicate() [SQLAlchemyError]: %s", e)
+            raise RepositoryError("db_error") from e
+        self.sweep_blobs()
+        return record
+
+    def backfill_metadata(self) -> ImageMetadataRecordDTO:
+        """Stores dimensions, format and EXIF data for images imported before they were recorded."""
+        try:
+            return self.metadata_backfill.run()
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.exception("backfill_metadata() [SQLAlchemyError]: %s", e)
+            raise RepositoryError("db_error") from e
+
+    def migrate_layout(self) -> ImageLayoutRecordDTO:
+        """Moves blob files into the sharded upload layout, rewriting their stored paths."""
+        try:
+            return self.layout_migration.run()
+        except OSError as e:
+            logger.exception("migrate_layout() [OSError]: %s", e)
+            raise RepositoryError("file_error") from e
+        except SQLAlchemyError as e:
+            logger.exception("migrate_layout() [SQLAlchemyError]: %s", e)
+            raise RepositoryError("db_error") from e
+
+    def collect_trash(self) -> TrashRecordDTO:
+        """Deletes trashed files past their retention (age or total size budget)."""
+        try:
+            return self.trash_collector.collect()
+        except OSError as e:
+            logger.exception("collect_trash() [OSError]: %s", e)
+            raise RepositoryError("file_error") from e
+
+    def repair_store(self, record: ImageStoreRecordDTO, remove_missing: bool,
+                     trash_orphans: bool, accept_sizes: bool) -> tuple[int, int, int]:
+        """Batch repairs for a reconcile() result. Returns (rows_removed, files_trashed, sizes_updated)."""
+        try:
+            repaired = self.reconciler.repair(record, remove_missing, trash_orphans, accept_sizes)
+        except ImageStorageError as e:
+            logger.exception("repair_store() [StorageError]: %s", e)
+            raise RepositoryError("file_error") from e
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.exception("repair_store() [SQLAlchemyError]: %s", e)
+            raise RepositoryError("db_error") from e
+        # Removing rows of missing files may leave blobs without references
+        self.sweep_blobs()
+        return repaired
+
     # --- QUERIES ---
     def get_by_id(self, image_id: int) -> Image | None:
         try:
@@ -196,4 +546,61 @@ class ImageRepository():
         return self._query_images(theme_id=theme_id)
 
     def get_images_without_theme_id(self):
-        return self._query_images(theme_id=None)
\ No newline at end of file
+        return self._query_images(theme_id=None)
+
+    def get_thumbnail(self, image_id: int, size: int) -> Future | None:
+        """Future of the path of a cached preview of the image, rendered if needed. None if the image does not exist."""
+        try:
+            row = self.session.execute(
+                select(models.ImageModel.file_path, models.ImageModel.content_hash)
+                .where(models.ImageModel.id == image_id)
+            ).first()
+        except SQLAlchemyError as e:
+            logger.exception("get_thumbnail(id=%s) [SQLAlchemyError]: %s", image_id, e)
+            raise RepositoryError("db_error") from e
+        if row is None:
+            return None
+
+        file_path, content_hash = row
+        # Rows not migrated yet are keyed by path; staleness is still checked against the file
+        key = content_hash or hashlib.sha256(os.path.abspath(file_path).encode()).hexdigest()
+        # Render errors are logged by the cache when the future completes
+        future = self.thumbnails.request(file_path, key, size)
+        logger.info("get_thumbnail(id=%s, size=%s) [Success]", image_id, size)
+        return future
+
+    def export(self, image_id: int, dest_path: str) -> str | None:
+        """Copies the image file to dest_path (zero-copy when possible). Returns the copy method, None if not found."""
+        obj = self.session.get(models.ImageModel, image_id)
+        if obj is None:
+            return None
+        try:
+            _, method = export_file(obj.file_path, dest_path)
+            logger.info("export_image(id=%s, method=%s) [Success]", image_id, method)
+            return method
+        except OSError as e:
+            logger.exception("export_image(id=%s) [OSError]: %s", image_id, e)
+            raise RepositoryError("file_error") from e
+
+    def export_theme(self, theme_id: int, dest_dir: str,
+                     progress: Callable[[int, int], None] | None = None) -> ImageExportRecordDTO:
+        """Exports every image of a theme and its descendants, one folder per theme."""
+        try:
+            return self.exporter.export_theme(theme_id, dest_dir, progress)
+        except SQLAlchemyError as e:
+            logger.exception("export_theme(theme_id=%s) [SQLAlchemyError]: %s", theme_id, e)
+            raise RepositoryError("db_error") from e
+        except OSError as e:
+            logger.exception("export_theme(theme_id=%s) [OSError]: %s", theme_id, e)
+            raise RepositoryError("file_error") from e
+
+    def reconcile_store(self) -> ImageStoreRecordDTO:
+        """Finds missing files, orphaned files and size mismatches."""
+        try:
+            return self.reconciler.reconcile()
+        except SQLAlchemyError as e:
+            logger.exception("reconcile_store() [SQLAlchemyError]: %s", e)
+            raise RepositoryError("db_error") from e
+        except OSError as e:
+            logger.exception("reconcile_store() [OSError]: %s", e)
+            raise RepositoryError("file_error") from e
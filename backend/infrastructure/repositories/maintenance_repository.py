@@ -0,0 +1,82 @@
+from log import logger
+import os
+import sqlite3
+import threading
+
+from sqlalchemy.orm import Session
+
+from backend.infrastructure.errors.db import RepositoryError
+
+
+class MaintenanceRepository:
+    """
+    Database housekeeping (statistics, free pages, WAL) run on its own
+    background connection so it never shares the UI session.
+    Every operation is bounded so a single call holds locks only briefly.
+    """
+    def __init__(self, session: Session, analysis_limit: int = 400, busy_timeout: float = 0.5):
+        self.session = session
+        self.analysis_limit = analysis_limit
+        self.busy_timeout = busy_timeout
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        logger.info("MaintenanceRepository initialized successfully: %s", session)
+
+    # ---------- helpers ----------
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            database = self.session.get_bind().url.database
+            if not database or database == ":memory:":
+                raise RepositoryError("maintenance_unsupported")
+            self._conn = sqlite3.connect(
+                os.path.abspath(database),
+                timeout=self.busy_timeout,
+                check_same_thread=False,
+                isolation_level=None
+            )
+        return self._conn
+
+    def _execute(self, op: str, sql: str) -> list[tuple]:
+        with self._lock:
+            try:
+                rows = self._connection().execute(sql).fetchall()
+                logger.info("%s [Success]", op)
+                return rows
+            except sqlite3.Error as e:
+                logger.error("%s [sqlite3.Error]: %s", op, e)
+                raise RepositoryError("db_error") from e
+
+    # ---------- operations ----------
+    def analyze(self) -> None:
+        """Refreshes planner statistics, sampling at most analysis_limit rows per index."""
+        self._execute("analyze()", f"PRAGMA analysis_limit={int(self.analysis_limit)}")
+        self._execute("analyze()", "ANALYZE")
+
+    def optimize(self) -> None:
+        self._execute("optimize()", "PRAGMA optimize")
+
+    def auto_vacuum_mode(self) -> int:
+        """0 = none, 1 = full, 2 = incremental."""
+        return self._execute("auto_vacuum_mode()", "PRAGMA auto_vacuum")[0][0]
+
+    def freelist_count(self) -> int:
+        return self._execute("freelist_count()", "PRAGMA freelist_count")[0][0]
+
+    def incremental_vacuum(self, pages: int) -> int:
+        """Releases up to `pages` free pages. Returns the free pages still left."""
+        self._execute(f"incremental_vacuum(pages={pages})", f"PRAGMA incremental_vacuum({int(pages)})")
+        return self.freelist_count()
+
+    def journal_mode(self) -> str:
+        return self._execute("journal_mode()", "PRAGMA journal_mode")[0][0]
+
+    def wal_checkpoint(self) -> tuple[int, int, int]:
+        """PASSIVE checkpoint: never waits for readers or writers. Returns (busy, log, checkpointed)."""
+        busy, log_frames, checkpointed = self._execute("wal_checkpoint()", "PRAGMA wal_checkpoint(PASSIVE)")[0]
+        return busy, log_frames, checkpointed
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -1,14 +1,16 @@
 from log import logger
-from sqlalchemy import delete
+from sqlalchemy import delete, or_, select
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 from backend.infrastructure.repositories.sql_alchemy import models
 from backend.infrastructure.dto.note_record_lite_dto import NoteRecordLiteDTO
 from backend.infrastructure.errors.db import RepositoryError, UniqueConstraintViolation
 from backend.infrastructure.repositories._time_repository import TimeRepository
+from backend.infrastructure.repositories._note_stats import to_model
 
 from backend.domain.models.note import Note
 from backend.domain.dto.new_note_dto import NewNoteDTO
+from backend.domain.dto.note_stats_dto import NoteStatsDTO
 
 
 class NoteRepository():
@@ -81,16 +83,21 @@ class NoteRepository():
             logger.exception("delete_note(id=%s) [Unexpected error]", note_id)
             raise RepositoryError("unexpected_error") from e
 
-    def update(self, note: Note) -> None:
+    def update(self, note: Note, stats: NoteStatsDTO | None = None) -> None:
+        """`stats` are those of the new content: they are committed with it, so they never go stale."""
         note_obj = self.session.get(models.NoteModel, note._id)
         if not note_obj:
             logger.warning("update_note(id=%s) [Not found]", note._id)
             raise RepositoryError("not_found")
 
         note_obj.name = note._name
+        if (note_obj.content or "") != note._content:
+            note_obj.content_version += 1
         note_obj.content = note._content
         note_obj.theme_id = note._theme_id
         note_obj.last_edited_at = note._last_edited_at
+        if stats is not None:
+            self.session.merge(to_model(note._id, stats))
 
         try:
             self.session.commit()
@@ -158,6 +165,57 @@ class NoteRepository():
     def get_notes_without_theme_id(self) -> list[NoteRecordLiteDTO]:
         return self._query_notes(theme_id=None)
 
+    def search(self, query: str, limit: int = 200) -> list[NoteRecordLiteDTO]:
+        """Notes whose name or content contains the query (case-insensitive)."""
+        try:
+            objs = (
+                self.session.query(models.NoteModel)
+                .filter(or_(
+                    models.NoteModel.name.icontains(query, autoescape=True),
+                    models.NoteModel.content.icontains(query, autoescape=True)
+                ))
+                .order_by(models.NoteModel.name)
+                .limit(limit)
+                .all()
+            )
+            logger.info("search_notes(query=%s) [Success] - %d notes found", query, len(objs))
+            return [self._to_dto(obj) for obj in objs]
+        except SQLAlchemyError as e:
+            logger.exception("search_notes(query=%s) [SQLAlchemyError]: %s", query, e)
+            raise RepositoryError("db_error") from e
+        except Exception as e:
+            logger.exception("search_notes(query=%s) [Unexpected error]", query)
+            raise RepositoryError("unexpected_error") from e
+
+    # --- LEXICAL STATS ---
+    def get_contents_without_stats(self, limit: int = 200) -> list[tuple[int, str | None]]:
+        """(id, content) of notes saved before lexical statistics (or their sketch) were stored."""
+        try:
+            stmt = (
+                select(models.NoteModel.id, models.NoteModel.content)
+                .outerjoin(models.NoteStatsModel, models.NoteStatsModel.note_id == models.NoteModel.id)
+                .where(or_(models.NoteStatsModel.note_id.is_(None), models.NoteStatsModel.sketch.is_(None)))
+                .order_by(models.NoteModel.id)
+                .limit(limit)
+            )
+            rows = [tuple(row) for row in self.session.execute(stmt)]
+            logger.info("get_contents_without_stats(limit=%s) [Success] - %d notes", limit, len(rows))
+            return rows
+        except SQLAlchemyError as e:
+            logger.exception("get_contents_without_stats [SQLAlchemyError]: %s", e)
+            raise RepositoryError("db_error") from e
+
+    def save_stats_many(self, stats_by_note: dict[int, NoteStatsDTO]) -> None:
+        try:
+            for note_id, stats in stats_by_note.items():
+                self.session.merge(to_model(note_id, stats))
+            self.session.commit()
+            logger.info("save_stats_many(n=%s) [Success]", len(stats_by_note))
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.exception("save_stats_many [SQLAlchemyError]: %s", e)
+            raise RepositoryError("db_error") from e
+
     # --- TIME WRAPPERS ---
     def add_time_record(self, note_id: int, minutes: float) -> int:
         return self.time_repo.add(minutes, note_id)
@@ -106,3 +106,30 @@ class SearchEfficiencyRepository:
             logger.exception("get_theme_descendants_ids(root_id=%s) [Unexpected error]", root_theme_id)
             raise RepositoryError("unexpected_error") from e
 
+
+    def get_theme_ancestors_ids(self, theme_id: int) -> list[int]:
+        """Retrieves the given theme and every theme above it, up to its root."""
+        try:
+            hierarchy = (
+                select(models.ThemeModel.id, models.ThemeModel.parent_id)
+                .where(models.ThemeModel.id == theme_id)
+                .cte(recursive=True, name="theme_ancestors")
+            )
+
+            hierarchy = hierarchy.union_all(
+                select(models.ThemeModel.id, models.ThemeModel.parent_id)
+                .where(models.ThemeModel.id == hierarchy.c.parent_id)
+            )
+
+            stmt = select(hierarchy.c.id)
+            ids = self.session.execute(stmt).scalars().all()
+
+            logger.info("get_theme_ancestors_ids(theme_id=%s) [Success]", theme_id)
+            return list(ids)
+
+        except SQLAlchemyError as e:
+            logger.exception("get_theme_ancestors_ids(theme_id=%s) [SQLAlchemyError]: %s", theme_id, e)
+            raise RepositoryError("db_error") from e
+        except Exception as e:
+            logger.exception("get_theme_ancestors_ids(theme_id=%s) [Unexpected error]", theme_id)
+            raise RepositoryError("unexpected_error") from e
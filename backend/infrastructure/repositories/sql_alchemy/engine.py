@@ -0,0 +1,21 @@
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+
+
+def create_sqlite_engine(url: str, echo: bool = False) -> Engine:
+    """
+    Creates the SQLite engine used by the application.
+    WAL lets the maintenance and backup connections read while the UI writes.
+    auto_vacuum only takes effect on a database that has no tables yet; older
+    ones are converted once by schema_migrations.enable_incremental_vacuum.
+    """
+    engine = create_engine(url, echo=echo, connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.close()
+
+    return engine
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy import Integer, String, ForeignKey
+from sqlalchemy import Integer, String, ForeignKey, LargeBinary
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from sqlalchemy.orm import Mapped, mapped_column
@@ -26,6 +26,8 @@ class ThemeModel(Base):
         DateTime(timezone=True),
         default=get_utc_now
     )
+    # Set by a trigger on insert and on every parent change (see schema_migrations.TRIGGERS)
+    membership_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0", index=True)
 
     notes = relationship(
         "NoteModel", 
@@ -56,6 +58,10 @@ class NoteModel(Base):
         DateTime(timezone=True),
         default=get_utc_now
     )
+    # Bumped on every content change: analytics caches compare it instead of the content
+    content_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    # Set by a trigger on insert and on every theme change (see schema_migrations.TRIGGERS)
+    membership_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0", index=True)
 
     theme = relationship("ThemeModel", back_populates="notes")
     times = relationship(
@@ -88,8 +94,46 @@ class ImageModel(Base):
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     
     file_path: Mapped[str] = mapped_column(String(500), nullable=False)
+    byte_size: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    content_hash: Mapped[str | None] = mapped_column(
+        ForeignKey("image_blob.content_hash"), nullable=True, index=True
+    )
+
+    # Read once from the file header at import (see _image_metadata)
+    width: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    height: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    format: Mapped[str | None] = mapped_column(String(16), nullable=True)
+    orientation: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    taken_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     
     theme_id: Mapped[int | None] = mapped_column(ForeignKey("theme.id"), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=get_utc_now)
 
-    theme = relationship("ThemeModel", back_populates="images")
\ No newline at end of file
+    theme = relationship("ThemeModel", back_populates="images")
+
+
+"""One file per distinct content. ref_count is kept by triggers on the image table (see schema_migrations)."""
+class ImageBlobModel(Base):
+    __tablename__ = "image_blob"
+
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    file_path: Mapped[str] = mapped_column(String(500), nullable=False)
+    byte_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    ref_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, index=True)
+
+
+"""
+Lexical statistics of a note's content, written with the content (see update_note_content).
+vocabulary is the zlib-compressed, newline-joined set of distinct meaningful words;
+sketch is a HyperLogLog of the same words, enough to estimate unique counts across notes.
+Rows are removed with their note by a trigger (see schema_migrations).
+"""
+class NoteStatsModel(Base):
+    __tablename__ = "note_stats"
+
+    note_id: Mapped[int] = mapped_column(ForeignKey("note.id"), primary_key=True)
+    n_words_total: Mapped[int] = mapped_column(Integer, nullable=False)
+    n_meaningful: Mapped[int] = mapped_column(Integer, nullable=False)
+    n_unique: Mapped[int] = mapped_column(Integer, nullable=False)
+    vocabulary: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    sketch: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
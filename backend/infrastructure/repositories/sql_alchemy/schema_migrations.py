@@ -0,0 +1,154 @@
+from log import logger
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from backend.infrastructure.repositories.sql_alchemy import models
+
+"""
+image_blob.ref_count and note_stats are maintained by the database itself, so
+every way of removing image or note rows (ORM deletes, bulk deletes, theme
+cascades) keeps the counts exact. A blob whose count reaches 0 stays in the
+table, with its file, until ImageRepository.sweep_blobs trashes it; the theme
+delete use cases run it right after the cascade.
+
+membership_version of notes and themes is likewise set by the database: a row
+that is inserted or moved to another parent gets a value above every existing
+one. The theme version stamp sums it over the subtree, so notes or themes
+swapping subtrees always change the stamp even when counts and id sums match.
+"""
+TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS image_blob_ref_insert
+    AFTER INSERT ON image WHEN NEW.content_hash IS NOT NULL
+    BEGIN
+        UPDATE image_blob SET ref_count = ref_count + 1 WHERE content_hash = NEW.content_hash;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS image_blob_ref_delete
+    AFTER DELETE ON image WHEN OLD.content_hash IS NOT NULL
+    BEGIN
+        UPDATE image_blob SET ref_count = ref_count - 1 WHERE content_hash = OLD.content_hash;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS image_blob_ref_update
+    AFTER UPDATE OF content_hash ON image WHEN OLD.content_hash IS NOT NEW.content_hash
+    BEGIN
+        UPDATE image_blob SET ref_count = ref_count - 1 WHERE content_hash = OLD.content_hash;
+        UPDATE image_blob SET ref_count = ref_count + 1 WHERE content_hash = NEW.content_hash;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS note_membership_insert
+    AFTER INSERT ON note
+    BEGIN
+        UPDATE note SET membership_version = (SELECT COALESCE(MAX(membership_version), 0) + 1 FROM note)
+        WHERE id = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS note_membership_move
+    AFTER UPDATE OF theme_id ON note WHEN OLD.theme_id IS NOT NEW.theme_id
+    BEGIN
+        UPDATE note SET membership_version = (SELECT COALESCE(MAX(membership_version), 0) + 1 FROM note)
+        WHERE id = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS theme_membership_insert
+    AFTER INSERT ON theme
+    BEGIN
+        UPDATE theme SET membership_version = (SELECT COALESCE(MAX(membership_version), 0) + 1 FROM theme)
+        WHERE id = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS theme_membership_move
+    AFTER UPDATE OF parent_id ON theme WHEN OLD.parent_id IS NOT NEW.parent_id
+    BEGIN
+        UPDATE theme SET membership_version = (SELECT COALESCE(MAX(membership_version), 0) + 1 FROM theme)
+        WHERE id = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS note_stats_delete
+    AFTER DELETE ON note
+    BEGIN
+        DELETE FROM note_stats WHERE note_id = OLD.id;
+    END
+    """,
+]
+
+
+def upgrade_schema(engine: Engine) -> list[str]:
+    """
+    create_all() only creates missing tables. This adds the columns introduced
+    after a database was created (nullable, or NOT NULL with a server default
+    that fills the existing rows), their indexes and the triggers.
+    Returns the columns added.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+
+    with engine.begin() as conn:
+        for table in models.Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                col_type = column.type.compile(dialect=engine.dialect)
+                if not column.nullable:
+                    if column.server_default is None:
+                        logger.error("upgrade_schema: cannot add NOT NULL column %s.%s", table.name, column.name)
+                        continue
+                    col_type += f" NOT NULL DEFAULT '{column.server_default.arg}'"
+                conn.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {col_type}'))
+                added.append(f"{table.name}.{column.name}")
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+        for trigger in TRIGGERS:
+            conn.execute(text(trigger))
+
+    if added:
+        logger.info("upgrade_schema [Success] - columns added: %s", added)
+    return added
+
+
+def enable_incremental_vacuum(engine: Engine) -> bool:
+    """
+    The connect pragma only sets auto_vacuum on databases created after it; an
+    older one stays at NONE and the maintenance vacuum step skips it forever.
+    Switches such a database to INCREMENTAL with the one full VACUUM SQLite
+    requires for the change. Returns whether it was run.
+    """
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if conn.execute(text("PRAGMA auto_vacuum")).scalar() == 2:
+            return False
+        conn.execute(text("PRAGMA auto_vacuum=INCREMENTAL"))
+        conn.execute(text("VACUUM"))
+        mode = conn.execute(text("PRAGMA auto_vacuum")).scalar()
+    logger.info("enable_incremental_vacuum() [%s] - auto_vacuum=%s", "Success" if mode == 2 else "Unchanged", mode)
+    return True
+
+
+"""
+Version of the data migrations run by open_vault, kept in PRAGMA user_version.
+Bump it when a new one-off migration must run once on every existing vault.
+"""
+DATA_VERSION = 1
+
+
+def data_version(engine: Engine) -> int:
+    with engine.connect() as conn:
+        return conn.execute(text("PRAGMA user_version")).scalar()
+
+
+def set_data_version(engine: Engine, version: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(f"PRAGMA user_version={int(version)}"))
+    logger.info("set_data_version(version=%s) [Success]", version)
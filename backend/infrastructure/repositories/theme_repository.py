@@ -1,6 +1,6 @@
 from log import logger
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from sqlalchemy import delete
+from sqlalchemy import select
 
 from backend.infrastructure.repositories.sql_alchemy import models
 from backend.infrastructure.errors.db import RepositoryError, UniqueConstraintViolation
@@ -97,8 +97,11 @@ class ThemeRepository():
         if not theme_ids: return
 
         try:
-            stmt = delete(models.ThemeModel).where(models.ThemeModel.id.in_(theme_ids))
-            self.session.execute(stmt)
+            # Through the ORM, not a bulk DELETE: the cascade removes the notes,
+            # images and subthemes, which a bulk statement would leave orphaned
+            stmt = select(models.ThemeModel).where(models.ThemeModel.id.in_(theme_ids))
+            for theme_obj in self.session.execute(stmt).scalars().all():
+                self.session.delete(theme_obj)
             self.session.commit()
             logger.info("delete_many_themes(ids=%s) [Success]", theme_ids)
         except SQLAlchemyError as e:
@@ -1,5 +1,5 @@
 from frontend.core.bus import Bus
-from frontend.features.anaylitics_feature import AnalyticsWindow
+from frontend.features.anaylitics_feature import AnalyticsWindow, ActivityWindow
 from frontend.core.api_provider import ApiProvider
 
 class AnalyticsManager:
@@ -7,8 +7,14 @@ class AnalyticsManager:
     def __init__(self):
         self.api = ApiProvider.get()
         Bus.subscribe("OPEN_DETAILS_ITEM", self._show_analytics)
+        Bus.subscribe("OPEN_VAULT_ACTIVITY", self._show_vault_activity)
 
-    def _show_analytics(self, dto_analytics):
-        new_view = AnalyticsWindow(dto_analytics)
+    def _show_analytics(self, dto_analytics, heatmap=None):
+        new_view = AnalyticsWindow(dto_analytics, heatmap)
         new_view.lift()         
         new_view.focus_force()   
+
+    def _show_vault_activity(self, heatmap):
+        new_view = ActivityWindow("Todo el vault", heatmap)
+        new_view.lift()
+        new_view.focus_force()
@@ -16,4 +16,18 @@ class ApiProvider:
         """Retrieve the stored backend instance or raise an error if not set."""
         if cls._instance is None:
             raise Exception("ApiProvider: The API must be initialized before use (ApiProvider.set).")
-        return cls._instance
\ No newline at end of file
+        return cls._instance
+
+    _vaults = None
+
+    @classmethod
+    def set_vaults(cls, vault_manager):
+        """Store the vault manager used for queries across every open vault."""
+        cls._vaults = vault_manager
+
+    @classmethod
+    def get_vaults(cls):
+        """Retrieve the vault manager or raise an error if not set."""
+        if cls._vaults is None:
+            raise Exception("ApiProvider: The vaults must be initialized before use (ApiProvider.set_vaults).")
+        return cls._vaults
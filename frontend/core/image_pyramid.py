@@ -0,0 +1,161 @@
+import threading
+
+from PIL import Image, ImageOps, ExifTags
+
+# EXIF orientations 5-8 are rotated by 90 degrees: width and height swap once transposed
+ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+# Modes Image.reduce() accepts; palette, 1-bit and 16-bit images are converted first
+REDUCIBLE_MODES = {"L", "LA", "RGB", "RGBA", "RGBX", "CMYK", "YCbCr", "I", "F"}
+
+
+def image_bytes(img: Image.Image) -> int:
+    return img.width * img.height * len(img.getbands())
+
+
+def _reducible(img: Image.Image) -> Image.Image:
+    if img.mode in REDUCIBLE_MODES:
+        return img
+    has_alpha = "A" in img.getbands() or "transparency" in img.info
+    return img.convert("RGBA" if has_alpha else "RGB")
+
+
+def _halve(img: Image.Image) -> Image.Image:
+    try:
+        # reduce() is a box filter over exact 2x2 blocks: far cheaper than resize()
+        return img.reduce(2)
+    except ValueError:
+        return img.resize((max(1, img.width // 2), max(1, img.height // 2)), Image.Resampling.BOX)
+
+
+class ImagePyramid:
+    """
+    Power-of-two reductions of one image: level 0 is the original (EXIF
+    orientation applied), level k is 1/2**k of it. The file is decoded and
+    the levels are built in a background thread; until a level exists,
+    renders fall back to the nearest finer one.
+
+    JPEGs first get a cheap preview decoded in draft mode (the decoder scales
+    by 1/2..1/8 on its own), so something can be shown long before the full
+    decode ends. Other formats can be given the stored thumbnail instead
+    (offer_preview).
+    """
+    MIN_SIDE = 256
+    PREVIEW_SIDE = 512
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.size: tuple[int, int] | None = None
+        self.preview: Image.Image | None = None
+        self.error: Exception | None = None
+        self._levels: list[Image.Image] = []
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._build, name="image-pyramid", daemon=True)
+        self._thread.start()
+
+    @property
+    def ready(self) -> bool:
+        """True once level 0 is decoded (or decoding failed, see error)."""
+        return bool(self._levels) or self.error is not None
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the preview and every level built so far."""
+        with self._lock:
+            images = list(self._levels)
+        if self.preview is not None:
+            images.append(self.preview)
+        return sum(image_bytes(img) for img in images)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        """Stops the build at the next step; a decode already running is not interrupted."""
+        self._cancelled.set()
+
+    def offer_preview(self, thumbnail_path: str) -> bool:
+        """
+        Uses an already rendered thumbnail (EXIF orientation applied) as the
+        preview while nothing better exists. Returns whether it was taken.
+        """
+        if self.ready or self.preview is not None:
+            return False
+        try:
+            with Image.open(thumbnail_path) as img:
+                img.load()
+                preview = img
+        except (OSError, ValueError, Image.DecompressionBombError):
+            return False
+        with self._lock:
+            if self._levels or self.preview is not None:
+                return False
+            self.preview = preview
+        return True
+
+    def _build_preview(self) -> None:
+        with Image.open(self.file_path) as img:
+            orientation = img.getexif().get(ExifTags.Base.Orientation)
+            w, h = img.size
+            self.size = (h, w) if orientation in ROTATED_ORIENTATIONS else (w, h)
+            # draft() returns None for formats without reduced decoding: no preview for them
+            if img.draft("RGB", (self.PREVIEW_SIDE, self.PREVIEW_SIDE)) is None:
+                return
+            preview = ImageOps.exif_transpose(img)
+            preview.load()
+        self.preview = preview
+
+    def _build(self) -> None:
+        try:
+            self._build_preview()
+            if self.cancelled:
+                return
+            with Image.open(self.file_path) as img:
+                current = _reducible(ImageOps.exif_transpose(img))
+                current.load()
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            self.error = e
+            return
+        with self._lock:
+            self.size = current.size
+            self._levels.append(current)
+        self.preview = None
+
+        try:
+            while max(current.size) > self.MIN_SIDE and not self.cancelled:
+                current = _halve(current)
+                with self._lock:
+                    self._levels.append(current)
+        except (OSError, ValueError, MemoryError) as e:
+            # The levels built so far stay usable
+            self.error = e
+
+    def level_for(self, scale: float) -> Image.Image | None:
+        """Smallest built level that is still at least `scale` times the original size."""
+        with self._lock:
+            levels = list(self._levels)
+        if not levels:
+            return None
+        k = 0
+        while k + 1 < len(levels) and scale <= 1 / 2 ** (k + 1):
+            k += 1
+        return levels[k]
+
+    def render(self, size: tuple[int, int]) -> Image.Image | None:
+        """
+        Image of the requested size, resampled from the nearest level, or from
+        the preview while level 0 is still decoding. None if neither exists yet.
+        """
+        if self.size is None:
+            return None
+        scale = max(size[0] / self.size[0], size[1] / self.size[1])
+        level = self.level_for(scale)
+        if level is None:
+            level = self.preview
+            if level is None:
+                return None
+        if level.size == size:
+            return level
+        return level.resize(size, Image.Resampling.LANCZOS)
+
@@ -0,0 +1,133 @@
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+from frontend.core.image_pyramid import ImagePyramid, image_bytes
+
+
+class RenderCache:
+    """
+    One LRU cache shared by every image tab, bounded by a memory budget.
+    Holds the decoded pyramid of each image and the bitmaps already rendered
+    from it, keyed by (file, output size): the output size is what zoom and
+    viewport size reduce to. Entries are evicted oldest first until the total
+    fits the budget; the entry just used is never evicted.
+    """
+    DEFAULT_BUDGET = 512 * 1024 * 1024
+
+    _budget = DEFAULT_BUDGET
+    _entries: OrderedDict[tuple, ImagePyramid | Image.Image] = OrderedDict()
+    _lock = threading.RLock()
+    _hits = 0
+    _misses = 0
+    _evictions = 0
+
+    @classmethod
+    def configure(cls, budget_bytes: int):
+        """Set the memory budget (bytes) and evict down to it."""
+        with cls._lock:
+            cls._budget = budget_bytes
+            cls._enforce_budget()
+
+    @classmethod
+    def pyramid(cls, file_path: str, retry_failed: bool = False) -> ImagePyramid:
+        """
+        Pyramid of the file, starting a background decode if it is not cached.
+        A failed decode is kept (so polling sees the error) unless retry_failed.
+        """
+        key = ("pyramid", file_path)
+        with cls._lock:
+            pyramid = cls._entries.get(key)
+            if (pyramid is None or pyramid.cancelled
+                    or (retry_failed and pyramid.error is not None)):
+                pyramid = ImagePyramid(file_path)
+                cls._entries[key] = pyramid
+            cls._entries.move_to_end(key)
+            cls._enforce_budget()
+            return pyramid
+
+    @classmethod
+    def render(cls, file_path: str, size: tuple[int, int]) -> tuple[Image.Image | None, bool]:
+        """
+        Returns (bitmap of the file at `size`, final). Only final renders are
+        cached; while the image is decoding the bitmap is an uncached preview,
+        or None.
+        """
+        key = ("render", file_path, size)
+        with cls._lock:
+            img = cls._entries.get(key)
+            if img is not None:
+                cls._hits += 1
+                cls._entries.move_to_end(key)
+                return img, True
+            cls._misses += 1
+            pyramid = cls.pyramid(file_path)
+        # Resampling runs outside the lock: other tabs keep reading the cache meanwhile
+        img = pyramid.render(size)
+        final = img is not None and pyramid.ready
+        if final:
+            with cls._lock:
+                cls._entries[key] = img
+                cls._entries.move_to_end(key)
+                cls._enforce_budget()
+        return img, final
+
+    @classmethod
+    def suspend(cls, file_path: str):
+        """
+        For closed tabs: cancels and drops a pyramid still decoding, whose work
+        nobody waits for. A finished pyramid and the rendered bitmaps stay
+        cached until the memory budget evicts them, so reopening the image, or
+        showing it at another size, needs no decoding.
+        """
+        with cls._lock:
+            key = ("pyramid", file_path)
+            pyramid = cls._entries.get(key)
+            if pyramid is None or pyramid.ready:
+                return
+            del cls._entries[key]
+        pyramid.cancel()
+
+    @classmethod
+    def stats(cls) -> dict:
+        with cls._lock:
+            return {
+                "hits": cls._hits,
+                "misses": cls._misses,
+                "evictions": cls._evictions,
+                "entries": len(cls._entries),
+                "bytes": cls._total_bytes(),
+                "budget": cls._budget,
+            }
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            for key in list(cls._entries):
+                cls._evict(key)
+
+    # ---------- internals ----------
+    @staticmethod
+    def _size_of(entry: ImagePyramid | Image.Image) -> int:
+        # A pyramid keeps growing while its thread builds levels: measured on every check
+        return entry.nbytes if isinstance(entry, ImagePyramid) else image_bytes(entry)
+
+    @classmethod
+    def _total_bytes(cls) -> int:
+        return sum(cls._size_of(entry) for entry in cls._entries.values())
+
+    @classmethod
+    def _evict(cls, key: tuple):
+        entry = cls._entries.pop(key)
+        if isinstance(entry, ImagePyramid):
+            entry.cancel()
+        cls._evictions += 1
+
+    @classmethod
+    def _enforce_budget(cls):
+        total = cls._total_bytes()
+        while total > cls._budget and len(cls._entries) > 1:
+            key = next(iter(cls._entries))
+            total -= cls._size_of(cls._entries[key])
+            cls._evict(key)
@@ -1,22 +1,106 @@
 import tkinter as tk
 from tkinter import ttk
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 
 class AnalyticsWindow(tk.Toplevel): 
-    def __init__(self, dto):
+    def __init__(self, dto, heatmap=None):
         super().__init__()
         self.title(f"Analíticas: {dto.name}")
-        self.geometry("400x450")
+        self.geometry("760x620" if heatmap else "400x450")
         
-        self.frame = AnalyticsFrame(self, dto) 
+        self.frame = AnalyticsFrame(self, dto, heatmap) 
         self.frame._build_ui()
         self.frame.pack(fill="both", expand=True)
 
 
+class ActivityWindow(tk.Toplevel):
+    """Heatmap of a scope without other analytics (the whole vault)."""
+    def __init__(self, title, heatmap):
+        super().__init__()
+        self.title(f"Actividad: {title}")
+        self.geometry("760x230")
+
+        frame = tk.Frame(self, padx=14, pady=14)
+        frame.pack(fill="both", expand=True)
+        tk.Label(frame, text=title, font=("Segoe UI", 15, "bold")).pack(anchor="w")
+        HeatmapView(frame, heatmap).pack(anchor="w", pady=8)
+
+
+class HeatmapView(tk.Frame):
+    """
+    GitHub-style calendar: one column per week (Monday first), one cell per day
+    coloured by the DTO level. Hovering a cell shows its date and minutes.
+    """
+    CELL = 11
+    GAP = 2
+    LEFT = 28
+    TOP = 16
+    COLORS = ("#ebedf0", "#9be9a8", "#40c463", "#30a14e", "#216e39")
+    WEEKDAY_LABELS = {0: "Lun", 2: "Mié", 4: "Vie"}
+    MONTHS = ("Ene", "Feb", "Mar", "Abr", "May", "Jun", "Jul", "Ago", "Sep", "Oct", "Nov", "Dic")
+
+    def __init__(self, master, heatmap, **kwargs):
+        super().__init__(master, **kwargs)
+        self.heatmap = heatmap
+        self._cells: dict[int, int] = {}  # canvas item -> day index
+
+        step = self.CELL + self.GAP
+        first_monday = heatmap.start - timedelta(days=heatmap.start.weekday())
+        n_weeks = (heatmap.end - first_monday).days // 7 + 1
+        self.canvas = tk.Canvas(
+            self, width=self.LEFT + n_weeks * step, height=self.TOP + 7 * step,
+            highlightthickness=0, bg=self.cget("bg")
+        )
+        self.canvas.pack(anchor="w")
+        self.info = tk.Label(self, text=self._summary_text(), font=("Segoe UI", 9), fg="#555")
+        self.info.pack(anchor="w", pady=(4, 0))
+
+        self._draw(first_monday, step)
+        self.canvas.bind("<Motion>", self._on_motion)
+        self.canvas.bind("<Leave>", lambda e: self.info.configure(text=self._summary_text()))
+
+    def _draw(self, first_monday: date, step: int):
+        for weekday, label in self.WEEKDAY_LABELS.items():
+            self.canvas.create_text(
+                self.LEFT - 4, self.TOP + weekday * step + self.CELL / 2,
+                text=label, anchor="e", font=("Segoe UI", 7), fill="#777"
+            )
+
+        last_month = None
+        for i, level in enumerate(self.heatmap.levels):
+            day = self.heatmap.start + timedelta(days=i)
+            column = (day - first_monday).days // 7
+            x = self.LEFT + column * step
+            y = self.TOP + day.weekday() * step
+            if day.month != last_month and day.day <= 7:
+                self.canvas.create_text(x, 2, text=self.MONTHS[day.month - 1], anchor="nw",
+                                        font=("Segoe UI", 7), fill="#777")
+                last_month = day.month
+            item = self.canvas.create_rectangle(
+                x, y, x + self.CELL, y + self.CELL, fill=self.COLORS[level], outline=""
+            )
+            self._cells[item] = i
+
+    def _summary_text(self):
+        h = self.heatmap
+        return f"{h.minutes_total:.0f} minutos en {h.n_days_active} días activos"
+
+    def _on_motion(self, event):
+        items = self.canvas.find_overlapping(event.x, event.y, event.x, event.y)
+        index = next((self._cells[item] for item in items if item in self._cells), None)
+        if index is None:
+            self.info.configure(text=self._summary_text())
+            return
+        day = self.heatmap.start + timedelta(days=index)
+        minutes = self.heatmap.daily_minutes[index]
+        self.info.configure(text=f"{day.strftime('%d/%m/%Y')}: {minutes:.1f} minutos")
+
+
 class AnalyticsFrame(tk.Frame):
-    def __init__(self, master, dto, **kwargs):
+    def __init__(self, master, dto, heatmap=None, **kwargs):
         super().__init__(master, **kwargs)
         self.dto = dto
+        self.heatmap = heatmap
         self._build_ui
 
     def _build_ui(self):
@@ -25,6 +109,9 @@ class AnalyticsFrame(tk.Frame):
         self._header()
         ttk.Separator(self).pack(fill="x", pady=8)
         self._metrics()
+        if self.heatmap:
+            ttk.Separator(self).pack(fill="x", pady=8)
+            HeatmapView(self, self.heatmap).pack(anchor="w")
 
     def _header(self):
         tk.Label(
@@ -80,6 +80,9 @@ class ChronometerFeature(ttk.Frame):
         self.label.config(text="00:00:00")
         self.btn_toggle.config(text="▷")
 
+    def has_unsaved_time(self) -> bool:
+        return self.timer.get_elapsed() > 0
+
     def guardar(self):
         minutes = self.timer.get_time_record_minutes()
         
@@ -91,6 +94,6 @@ class ChronometerFeature(ttk.Frame):
                 messagebox.showinfo("Éxito", res.info)
             else:
                 messagebox.showerror("Error cronómetro", res.info)
-        else:
-            pass
+            return res.successful
+        return True
     
\ No newline at end of file
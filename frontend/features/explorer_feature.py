@@ -1,9 +1,12 @@
 import os
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 from tkinter import filedialog
 from frontend.core.api_provider import ApiProvider
 from frontend.core.bus import Bus
+from frontend.features.progress_feature import ProgressDialog
 from tkinter import filedialog
 
 class ExplorerFeature(ttk.Frame):
@@ -15,6 +18,7 @@ class ExplorerFeature(ttk.Frame):
     ICON_THEME = "📁"
     ICON_NOTE = "📄"
     ICON_IMAGE = "📸"
+    ICON_EXPORT = "➜]"
     DUMMY_TEXT = "Sin contenido..."
 
     def __init__(self, master, **kwargs):
@@ -49,6 +53,8 @@ class ExplorerFeature(ttk.Frame):
         self.menu_theme.add_command(label=f"{self.ICON_NOTE} Nueva Nota", command=self._ui_new_note)
         self.menu_theme.add_command(label=f"{self.ICON_THEME} Nuevo Tema", command=self._ui_new_theme)
         self.menu_theme.add_command(label=f"{self.ICON_IMAGE} Nueva Imagen", command=self._ui_new_image)
+        self.menu_theme.add_command(label=f"{self.ICON_IMAGE} Importar carpeta", command=self._ui_import_folder)
+        self.menu_theme.add_command(label=f"{self.ICON_EXPORT} Exportar imágenes", command=self._ui_export_theme_images)
         self.menu_theme.add_separator()
         self.menu_theme.add_command(label="✏️ Renombrar", command=self._ui_start_rename)
         self.menu_theme.add_command(label="🗑️ Eliminar", command=self._ui_delete_item)
@@ -65,13 +71,15 @@ class ExplorerFeature(ttk.Frame):
         self.menu_nothing.add_command(label=f"{self.ICON_NOTE} Nueva Nota", command=self._ui_new_note)
         self.menu_nothing.add_command(label=f"{self.ICON_THEME} Nuevo Tema", command=self._ui_new_theme)
         self.menu_nothing.add_command(label=f"{self.ICON_IMAGE} Nueva Imagen", command=self._ui_new_image)
+        self.menu_nothing.add_command(label=f"{self.ICON_IMAGE} Importar carpeta", command=self._ui_import_folder)
+        self.menu_nothing.add_command(label="📈 Actividad del vault", command=self._get_vault_activity)
 
         # Menu for when 'image' is selected
         self.menu_image = tk.Menu(self, tearoff=0)
         self.menu_image.add_command(label="🗑️ Eliminar", command=self._ui_delete_item)
         self.menu_image.add_command(label="✏️ Renombrar", command=self._ui_start_rename)
         self.menu_image.add_separator()
-        self.menu_image.add_command(label="➜] Exportar", command=self._ui_export_image)
+        self.menu_image.add_command(label=f"{self.ICON_EXPORT} Exportar", command=self._ui_export_image)
 
     def _setup_events(self):
         self.tree.bind("<<TreeviewOpen>>", self._on_treeview_expand)
@@ -83,6 +91,12 @@ class ExplorerFeature(ttk.Frame):
         self.tree.bind("<ButtonPress-1>", self._on_drag_start, add="+")
         self.tree.bind("<ButtonRelease-1>", self._on_drag_finish, add="+")
 
+        Bus.subscribe("VAULT_CHANGED", self._on_vault_changed)
+
+    def _on_vault_changed(self, **kwargs):
+        self.api = ApiProvider.get()
+        self.load_root()
+
     # --- EVENTS MOUSE ---
     def _on_left_click(self, event):
         iid = self.tree.identify_row(event.y)
@@ -273,10 +287,8 @@ class ExplorerFeature(ttk.Frame):
 
         unique_name = self._call_api(self.api.get_unique_image_name, name_image, parent_id)
         if unique_name:
-            with open(file_path, "rb") as f:
-                blob_data = f.read()
             extension = os.path.splitext(file_path)[1][1:]
-            image_id = self._call_api(self.api.create_image, unique_name, blob_data, extension, parent_id)
+            image_id = self._call_api(self.api.create_image_from_source, unique_name, file_path, extension, parent_id)
             if image_id:
                 if selected not in self.loaded_nodes and parent_id: 
                     return
@@ -294,6 +306,52 @@ class ExplorerFeature(ttk.Frame):
                 if not file_path.obj: return
                 self._ui_start_rename()
         
+    def _ui_import_folder(self):
+        selected = self.tree.focus()
+        self.tree.event_generate("<<TreeviewOpen>>")
+        self.tree.item(selected, open=True)
+        _, parent_id = self._parse_iid(selected)
+
+        directory = filedialog.askdirectory(title="Seleccionar carpeta de imágenes")
+        if not directory:
+            return
+        recursive = messagebox.askyesno("Importar carpeta", "¿Incluir también las subcarpetas?")
+
+        cancel = threading.Event()
+        def on_cancel(**kwargs):
+            cancel.set()
+        def on_done(res):
+            Bus.unsubscribe("IMAGE_IMPORT_CANCEL", on_cancel)
+            self._on_folder_imported(selected, parent_id, res)
+
+        Bus.subscribe("IMAGE_IMPORT_CANCEL", on_cancel)
+        ProgressDialog(self, "Importando imágenes", "IMAGE_IMPORT")
+        self._run_with_progress(
+            "IMAGE_IMPORT",
+            lambda api, progress: api.import_image_folder(directory, parent_id, recursive, progress=progress, cancel=cancel),
+            on_done
+        )
+
+    def _on_folder_imported(self, selected: str, parent_id: int | None, res):
+        if res is None or not res.successful:
+            messagebox.showwarning("Importar carpeta", res.info if res and res.info else "Error desconocido")
+            return
+
+        report = res.obj
+        parent_iid = selected if parent_id else ""
+        if not parent_id or selected in self.loaded_nodes:
+            imported = [item for item in report.items if item.image_id is not None]
+            if parent_id and imported:
+                self._manage_dummy(selected, "remove")
+            for item in imported:
+                self.insert_image(parent_iid, item.image_id, item.name)
+
+        failed = [item for item in report.items if item.status == "failed"]
+        detail = "\n".join(f"• {os.path.basename(item.source)}: {item.detail}" for item in failed[:10])
+        if len(failed) > 10:
+            detail += f"\n... y {len(failed) - 10} más"
+        messagebox.showinfo("Importar carpeta", res.info + (f"\n\n{detail}" if detail else ""))
+
     def _ui_start_rename(self):
         iid = self.tree.focus()
         if not iid or iid.startswith(self.TYPE_DUMMY): 
@@ -377,15 +435,22 @@ class ExplorerFeature(ttk.Frame):
         if not tipo or not item_id: return
         
         api_calls = {
-                self.TYPE_NOTE: self.api.get_note_analytics,
-                self.TYPE_THEME: self.api.get_theme_analytics
+                self.TYPE_NOTE: (self.api.get_note_analytics, self.api.get_note_heatmap),
+                self.TYPE_THEME: (self.api.get_theme_analytics, self.api.get_theme_heatmap)
             }
 
-        call = api_calls.get(tipo)
-        if call:
+        calls = api_calls.get(tipo)
+        if calls:
+            call, heatmap_call = calls
             dto_analytics = self._call_api(call, int(item_id))
             if dto_analytics:
-                Bus.emit("OPEN_DETAILS_ITEM", dto_analytics = dto_analytics)
+                heatmap = self._call_api(heatmap_call, int(item_id))
+                Bus.emit("OPEN_DETAILS_ITEM", dto_analytics = dto_analytics, heatmap = heatmap)
+
+    def _get_vault_activity(self):
+        heatmap = self._call_api(self.api.get_vault_heatmap)
+        if heatmap:
+            Bus.emit("OPEN_VAULT_ACTIVITY", heatmap = heatmap)
 
     def _ui_delete_item(self):
         raw_selected = self.tree.selection()
@@ -656,12 +721,71 @@ class ExplorerFeature(ttk.Frame):
         if not file_path:
             return
 
-        try:
-            with open(image_dto.file_path, "rb") as f:
-                blob_data = f.read()
-            with open(file_path, "wb") as f:
-                f.write(blob_data)
+        res = self.api.export_image(image_id, file_path)
+        if not res.successful:
+            messagebox.showerror("Error de escritura", res.info or "No se pudo guardar el archivo")
+            return
+        messagebox.showinfo("Éxito", f"Imagen exportada correctamente en:\n{file_path}")
+
+    def _ui_export_theme_images(self):
+        selected = self.tree.focus()
+        item_type, theme_id = self._parse_iid(selected)
+        if item_type != self.TYPE_THEME or theme_id is None:
+            return
+
+        dest_dir = filedialog.askdirectory(title="Exportar imágenes del tema a...")
+        if not dest_dir:
+            return
+        ProgressDialog(self, "Exportando imágenes", "IMAGE_EXPORT", cancellable=False)
+        self._run_with_progress(
+            "IMAGE_EXPORT",
+            lambda api, progress: api.export_theme_images(theme_id, dest_dir, progress),
+            self._on_theme_images_exported
+        )
+
+    def _on_theme_images_exported(self, res):
+        if res is None or not res.successful:
+            messagebox.showerror("Error", res.info if res and res.info else "Error desconocido")
+            return
+        messagebox.showinfo("Éxito", res.info)
+
+    def _run_with_progress(self, topic: str, task, on_done):
+        """
+        Runs task(api, progress) on a worker thread while the ProgressDialog of `topic` is open.
+        The worker gets a facade over its own session (the UI's one is not thread-safe) and
+        never touches widgets: progress and the result go through a queue that the Tk thread
+        drains with after(). on_done(result) runs on the Tk thread; result is None if task raised.
+        """
+        events: queue.Queue = queue.Queue()
+        vaults = ApiProvider.get_vaults()
+        vault_name = vaults.active_name
+
+        def on_progress(done, total):
+            events.put(("progress", (done, total)))
+
+        def run():
+            res = None
+            try:
+                with vaults.background_api(vault_name) as api:
+                    res = task(api, on_progress)
+            finally:
+                events.put(("finished", res))
+
+        def poll():
+            progress, finished, res = None, False, None
+            while not events.empty():
+                kind, value = events.get_nowait()
+                if kind == "progress":
+                    progress = value
+                else:
+                    finished, res = True, value
+            if progress:
+                Bus.emit(f"{topic}_PROGRESS", done=progress[0], total=progress[1])
+            if not finished:
+                self.after(50, poll)
+                return
+            Bus.emit(f"{topic}_FINISHED")
+            on_done(res)
 
-            messagebox.showinfo("Éxito", f"Imagen exportada correctamente en:\n{file_path}")
-        except Exception as e:
-            messagebox.showerror("Error de escritura", f"No se pudo guardar el archivo: {str(e)}")
\ No newline at end of file
+        threading.Thread(target=run, name=topic.lower(), daemon=True).start()
+        self.after(50, poll)
\ No newline at end of file
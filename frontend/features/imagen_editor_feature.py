@@ -1,13 +1,16 @@
 import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
-from PIL import Image, ImageTk
+from PIL import ImageTk
 
 from frontend.core.api_provider import ApiProvider
 from frontend.core.bus import Bus
+from frontend.core.render_cache import RenderCache
 from datetime import datetime, timezone
 
 class ImageEditorFeature(ttk.Frame):
+    THUMBNAIL_SIZE = 512
+
     def __init__(self, 
                  parent, 
                  image_id,
@@ -18,13 +21,19 @@ class ImageEditorFeature(ttk.Frame):
         self.api = ApiProvider.get()
         self.image_id = image_id
         self.image_data = image_data
-        self.pil_original = None
+        self.file_path = None
+        self.display_size = None
         self._resize_job = None
+        self._preview_shown = False
+        self._thumbnail_path = None
         self.zoom_factor = 1.0
 
         self._setup_ui()
         self.load_image()
         self.canvas.bind("<Configure>", self._on_canvas_resize)
+        # Notebook pages are unmapped when another tab is selected
+        self.bind("<Unmap>", self._on_hidden)
+        self.bind("<Map>", self._on_canvas_resize)
 
     def _setup_ui(self):
         content = ttk.Frame(self)
@@ -84,14 +93,35 @@ class ImageEditorFeature(ttk.Frame):
         return local_dt.strftime("%d %b %Y, %H:%M")
     
     def load_image(self):
-        ttk.Label(self.top, text=self._fmt(self.image_data.created_at)).pack(side="left", padx=(2, 10))
-        format = self.api.get_image_extension(self.image_id)
-        if not format.successful:
-            messagebox.showerror("Error", format.info or "No se pudo obtener el formato de la imagen.")
-            return
-        ttk.Label(self.top, text=f"Formato: {format.obj}").pack(side="left", padx=(2, 10))
-        file_path = self.image_data.file_path
-        self.pil_original = Image.open(file_path)
+        """Todo lo que se muestra sale de los metadatos guardados; el archivo se decodifica en segundo plano."""
+        data = self.image_data
+        ttk.Label(self.top, text=self._fmt(data.created_at)).pack(side="left", padx=(2, 10))
+        format = data.format
+        if not format:
+            res = self.api.get_image_extension(self.image_id)
+            if not res.successful:
+                messagebox.showerror("Error", res.info or "No se pudo obtener el formato de la imagen.")
+                return
+            format = res.obj
+        ttk.Label(self.top, text=f"Formato: {format.upper()}").pack(side="left", padx=(2, 10))
+        if data.width and data.height:
+            # Orientaciones EXIF 5-8 giran 90°: se muestran con ancho y alto intercambiados
+            rotated = data.orientation in (5, 6, 7, 8)
+            self.display_size = (data.height, data.width) if rotated else (data.width, data.height)
+            ttk.Label(self.top, text=f"{self.display_size[0]}×{self.display_size[1]}").pack(side="left", padx=(2, 10))
+        if data.taken_at:
+            ttk.Label(self.top, text=f"Tomada: {data.taken_at.strftime('%d %b %Y, %H:%M')}").pack(side="left", padx=(2, 10))
+
+        self.file_path = data.file_path
+        # Reabrir la pestaña reintenta una decodificación que falló
+        pyramid = RenderCache.pyramid(self.file_path, retry_failed=True)
+        if not pyramid.ready:
+            # La miniatura guardada sirve de vista previa mientras tanto (sin esperar: llega desde otro hilo)
+            self.api.request_image_thumbnail(self.image_id, self.THUMBNAIL_SIZE, self._on_thumbnail)
+
+    def _on_thumbnail(self, path):
+        """Puede llamarse desde otro hilo: solo se guarda la ruta; _wait_decoded la recoge."""
+        self._thumbnail_path = path
 
     def _on_slider_release(self, event):
         """Este método SOLO se ejecuta cuando el usuario suelta el click"""
@@ -100,34 +130,66 @@ class ImageEditorFeature(ttk.Frame):
             
         self.view_mode = "zoom"
         self.zoom_factor = float(valor)
+        self._preview_shown = False
+        if self._resize_job:
+            self.after_cancel(self._resize_job)
         self._render_view()
 
     def _render_view(self):
         self._resize_job = None
-        if not self.pil_original: return
+        if not self.file_path: return
         self.canvas.update_idletasks()
                 
         canvas_w = self.canvas.winfo_width()
         canvas_h = self.canvas.winfo_height()
         if canvas_w < 10: canvas_w, canvas_h = 800, 600 
 
-        img_w, img_h = self.pil_original.size
-            
-        ratio_fit = min(canvas_w/img_w, canvas_h/img_h)
-            
-        value_slider = self.zoom_slider.get()
-            
-        zoom_final = ratio_fit * value_slider
-            
-        new_size = (int(img_w * zoom_final), int(img_h * zoom_final))
-            
+        # Con los metadatos guardados no hace falta la imagen decodificada para calcular el tamaño
+        img_w, img_h = self.display_size or RenderCache.pyramid(self.file_path).size or (0, 0)
+        if img_w and img_h:
+            ratio_fit = min(canvas_w/img_w, canvas_h/img_h)
+            zoom_final = ratio_fit * self.zoom_slider.get()
+            new_size = (max(1, int(img_w * zoom_final)), max(1, int(img_h * zoom_final)))
+
+            # Caché compartida entre pestañas; si falla, se remuestrea desde el nivel de la pirámide más cercano
+            pil_resized, final = RenderCache.render(self.file_path, new_size)
+            if final:
+                self._draw(pil_resized, canvas_w, canvas_h)
+                return
+            # Mientras se decodifica se muestra la vista previa (una sola vez)
+            if pil_resized is not None and not self._preview_shown:
+                self._draw(pil_resized, canvas_w, canvas_h)
+                self._preview_shown = True
+
+        pyramid = RenderCache.pyramid(self.file_path)
+        if pyramid.error:
+            self.canvas.delete("all")
+            self.canvas.create_text(10, 10, anchor="nw", text="No se pudo abrir la imagen.")
+            return
+        # Sin decodificar todavía: solo se consulta el estado, sin remuestrear, hasta que termine
+        self._resize_job = self.after(50, self._wait_decoded, pyramid)
 
-        pil_resized = self.pil_original.resize(new_size, Image.Resampling.LANCZOS)
-        self.tk_img = ImageTk.PhotoImage(pil_resized)
+    def _wait_decoded(self, pyramid):
+        self._resize_job = None
+        if pyramid.ready or pyramid.cancelled:
+            # Cancelada (expulsada de la caché): _render_view la vuelve a pedir
+            self._render_view()
+            return
+        # La miniatura llegó antes que la decodificación (y ya se conoce el tamaño): se pinta como vista previa
+        if self._thumbnail_path and pyramid.size is not None:
+            path, self._thumbnail_path = self._thumbnail_path, None
+            if pyramid.offer_preview(path):
+                self._preview_shown = False
+                self._render_view()
+                return
+        self._resize_job = self.after(50, self._wait_decoded, pyramid)
+
+    def _draw(self, pil_img, canvas_w: int, canvas_h: int):
+        self.tk_img = ImageTk.PhotoImage(pil_img)
         self.canvas.delete("all")
 
         self.canvas.create_image(canvas_w//2, canvas_h//2, anchor="center", image=self.tk_img)
-        if value_slider <= 1.01:
+        if self.zoom_slider.get() <= 1.01:
             self.canvas.config(scrollregion=(0, 0, canvas_w, canvas_h))
         else:
             self.canvas.config(scrollregion=self.canvas.bbox("all"))
@@ -136,8 +198,29 @@ class ImageEditorFeature(ttk.Frame):
         if self._resize_job:
             self.after_cancel(self._resize_job)
             
+        self._preview_shown = False
         self._resize_job = self.after(200, self._render_view)
 
+    def _on_hidden(self, event):
+        """
+        En segundo plano: se suelta el bitmap mostrado y se vuelve a pintar desde la caché.
+        La pirámide sigue en la caché (y su decodificación en curso); el presupuesto de memoria decide si se expulsa.
+        """
+        if self._resize_job:
+            self.after_cancel(self._resize_job)
+            self._resize_job = None
+        self.canvas.delete("all")
+        self.tk_img = None
+
+    def destroy(self):
+        if self._resize_job:
+            self.after_cancel(self._resize_job)
+            self._resize_job = None
+        # Si la pestaña se cierra a mitad de la decodificación, se cancela el trabajo pendiente
+        if self.file_path:
+            RenderCache.suspend(self.file_path)
+        super().destroy()
+
     def _ui_close_tab(self):
         Bus.emit("CLOSE_TAB_IMAGE", image_id=self.image_id)
     
@@ -59,13 +59,17 @@ class NoteEditorFeature(ttk.Frame):
         
         if not res.successful:
             messagebox.showerror("Error", res.info)
-            return
+            return False
          
         self.editor.edit_modified(False)
         messagebox.showinfo("Éxito", "Nota guardada correctamente.")
+        return True
 
-
-    def _ui_close_tab(self):
+    def confirm_close(self) -> bool:
+        """
+        Asks what to do with unsaved content and unregistered chronometer time.
+        Returns False if the user cancels (or saving fails): the tab must stay open.
+        """
         if self.editor.edit_modified():
             choice = custom_messagebox(
                 "Notas",
@@ -73,9 +77,26 @@ class NoteEditorFeature(ttk.Frame):
                 ["Guardar", "No Guardar", "Cancelar"]
             )
             if choice == "Guardar":
-                self.save_content()
-            elif choice == "Cancelar":
-                return
+                if not self.save_content():
+                    return False
+            elif choice != "No Guardar":
+                return False
+        if self.chrono.has_unsaved_time():
+            choice = custom_messagebox(
+                "Cronómetro",
+                "Hay tiempo sin registrar. ¿Qué desea hacer?",
+                ["Guardar", "No Guardar", "Cancelar"]
+            )
+            if choice == "Guardar":
+                if not self.chrono.guardar():
+                    return False
+            elif choice != "No Guardar":
+                return False
+        return True
+
+    def _ui_close_tab(self):
+        if not self.confirm_close():
+            return
         Bus.emit("CLOSE_TAB_NOTE", note_id=self.note_id)
 
     def _toggle_preview_label(self, is_active: bool, id_note: int):
@@ -0,0 +1,49 @@
+import tkinter as tk
+from tkinter import ttk
+
+from frontend.core.bus import Bus
+
+
+class ProgressDialog(tk.Toplevel):
+    """
+    Modal progress window for a long task that runs on a worker thread.
+    Listens to <topic>_PROGRESS / <topic>_FINISHED and, if cancellable, emits <topic>_CANCEL.
+    The explorer relays the worker's events from the Tk thread.
+    """
+    def __init__(self, master, title: str, topic: str, cancellable: bool = True):
+        super().__init__(master)
+        self.title(title)
+        self.geometry("360x120")
+        self.resizable(False, False)
+        self.grab_set()  # MODAL
+        self.topic = topic
+
+        self.label = ttk.Label(self, text="Preparando...")
+        self.label.pack(pady=(15, 5))
+        self.bar = ttk.Progressbar(self, orient="horizontal", length=320, mode="determinate")
+        self.bar.pack(padx=20)
+        self.btn_cancel = ttk.Button(self, text="Cancelar", command=self._on_cancel)
+        if cancellable:
+            self.btn_cancel.pack(pady=10)
+            self.protocol("WM_DELETE_WINDOW", self._on_cancel)
+        else:
+            # Nothing to stop: closing the window would only hide the progress
+            self.protocol("WM_DELETE_WINDOW", lambda: None)
+
+        Bus.subscribe(f"{topic}_PROGRESS", self._on_progress)
+        Bus.subscribe(f"{topic}_FINISHED", self._on_finished)
+
+    def _on_progress(self, done: int, total: int):
+        self.bar.configure(maximum=max(total, 1), value=done)
+        self.label.configure(text=f"{done} de {total} archivos")
+
+    def _on_cancel(self):
+        self.btn_cancel.configure(state="disabled")
+        self.label.configure(text="Cancelando...")
+        Bus.emit(f"{self.topic}_CANCEL")
+
+    def _on_finished(self, **kwargs):
+        Bus.unsubscribe(f"{self.topic}_PROGRESS", self._on_progress)
+        Bus.unsubscribe(f"{self.topic}_FINISHED", self._on_finished)
+        self.grab_release()
+        self.destroy()
@@ -3,6 +3,8 @@ from tkinter import ttk
 from frontend.features.explorer_feature import ExplorerFeature
 from frontend.tab_manager import TabManager
 from frontend.analytics_manager import AnalyticsManager
+from frontend.core.api_provider import ApiProvider
+from frontend.core.bus import Bus
 
 def setup_style():
     style = ttk.Style()
@@ -30,6 +32,15 @@ class Gui():
         pw.add(frame_right, minsize=200)
 
         
+        # Vault switcher, only when several vaults are open
+        vaults = ApiProvider.get_vaults()
+        if len(vaults.names()) > 1:
+            self.root.title(f"SecondBrain - {vaults.active_name}")
+            self.vault_selector = ttk.Combobox(frame_left, values=vaults.names(), state="readonly")
+            self.vault_selector.set(vaults.active_name)
+            self.vault_selector.pack(fill="x")
+            self.vault_selector.bind("<<ComboboxSelected>>", self._switch_vault)
+
         # Explorer
         explorer = ExplorerFeature(frame_left)
         explorer.pack(expand=True, fill="both")
@@ -37,8 +48,21 @@ class Gui():
         # TabManager
         notebook = ttk.Notebook(frame_right)
         notebook.pack(fill="both", expand=True)
-        tab_manager = TabManager(notebook)
+        self.tab_manager = TabManager(notebook)
         analytics_manager = AnalyticsManager()
 
+    def _switch_vault(self, event=None):
+        vaults = ApiProvider.get_vaults()
+        name = self.vault_selector.get()
+        if name == vaults.active_name:
+            return
+        # Switching closes every tab: unsaved notes and chronometer time are asked about first
+        if not self.tab_manager.confirm_close_all():
+            self.vault_selector.set(vaults.active_name)
+            return
+        ApiProvider.set(vaults.set_active(name))
+        self.root.title(f"SecondBrain - {name}")
+        Bus.emit("VAULT_CHANGED")
+
     def run(self):
         self.root.mainloop()
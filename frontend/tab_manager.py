@@ -30,6 +30,22 @@ class TabManager:
         Bus.subscribe("CLOSE_TAB_IMAGES", self.close_images_tab)
         Bus.subscribe("CHANGE_NAME_IMAGE_TAB", self.update_tab_image_title)
 
+        Bus.subscribe("VAULT_CHANGED", self.on_vault_changed)
+
+    def confirm_close_all(self) -> bool:
+        """Asks about unsaved work in every note tab, showing each one first. False if the user cancels."""
+        for tab_instance in list(self.tabs_notes_active.values()):
+            self.notebook.select(tab_instance)
+            if not tab_instance.confirm_close():
+                return False
+        return True
+
+    def on_vault_changed(self):
+        # The open tabs belong to the previous vault: their ids mean nothing in the new one
+        self.close_notes_tab(list(self.tabs_notes_active))
+        self.close_images_tab(list(self.tabs_images_active))
+        self.api = ApiProvider.get()
+
     def open_note_in_tab(self, note_id: int):
         if note_id in self.tabs_notes_active:
             self.notebook.select(self.tabs_notes_active[note_id])
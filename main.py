@@ -1,33 +1,53 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from backend.infrastructure.repositories.image_repository import ImageRepository
-from backend.infrastructure.repositories.sql_alchemy import models
-from backend.infrastructure.repositories.note_repository import NoteRepository
-from backend.infrastructure.repositories.theme_repository import ThemeRepository
-from backend.infrastructure.repositories.analytics_repository import AnalyticsRepository
-from backend.infrastructure.repositories.search_efficiency_repository import SearchEfficiencyRepository
-
-from backend.application.backend_api import BackendAPI
+import os
+import sys
+
+from log import logger
+from backend.application.vault_manager import VaultManager
 from frontend.gui_main import Gui
 from frontend.core.api_provider import ApiProvider
+from frontend.core.render_cache import RenderCache
+
 
 
+# --- Vaults setup ---
+def open_vaults(argv: list[str]) -> VaultManager:
+    """
+    Each argument is a vault as name=folder, e.g. `python -m main work=~/work research=~/research`.
+    Without arguments the current folder is the only vault (app.db and _uploads/).
+    The first vault is the active one.
+    """
+    vault_manager = VaultManager()
+    vault_args = [arg for arg in argv if "=" in arg and not arg.startswith("--")] or ["default=."]
+    for arg in vault_args:
+        name, root = arg.split("=", 1)
+        vault_manager.open(name.strip(), os.path.expanduser(root.strip()))
+    return vault_manager
 
-# --- DB setup ---
-engine = create_engine('sqlite:///app.db', echo=False)
-models.Base.metadata.create_all(engine)
-Session = sessionmaker(bind=engine)
-session = Session()
-nt_repo = NoteRepository(session)
-thm_repo = ThemeRepository(session)
-an_repo = AnalyticsRepository(session)
-sc_repo = SearchEfficiencyRepository(session)
-img_repo = ImageRepository(session)
-back_api = BackendAPI(nt_repo, thm_repo, an_repo, sc_repo, img_repo)
-ApiProvider.set(back_api)
+
+def image_cache_budget(argv: list[str]) -> int:
+    """
+    `--image-cache-mb=N` sets the memory budget (MB) of the decoded images and
+    renders shared by the image tabs. Defaults to RenderCache.DEFAULT_BUDGET.
+    """
+    for arg in argv:
+        if arg.startswith("--image-cache-mb="):
+            return max(1, int(arg.split("=", 1)[1])) * 1024 * 1024
+    return RenderCache.DEFAULT_BUDGET
 
 
 # -------------------
+# Setup lives under the guard: worker processes (thumbnails) re-import this module on spawn
 if __name__ == "__main__":
+    vault_manager = open_vaults(sys.argv[1:])
+    RenderCache.configure(image_cache_budget(sys.argv[1:]))
+    back_api = vault_manager.active()
+    ApiProvider.set(back_api)
+    ApiProvider.set_vaults(vault_manager)
+
+    # Every vault keeps its own maintenance: the inactive ones are idle, so they run freely
+    for name in vault_manager.names():
+        vault_manager.get(name).start_maintenance()
     app = Gui()
     app.run()
+    logger.info("render_cache stats: %s", RenderCache.stats())
+    vault_manager.close_all()